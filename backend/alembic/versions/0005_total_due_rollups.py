@@ -0,0 +1,105 @@
+"""total_due daily and monthly rollups
+
+Revision ID: 0005_total_due_rollups
+Revises: 0004_dashboard_v2_schema
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_total_due_rollups"
+down_revision = "0004_dashboard_v2_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tax_due_property_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bot_id", sa.Integer(), nullable=False),
+        sa.Column("property_address", sa.String(length=1024), nullable=False),
+        sa.Column("granularity", sa.String(length=8), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("snapshot_count", sa.Integer(), nullable=False),
+        sa.Column("min_total_due", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("max_total_due", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("first_total_due", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("last_total_due", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("first_scraped_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_scraped_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["bot_id"], ["bots.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "bot_id",
+            "property_address",
+            "granularity",
+            "period_start",
+            name="uq_tax_due_property_rollups_period",
+        ),
+    )
+    op.create_index(op.f("ix_tax_due_property_rollups_bot_id"), "tax_due_property_rollups", ["bot_id"], unique=False)
+
+    op.create_table(
+        "tax_due_bot_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bot_id", sa.Integer(), nullable=False),
+        sa.Column("granularity", sa.String(length=8), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("snapshot_count", sa.Integer(), nullable=False),
+        sa.Column("property_count", sa.Integer(), nullable=False),
+        sa.Column("total_due", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(["bot_id"], ["bots.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("bot_id", "granularity", "period_start", name="uq_tax_due_bot_rollups_period"),
+    )
+    op.create_index(op.f("ix_tax_due_bot_rollups_bot_id"), "tax_due_bot_rollups", ["bot_id"], unique=False)
+
+    # Backfill from existing history once; new snapshots maintain rollups on insert.
+    for granularity in ("day", "month"):
+        op.execute(
+            f"""
+            INSERT INTO tax_due_property_rollups (
+                bot_id, property_address, granularity, period_start, snapshot_count,
+                min_total_due, max_total_due, first_total_due, last_total_due,
+                first_scraped_at, last_scraped_at
+            )
+            SELECT
+                bot_id,
+                property_address,
+                '{granularity}',
+                period_start,
+                count(*),
+                min(total_due),
+                max(total_due),
+                (array_agg(total_due ORDER BY scraped_at ASC, id ASC))[1],
+                (array_agg(total_due ORDER BY scraped_at DESC, id DESC))[1],
+                min(scraped_at),
+                max(scraped_at)
+            FROM (
+                SELECT *, date_trunc('{granularity}', scraped_at AT TIME ZONE 'UTC')::date AS period_start
+                FROM tax_property_snapshots
+            ) AS snapshots
+            GROUP BY bot_id, property_address, period_start
+            """
+        )
+    op.execute(
+        """
+        INSERT INTO tax_due_bot_rollups (
+            bot_id, granularity, period_start, snapshot_count, property_count, total_due
+        )
+        SELECT bot_id, granularity, period_start, sum(snapshot_count), count(*), sum(last_total_due)
+        FROM tax_due_property_rollups
+        GROUP BY bot_id, granularity, period_start
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_tax_due_bot_rollups_bot_id"), table_name="tax_due_bot_rollups")
+    op.drop_table("tax_due_bot_rollups")
+    op.drop_index(op.f("ix_tax_due_property_rollups_bot_id"), table_name="tax_due_property_rollups")
+    op.drop_table("tax_due_property_rollups")
@@ -0,0 +1,55 @@
+"""precomputed snapshot-to-snapshot diffs
+
+Revision ID: 0006_snapshot_diffs
+Revises: 0005_total_due_rollups
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_snapshot_diffs"
+down_revision = "0005_total_due_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Diffs are computed at insert time; snapshots that predate this table
+    # still serve as the "previous" side for the next scrape of a property.
+    op.create_table(
+        "tax_property_snapshot_diffs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("snapshot_id", sa.Integer(), nullable=False),
+        sa.Column("previous_snapshot_id", sa.Integer(), nullable=True),
+        sa.Column("bot_id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.Integer(), nullable=False),
+        sa.Column("property_address", sa.String(length=1024), nullable=False),
+        sa.Column("total_due_delta", sa.Numeric(precision=12, scale=2), nullable=True),
+        sa.Column("change_count", sa.Integer(), nullable=False),
+        sa.Column("changes_json", sa.JSON(), nullable=False),
+        sa.Column("scraped_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["bot_id"], ["bots.id"]),
+        sa.ForeignKeyConstraint(["run_id"], ["bot_runs.id"]),
+        sa.ForeignKeyConstraint(["snapshot_id"], ["tax_property_snapshots.id"]),
+        sa.ForeignKeyConstraint(["previous_snapshot_id"], ["tax_property_snapshots.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("snapshot_id"),
+    )
+    op.create_index(op.f("ix_tax_property_snapshot_diffs_bot_id"), "tax_property_snapshot_diffs", ["bot_id"], unique=False)
+    op.create_index(op.f("ix_tax_property_snapshot_diffs_run_id"), "tax_property_snapshot_diffs", ["run_id"], unique=False)
+    op.create_index(
+        op.f("ix_tax_property_snapshot_diffs_property_address"),
+        "tax_property_snapshot_diffs",
+        ["property_address"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_tax_property_snapshot_diffs_property_address"), table_name="tax_property_snapshot_diffs")
+    op.drop_index(op.f("ix_tax_property_snapshot_diffs_run_id"), table_name="tax_property_snapshot_diffs")
+    op.drop_index(op.f("ix_tax_property_snapshot_diffs_bot_id"), table_name="tax_property_snapshot_diffs")
+    op.drop_table("tax_property_snapshot_diffs")
@@ -0,0 +1,76 @@
+"""indexed property search
+
+Revision ID: 0007_property_search
+Revises: 0006_snapshot_diffs
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_property_search"
+down_revision = "0006_snapshot_diffs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_table(
+        "tax_property_search",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bot_id", sa.Integer(), nullable=False),
+        sa.Column("property_address", sa.String(length=1024), nullable=False),
+        sa.Column("snapshot_id", sa.Integer(), nullable=False),
+        sa.Column("source_account_number", sa.String(length=64), nullable=True),
+        sa.Column("total_due", sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column("scraped_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("search_text", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(["bot_id"], ["bots.id"]),
+        sa.ForeignKeyConstraint(["snapshot_id"], ["tax_property_snapshots.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("bot_id", "property_address", name="uq_tax_property_search_property"),
+    )
+    op.create_index(op.f("ix_tax_property_search_bot_id"), "tax_property_search", ["bot_id"], unique=False)
+    op.execute(
+        "CREATE INDEX ix_tax_property_search_address_trgm "
+        "ON tax_property_search USING gin (property_address gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_tax_property_search_text_tsv "
+        "ON tax_property_search USING gin (to_tsvector('simple', search_text))"
+    )
+
+    # Seed one entry per property from its latest snapshot.
+    op.execute(
+        """
+        INSERT INTO tax_property_search (
+            bot_id, property_address, snapshot_id, source_account_number, total_due, scraped_at, search_text
+        )
+        SELECT DISTINCT ON (s.bot_id, s.property_address)
+            s.bot_id,
+            s.property_address,
+            s.id,
+            s.source_account_number,
+            s.total_due,
+            s.scraped_at,
+            left(coalesce((
+                SELECT string_agg(cell.value, ' ')
+                FROM json_array_elements(s.tables_json) AS tbl(value),
+                     json_array_elements(tbl.value -> 'rows') AS rw(value),
+                     json_array_elements_text(rw.value) AS cell(value)
+            ), ''), 100000)
+        FROM tax_property_snapshots AS s
+        ORDER BY s.bot_id, s.property_address, s.scraped_at DESC, s.id DESC
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tax_property_search_text_tsv")
+    op.execute("DROP INDEX IF EXISTS ix_tax_property_search_address_trgm")
+    op.drop_index(op.f("ix_tax_property_search_bot_id"), table_name="tax_property_search")
+    op.drop_table("tax_property_search")
@@ -0,0 +1,41 @@
+"""store snapshot tables/metadata as JSONB
+
+Revision ID: 0008_snapshot_jsonb
+Revises: 0007_property_search
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+
+
+revision = "0008_snapshot_jsonb"
+down_revision = "0007_property_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE tax_property_snapshots "
+        "ALTER COLUMN tables_json TYPE jsonb USING tables_json::jsonb, "
+        "ALTER COLUMN metadata_json TYPE jsonb USING metadata_json::jsonb"
+    )
+    op.execute(
+        "CREATE INDEX ix_tax_property_snapshots_tables_json_gin "
+        "ON tax_property_snapshots USING gin (tables_json jsonb_path_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_tax_property_snapshots_metadata_json_gin "
+        "ON tax_property_snapshots USING gin (metadata_json jsonb_path_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tax_property_snapshots_metadata_json_gin")
+    op.execute("DROP INDEX IF EXISTS ix_tax_property_snapshots_tables_json_gin")
+    op.execute(
+        "ALTER TABLE tax_property_snapshots "
+        "ALTER COLUMN tables_json TYPE json USING tables_json::json, "
+        "ALTER COLUMN metadata_json TYPE json USING metadata_json::json"
+    )
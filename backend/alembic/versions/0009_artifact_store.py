@@ -0,0 +1,55 @@
+"""content-addressed artifact index
+
+Revision ID: 0009_artifact_store
+Revises: 0008_snapshot_jsonb
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0009_artifact_store"
+down_revision = "0008_snapshot_jsonb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "artifact_blobs",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("path", sa.String(length=1024), nullable=False),
+        sa.Column("content_type", sa.String(length=64), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+
+    op.create_table(
+        "run_artifacts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.Integer(), nullable=False),
+        sa.Column("bot_id", sa.Integer(), nullable=False),
+        sa.Column("label", sa.String(length=64), nullable=False),
+        sa.Column("property_index", sa.Integer(), nullable=True),
+        sa.Column("source_url", sa.String(length=1024), nullable=True),
+        sa.Column("blob_sha256", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["bot_id"], ["bots.id"]),
+        sa.ForeignKeyConstraint(["run_id"], ["bot_runs.id"]),
+        sa.ForeignKeyConstraint(["blob_sha256"], ["artifact_blobs.sha256"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_run_artifacts_run_id"), "run_artifacts", ["run_id"], unique=False)
+    op.create_index(op.f("ix_run_artifacts_bot_id"), "run_artifacts", ["bot_id"], unique=False)
+    op.create_index(op.f("ix_run_artifacts_blob_sha256"), "run_artifacts", ["blob_sha256"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_run_artifacts_blob_sha256"), table_name="run_artifacts")
+    op.drop_index(op.f("ix_run_artifacts_bot_id"), table_name="run_artifacts")
+    op.drop_index(op.f("ix_run_artifacts_run_id"), table_name="run_artifacts")
+    op.drop_table("run_artifacts")
+    op.drop_table("artifact_blobs")
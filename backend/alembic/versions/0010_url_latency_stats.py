@@ -0,0 +1,48 @@
+"""per-url latency stats
+
+Revision ID: 0010_url_latency_stats
+Revises: 0009_artifact_store
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010_url_latency_stats"
+down_revision = "0009_artifact_store"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "url_latency_stats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bot_id", sa.Integer(), nullable=False),
+        sa.Column("source_url", sa.String(length=1024), nullable=False),
+        sa.Column("phase", sa.String(length=64), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.Column("failure_count", sa.Integer(), nullable=False),
+        sa.Column("total_ms", sa.Float(), nullable=False),
+        sa.Column("max_ms", sa.Float(), nullable=False),
+        sa.Column("buckets", sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(["bot_id"], ["bots.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("bot_id", "source_url", "phase", "period_start", name="uq_url_latency_stats_period"),
+    )
+    op.create_index(op.f("ix_url_latency_stats_bot_id"), "url_latency_stats", ["bot_id"], unique=False)
+    op.create_index(
+        "ix_url_latency_stats_bot_period",
+        "url_latency_stats",
+        ["bot_id", "period_start"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_url_latency_stats_bot_period", table_name="url_latency_stats")
+    op.drop_index(op.f("ix_url_latency_stats_bot_id"), table_name="url_latency_stats")
+    op.drop_table("url_latency_stats")
@@ -0,0 +1,24 @@
+"""bot config version column
+
+Revision ID: 0011_bot_config_version
+Revises: 0010_url_latency_stats
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011_bot_config_version"
+down_revision = "0010_url_latency_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("bot_configs", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("bot_configs", "version")
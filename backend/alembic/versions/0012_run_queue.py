@@ -0,0 +1,24 @@
+"""queued run state
+
+Revision ID: 0012_run_queue
+Revises: 0011_bot_config_version
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0012_run_queue"
+down_revision = "0011_bot_config_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("bot_runs", sa.Column("queued_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("bot_runs", "queued_at")
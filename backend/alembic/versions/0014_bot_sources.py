@@ -0,0 +1,44 @@
+"""database-managed bot source accounts
+
+Revision ID: 0014_bot_sources
+Revises: 0013_bot_schedules
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0014_bot_sources"
+down_revision = "0013_bot_schedules"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bot_sources",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bot_id", sa.Integer(), nullable=False),
+        sa.Column("url", sa.String(length=1024), nullable=False),
+        sa.Column("account_number", sa.String(length=64), nullable=True),
+        sa.Column("enabled", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("metadata_json", sa.JSON(), nullable=False),
+        sa.Column("last_success_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_failure_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["bot_id"], ["bots.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("bot_id", "url", name="uq_bot_sources_bot_url"),
+    )
+    op.create_index(op.f("ix_bot_sources_account_number"), "bot_sources", ["account_number"], unique=False)
+    op.create_index("ix_bot_sources_bot_enabled_id", "bot_sources", ["bot_id", "enabled", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bot_sources_bot_enabled_id", table_name="bot_sources")
+    op.drop_index(op.f("ix_bot_sources_account_number"), table_name="bot_sources")
+    op.drop_table("bot_sources")
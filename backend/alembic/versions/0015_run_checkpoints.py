@@ -0,0 +1,37 @@
+"""per-url run checkpoints staged before promotion
+
+Revision ID: 0015_run_checkpoints
+Revises: 0014_bot_sources
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015_run_checkpoints"
+down_revision = "0014_bot_sources"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "run_checkpoints",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.Integer(), nullable=False),
+        sa.Column("source_url", sa.String(length=1024), nullable=False),
+        sa.Column("url_result_json", sa.JSON(), nullable=False),
+        sa.Column("snapshot_json", sa.JSON(), nullable=True),
+        sa.Column("scraped_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("promoted", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["run_id"], ["bot_runs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_id", "source_url", name="uq_run_checkpoints_run_url"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("run_checkpoints")
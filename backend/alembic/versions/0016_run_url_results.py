@@ -0,0 +1,59 @@
+"""per-url run outcomes moved out of bot_runs.details_json
+
+Revision ID: 0016_run_url_results
+Revises: 0015_run_checkpoints
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0016_run_url_results"
+down_revision = "0015_run_checkpoints"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "run_url_results",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("run_id", sa.Integer(), nullable=False),
+        sa.Column("source_url", sa.String(length=1024), nullable=False),
+        sa.Column("status", sa.String(length=32), nullable=False),
+        sa.Column("result_json", sa.JSON(), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["run_id"], ["bot_runs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("run_id", "source_url", name="uq_run_url_results_run_url"),
+    )
+
+    # Move existing per-URL results out of the run rows once; the last result per URL wins.
+    op.execute(
+        """
+        INSERT INTO run_url_results (run_id, source_url, status, result_json)
+        SELECT DISTINCT ON (runs.id, item.value->>'source_url')
+            runs.id,
+            item.value->>'source_url',
+            coalesce(item.value->>'status', 'unknown'),
+            item.value
+        FROM bot_runs AS runs
+        CROSS JOIN LATERAL json_array_elements(runs.details_json->'url_results') WITH ORDINALITY AS item(value, position)
+        WHERE json_typeof(runs.details_json->'url_results') = 'array'
+            AND item.value->>'source_url' IS NOT NULL
+        ORDER BY runs.id, item.value->>'source_url', item.position DESC
+        """
+    )
+    op.execute(
+        """
+        UPDATE bot_runs
+        SET details_json = (details_json::jsonb - 'url_results')::json
+        WHERE details_json::jsonb ? 'url_results'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("run_url_results")
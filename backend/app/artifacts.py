@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import ArtifactBlob, BotRun, RunArtifact
+
+logger = logging.getLogger("app.artifacts")
+
+BLOB_DIR = "blobs"
+VARIANT_DIR = "variants"
+# Downscaled variants are bounded by (max width, max height) and kept as WebP.
+VARIANT_SIZES = {"thumb": (320, 1280), "preview": (1280, 5120)}
+_BLOB_PATH_RE = re.compile(r"^/artifacts/blobs/[0-9a-f]{2}/(?P<sha>[0-9a-f]{64})\.(?P<ext>[a-z0-9]+)$")
+CONTENT_TYPES = {"png": "image/png", "jpg": "image/jpeg", "webp": "image/webp"}
+FINISHED_STATUSES = ("success", "failed", "cancelled")
+# Unsuccessful runs keep their artifacts for the longer failed-run window.
+UNSUCCESSFUL_STATUSES = ("failed", "cancelled")
+
+
+@dataclass(frozen=True)
+class StoredArtifact:
+    sha256: str
+    path: str
+    size_bytes: int
+    deduplicated: bool
+
+
+def compress_png(data: bytes) -> bytes:
+    """Losslessly re-encode a PNG at maximum compression; falls back to the input."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            out = io.BytesIO()
+            image.save(out, format="PNG", optimize=True)
+    except Exception:
+        return data
+    compressed = out.getvalue()
+    return compressed if len(compressed) < len(data) else data
+
+
+class ContentAddressedStore:
+    """Stores artifact bytes once per SHA-256 under ``<root>/blobs/ab/<sha>.<ext>``."""
+
+    def __init__(self, root: str | Path, compress: bool = True):
+        self.root = Path(root)
+        self.compress = compress
+
+    def blob_file(self, sha256: str, ext: str) -> Path:
+        return self.root / BLOB_DIR / sha256[:2] / f"{sha256}.{ext}"
+
+    def blob_path(self, sha256: str, ext: str) -> str:
+        return f"/artifacts/{BLOB_DIR}/{sha256[:2]}/{sha256}.{ext}"
+
+    def variant_file(self, sha256: str, variant: str) -> Path:
+        return self.root / VARIANT_DIR / sha256[:2] / f"{sha256}_{variant}.webp"
+
+    def delete_variants(self, sha256: str) -> None:
+        for variant in VARIANT_SIZES:
+            self.variant_file(sha256, variant).unlink(missing_ok=True)
+
+    def locate(self, data: bytes, ext: str = "png") -> tuple[str, Path, str]:
+        sha256 = hashlib.sha256(data).hexdigest()
+        return sha256, self.blob_file(sha256, ext), self.blob_path(sha256, ext)
+
+    def put(self, data: bytes, ext: str = "png") -> StoredArtifact:
+        # The key is the hash of the captured bytes, so identical screenshots
+        # dedupe regardless of how they are compressed on disk.
+        sha256, target, path = self.locate(data, ext)
+        if target.exists():
+            # Refresh mtime so the GC grace period protects blobs reused by an
+            # in-flight run that has not been indexed yet.
+            os.utime(target)
+            return StoredArtifact(sha256, path, target.stat().st_size, deduplicated=True)
+
+        payload = compress_png(data) if self.compress and ext == "png" else data
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, target)
+        return StoredArtifact(sha256, path, len(payload), deduplicated=False)
+
+
+class ArtifactWriter:
+    """Compresses and persists captured bytes on a bounded thread pool.
+
+    ``submit`` returns the content-addressed path immediately; at most
+    ``max_pending`` captures are held in memory before callers wait.
+    """
+
+    def __init__(self, store: ContentAddressedStore, max_workers: int = 2, max_pending: int = 8):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-writer")
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending: dict[str, asyncio.Future] = {}
+        self.written = 0
+        self.deduplicated = 0
+        self.errors: list[str] = []
+
+    async def submit(self, data: bytes, ext: str = "png") -> str:
+        sha256, _, path = self.store.locate(data, ext)
+        if sha256 in self._pending:
+            return path
+
+        await self._slots.acquire()
+        if sha256 in self._pending:
+            self._slots.release()
+            return path
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self.store.put, data, ext)
+        self._pending[sha256] = future
+        future.add_done_callback(lambda done, key=sha256: self._finished(key, done))
+        return path
+
+    def _finished(self, sha256: str, future: asyncio.Future):
+        self._slots.release()
+        self._pending.pop(sha256, None)
+        if future.cancelled():
+            self.errors.append(f"{sha256}: write cancelled")
+        elif future.exception() is not None:
+            self.errors.append(f"{sha256}: {future.exception()}")
+        elif future.result().deduplicated:
+            self.deduplicated += 1
+        else:
+            self.written += 1
+
+    async def flush(self) -> dict[str, Any]:
+        while self._pending:
+            await asyncio.gather(*list(self._pending.values()), return_exceptions=True)
+        return {"written": self.written, "deduplicated": self.deduplicated, "errors": list(self.errors)}
+
+    async def close(self) -> dict[str, Any]:
+        stats = await self.flush()
+        # Joining the worker threads blocks; keep it off the event loop.
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+        return stats
+
+
+def is_sha256(value: str) -> bool:
+    return bool(re.fullmatch(r"[0-9a-f]{64}", value))
+
+
+def find_blob_file(store: ContentAddressedStore, sha256: str) -> Path | None:
+    for ext in CONTENT_TYPES:
+        candidate = store.blob_file(sha256, ext)
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def render_variant(store: ContentAddressedStore, sha256: str, variant: str) -> Path | None:
+    """Return the cached downscaled file for a blob, generating it on first use."""
+    source = find_blob_file(store, sha256)
+    if source is None:
+        return None
+    target = store.variant_file(sha256, variant)
+    if target.exists():
+        return target
+
+    from PIL import Image
+
+    max_size = VARIANT_SIZES[variant]
+    with Image.open(source) as image:
+        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        out = io.BytesIO()
+        image.save(out, format="WEBP", quality=80, method=4)
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_bytes(out.getvalue())
+    os.replace(tmp, target)
+    return target
+
+
+def parse_blob_path(path: str | None) -> tuple[str, str] | None:
+    match = _BLOB_PATH_RE.match(path or "")
+    if not match:
+        return None
+    return match.group("sha"), match.group("ext")
+
+
+def record_run_artifacts(
+    db: Session,
+    store: ContentAddressedStore,
+    bot_id: int,
+    run_id: int,
+    url_results: Iterable[dict[str, Any]],
+    start: int = 1,
+) -> int:
+    """Index the results' screenshots; ``start`` is the property index of the first result."""
+    recorded = 0
+    known: set[str] = set()
+    for property_index, item in enumerate(url_results, start=start):
+        for label, path in (item.get("artifacts") or {}).items():
+            parsed = parse_blob_path(path)
+            if parsed is None:
+                continue
+            sha256, ext = parsed
+            blob_file = store.blob_file(sha256, ext)
+            if not blob_file.exists():
+                continue
+            if sha256 not in known and db.get(ArtifactBlob, sha256) is None:
+                db.add(
+                    ArtifactBlob(
+                        sha256=sha256,
+                        path=path,
+                        content_type=CONTENT_TYPES.get(ext, "application/octet-stream"),
+                        size_bytes=blob_file.stat().st_size,
+                    )
+                )
+                db.flush()
+            known.add(sha256)
+            db.add(
+                RunArtifact(
+                    run_id=run_id,
+                    bot_id=bot_id,
+                    label=label,
+                    property_index=property_index,
+                    source_url=item.get("source_url"),
+                    blob_sha256=sha256,
+                )
+            )
+            recorded += 1
+    db.commit()
+    return recorded
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    max_age_days: int = 30
+    failed_max_age_days: int = 90
+    max_total_bytes: int = 5 * 1024 * 1024 * 1024
+    grace_seconds: int = 6 * 60 * 60
+
+
+def referenced_bytes(db: Session) -> int:
+    total = db.query(func.coalesce(func.sum(ArtifactBlob.size_bytes), 0)).filter(
+        ArtifactBlob.sha256.in_(db.query(RunArtifact.blob_sha256))
+    )
+    return int(total.scalar() or 0)
+
+
+def _release_runs(db: Session, store: ContentAddressedStore, run_ids: list[int]) -> int:
+    if not run_ids:
+        return 0
+    released = (
+        db.query(RunArtifact).filter(RunArtifact.run_id.in_(run_ids)).delete(synchronize_session=False)
+    )
+    db.commit()
+    for run_id in run_ids:
+        shutil.rmtree(store.root / "runs" / f"run_{run_id}", ignore_errors=True)
+    return released
+
+
+def _runs_with_artifacts(db: Session):
+    return db.query(BotRun.id).filter(
+        BotRun.status.in_(FINISHED_STATUSES),
+        BotRun.finished_at.isnot(None),
+        BotRun.id.in_(db.query(RunArtifact.run_id).distinct()),
+    )
+
+
+def _file_is_settled(path: Path, cutoff: float) -> bool:
+    try:
+        return path.stat().st_mtime < cutoff
+    except FileNotFoundError:
+        return True
+
+
+def _run_is_expired(run: BotRun, policy: RetentionPolicy, now: datetime) -> bool:
+    if run.finished_at is None or run.status not in FINISHED_STATUSES:
+        return False
+    finished_at = run.finished_at if run.finished_at.tzinfo else run.finished_at.replace(tzinfo=timezone.utc)
+    max_age = policy.max_age_days if run.status == "success" else policy.failed_max_age_days
+    return finished_at < now - timedelta(days=max_age)
+
+
+def collect_garbage(
+    db: Session,
+    store: ContentAddressedStore,
+    policy: RetentionPolicy,
+    now: datetime | None = None,
+) -> dict[str, int]:
+    now = now or datetime.now(timezone.utc)
+    stats = {
+        "runs_expired": 0,
+        "references_released": 0,
+        "blobs_deleted": 0,
+        "bytes_freed": 0,
+        "stray_files_deleted": 0,
+        "run_dirs_deleted": 0,
+    }
+
+    # 1. Age/status based expiry. Running runs never qualify.
+    expired_ids = [
+        row.id
+        for row in _runs_with_artifacts(db).filter(
+            (
+                (BotRun.status == "success")
+                & (BotRun.finished_at < now - timedelta(days=policy.max_age_days))
+            )
+            | (
+                BotRun.status.in_(UNSUCCESSFUL_STATUSES)
+                & (BotRun.finished_at < now - timedelta(days=policy.failed_max_age_days))
+            )
+        )
+    ]
+    stats["references_released"] += _release_runs(db, store, expired_ids)
+    stats["runs_expired"] += len(expired_ids)
+
+    # 2. Size cap: release the oldest finished runs until under budget.
+    if policy.max_total_bytes > 0:
+        while referenced_bytes(db) > policy.max_total_bytes:
+            oldest = _runs_with_artifacts(db).order_by(BotRun.finished_at.asc(), BotRun.id.asc()).first()
+            if oldest is None:
+                break
+            stats["references_released"] += _release_runs(db, store, [oldest.id])
+            stats["runs_expired"] += 1
+
+    # 3. Delete unreferenced blobs that have settled past the grace period.
+    cutoff = time.time() - policy.grace_seconds
+    orphans = (
+        db.query(ArtifactBlob)
+        .filter(~ArtifactBlob.sha256.in_(db.query(RunArtifact.blob_sha256).distinct()))
+        .all()
+    )
+    for blob in orphans:
+        parsed = parse_blob_path(blob.path)
+        blob_file = store.blob_file(*parsed) if parsed else None
+        if blob_file is not None and not _file_is_settled(blob_file, cutoff):
+            continue
+        if blob_file is not None and blob_file.exists():
+            blob_file.unlink()
+            stats["bytes_freed"] += blob.size_bytes or 0
+        store.delete_variants(blob.sha256)
+        db.delete(blob)
+        stats["blobs_deleted"] += 1
+    db.commit()
+
+    # 4. Per-run directories (pre-index screenshots, profiles) of expired runs.
+    runs_root = store.root / "runs"
+    if runs_root.exists():
+        for run_dir in runs_root.glob("run_*"):
+            try:
+                run_id = int(run_dir.name.removeprefix("run_"))
+            except ValueError:
+                continue
+            run = db.get(BotRun, run_id)
+            if run is None or _run_is_expired(run, policy, now):
+                shutil.rmtree(run_dir, ignore_errors=True)
+                stats["run_dirs_deleted"] += 1
+
+    # 5. Files never indexed (e.g. a crashed run) once they are past the grace period.
+    blob_root = store.root / BLOB_DIR
+    if blob_root.exists():
+        indexed = {sha for (sha,) in db.query(ArtifactBlob.sha256)}
+        for blob_file in blob_root.glob("*/*"):
+            sha256 = blob_file.name.lstrip(".").split(".", 1)[0]
+            if sha256 in indexed or not _file_is_settled(blob_file, cutoff):
+                continue
+            size = blob_file.stat().st_size
+            blob_file.unlink(missing_ok=True)
+            store.delete_variants(sha256)
+            stats["stray_files_deleted"] += 1
+            stats["bytes_freed"] += size
+
+    return stats
+
+
+def store_stats(db: Session) -> dict[str, int]:
+    return {
+        "blob_count": db.query(func.count(ArtifactBlob.sha256)).scalar() or 0,
+        "blob_bytes": int(db.query(func.coalesce(func.sum(ArtifactBlob.size_bytes), 0)).scalar() or 0),
+        "referenced_bytes": referenced_bytes(db),
+        "reference_count": db.query(func.count(RunArtifact.id)).scalar() or 0,
+        "runs_with_artifacts": db.query(func.count(func.distinct(RunArtifact.run_id))).scalar() or 0,
+    }
+
+
+class ArtifactGarbageCollector:
+    """Runs ``collect_garbage`` on a daemon thread so runs never wait on it."""
+
+    def __init__(self, session_factory, store: ContentAddressedStore, policy: RetentionPolicy, interval_seconds: int):
+        self._session_factory = session_factory
+        self._store = store
+        self._policy = policy
+        self._interval = interval_seconds
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.last_result: dict[str, Any] | None = None
+
+    def run_once(self) -> dict[str, Any]:
+        # Serialize passes between the timer thread and on-demand requests.
+        with self._lock:
+            db = self._session_factory()
+            try:
+                result = collect_garbage(db, self._store, self._policy)
+            finally:
+                db.close()
+        self.last_result = {**result, "finished_at": datetime.now(timezone.utc).isoformat()}
+        return self.last_result
+
+    def _loop(self):
+        while not self._stop.wait(self._interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Artifact GC pass failed")
+
+    def start(self):
+        if self._interval <= 0 or self._thread is not None:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="artifact-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
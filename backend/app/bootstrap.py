@@ -0,0 +1,71 @@
+"""Container entrypoint: migrate only when needed, then seed.
+
+Run from ``backend/``::
+
+    python -m app.bootstrap
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Engine
+
+from app.bots import registry
+from app.db import SessionLocal, engine
+from app.settings import get_settings
+
+logger = logging.getLogger("app.bootstrap")
+
+ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic.ini"
+
+
+def _alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return config
+
+
+def schema_is_current(bind: Engine, config: Config | None = None) -> bool:
+    heads = set(ScriptDirectory.from_config(config or _alembic_config()).get_heads())
+    with bind.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    return current == heads
+
+
+def migrate(bind: Engine = engine) -> bool:
+    """Upgrade to head unless the database is already there; returns True if it ran."""
+    config = _alembic_config()
+    if schema_is_current(bind, config):
+        return False
+    command.upgrade(config, "head")
+    return True
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s %(message)s")
+    started = time.perf_counter()
+
+    if get_settings().skip_migrations:
+        logger.info("Skipping migrations (SKIP_MIGRATIONS set)")
+    elif migrate():
+        logger.info("Database upgraded to head")
+    else:
+        logger.info("Schema already at head; skipped alembic upgrade")
+
+    db = SessionLocal()
+    try:
+        registry.seed_bots(db)
+    finally:
+        db.close()
+    logger.info("Bootstrap finished in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from app.bots.registry import BotRuntime
+
+logger = logging.getLogger("app.bots.executor")
+
+# Used for Retry-After until a run has finished in this process.
+DEFAULT_RUN_SECONDS = 60.0
+WAIT_HISTORY = 100
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Run queue is full; retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Job:
+    runtime: BotRuntime
+    func: Callable[..., Any]
+    args: tuple
+    kwargs: dict = field(default_factory=dict)
+    enqueued_at: float = 0.0
+    priority: bool = False
+
+
+class RunExecutor:
+    """Starts bot runs on worker threads within per-bot and global limits.
+
+    At most ``max_concurrent_runs + max_queue`` runs are admitted at once;
+    callers ``reserve()`` a slot before creating the run row so a full queue
+    is rejected without leaving orphaned runs behind. Jobs that cannot start
+    yet wait in FIFO order; a job blocked by its own bot's limit does not
+    hold up jobs of other bots behind it.
+
+    Priority jobs (small on-demand scrapes on the shared warm browser) queue
+    ahead of every bulk job and may run beside their bot's bulk run. They
+    share one browser slot, held while any of them runs or while
+    ``pool_browser_open()`` reports the warm browser still up; call ``wake()``
+    when that browser closes so bulk jobs waiting on the slot can start.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_runs: int = 2,
+        max_browsers: int = 2,
+        max_queue: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+        pool_browser_open: Callable[[], bool] = lambda: False,
+    ):
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_browsers = max_browsers
+        self.max_queue = max_queue
+        self._clock = clock
+        self._pool_browser_open = pool_browser_open
+        self._lock = threading.Lock()
+        self._pending: deque[_Job] = deque()
+        self._active: Counter[str] = Counter()
+        self._active_total = 0
+        self._browsers_in_use = 0
+        self._priority_active = 0
+        self._reserved = 0
+        self._rejected = 0
+        self._started = 0
+        self._waits: deque[float] = deque(maxlen=WAIT_HISTORY)
+        self._run_seconds_avg: float | None = None
+
+    def reserve(self):
+        with self._lock:
+            admitted = self._active_total + len(self._pending) + self._reserved
+            if admitted >= self.max_concurrent_runs + self.max_queue:
+                self._rejected += 1
+                raise QueueFull(self._retry_after())
+            self._reserved += 1
+
+    def release(self):
+        with self._lock:
+            self._reserved = max(0, self._reserved - 1)
+
+    def submit(self, runtime: BotRuntime, func: Callable[..., Any], *args, priority: bool = False, **kwargs):
+        """Queue a job for a slot previously taken with ``reserve()``."""
+        job = _Job(runtime, func, args, kwargs, enqueued_at=self._clock(), priority=priority)
+        with self._lock:
+            self._reserved = max(0, self._reserved - 1)
+            if priority:
+                # Behind earlier priority jobs, ahead of all bulk jobs.
+                position = sum(1 for pending in self._pending if pending.priority)
+                self._pending.insert(position, job)
+            else:
+                self._pending.append(job)
+            ready = self._take_ready()
+        self._start(ready)
+
+    def _retry_after(self) -> int:
+        # Caller holds the lock. Rough time until a slot frees up.
+        run_seconds = self._run_seconds_avg or DEFAULT_RUN_SECONDS
+        waves = (len(self._pending) + self._reserved) / self.max_concurrent_runs + 1
+        return max(1, math.ceil(run_seconds * waves / 2))
+
+    def wake(self):
+        """Start whatever fits now, e.g. after the pooled browser closed."""
+        with self._lock:
+            ready = self._take_ready()
+        self._start(ready)
+
+    def _browsers(self, job: _Job) -> int:
+        return 0 if job.priority else min(job.runtime.resources.browsers, self.max_browsers)
+
+    def _pool_browsers(self) -> int:
+        # Caller holds the lock.
+        return 1 if self._priority_active or self._pool_browser_open() else 0
+
+    def _fits(self, job: _Job) -> bool:
+        if self._active_total >= self.max_concurrent_runs:
+            return False
+        if job.priority:
+            return bool(self._pool_browsers()) or self._browsers_in_use + 1 <= self.max_browsers
+        return (
+            self._active[job.runtime.slug] < job.runtime.resources.max_concurrent_runs
+            and self._browsers_in_use + self._pool_browsers() + self._browsers(job) <= self.max_browsers
+        )
+
+    def _take_ready(self) -> list[_Job]:
+        # Caller holds the lock.
+        ready = []
+        now = self._clock()
+        for job in list(self._pending):
+            if not self._fits(job):
+                continue
+            self._pending.remove(job)
+            self._active[job.runtime.slug] += 1
+            self._active_total += 1
+            self._browsers_in_use += self._browsers(job)
+            self._priority_active += job.priority
+            self._started += 1
+            self._waits.append(now - job.enqueued_at)
+            ready.append(job)
+        return ready
+
+    def _start(self, jobs: list[_Job]):
+        for job in jobs:
+            thread = threading.Thread(
+                target=self._run,
+                args=(job,),
+                name=f"bot-run-{job.runtime.slug}",
+                daemon=True,
+            )
+            thread.start()
+
+    def _run(self, job: _Job):
+        started = self._clock()
+        try:
+            job.func(*job.args, **job.kwargs)
+        except Exception:
+            logger.exception("Bot run for %s raised", job.runtime.slug)
+        finally:
+            elapsed = self._clock() - started
+            with self._lock:
+                self._active[job.runtime.slug] -= 1
+                self._active_total -= 1
+                self._browsers_in_use -= self._browsers(job)
+                self._priority_active -= job.priority
+                if self._run_seconds_avg is None:
+                    self._run_seconds_avg = elapsed
+                else:
+                    self._run_seconds_avg = 0.8 * self._run_seconds_avg + 0.2 * elapsed
+                ready = self._take_ready()
+            self._start(ready)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            waits = list(self._waits)
+            return {
+                "active_runs": self._active_total,
+                "queue_depth": len(self._pending),
+                "priority_queue_depth": sum(1 for job in self._pending if job.priority),
+                "reserved": self._reserved,
+                "browsers_in_use": self._browsers_in_use + self._pool_browsers(),
+                "max_concurrent_runs": self.max_concurrent_runs,
+                "max_browsers": self.max_browsers,
+                "max_queue": self.max_queue,
+                "saturated": self._active_total + len(self._pending) + self._reserved
+                >= self.max_concurrent_runs + self.max_queue,
+                "started_total": self._started,
+                "rejected_total": self._rejected,
+                "oldest_wait_seconds": round(now - self._pending[0].enqueued_at, 3) if self._pending else 0.0,
+                "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "max_wait_seconds": round(max(waits), 3) if waits else 0.0,
+                "avg_run_seconds": round(self._run_seconds_avg, 3) if self._run_seconds_avg is not None else None,
+                "retry_after_seconds": self._retry_after(),
+                "active_by_bot": {slug: count for slug, count in self._active.items() if count},
+            }
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+from app.bots.tax.config import CONFIG_KEY as TAX_CONFIG_KEY
+from app.bots.tax.config import DEFAULT_TAX_CONFIG, account_number_from_url
+from app.models import Bot
+from app.settings import AppSettings, get_settings
+
+
+def _load(path: str) -> Any:
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+@dataclass(frozen=True)
+class ResourceNeeds:
+    # Browsers held for the whole run; counted against the global browser budget.
+    browsers: int = 1
+    max_concurrent_runs: int = 1
+
+
+@dataclass(frozen=True)
+class BotRuntime:
+    """Declares how a bot runs without importing its implementation.
+
+    ``runner`` and ``config_schema`` are ``"module:attribute"`` paths resolved
+    on first use, so registering a bot costs nothing until it runs.
+    """
+
+    slug: str
+    name: str
+    runner: str
+    config_schema: str | None = None
+    config_key: str = "default"
+    default_config: dict[str, Any] = field(default_factory=dict)
+    # Seeds the bot's ``bot_sources`` table on first start; the table is the source of truth after that.
+    source_urls: Callable[[AppSettings], list[str]] | None = None
+    # Maps a source URL to the account it covers; enables single-account refreshes.
+    account_for_url: Callable[[str], str | None] | None = None
+    resources: ResourceNeeds = ResourceNeeds()
+
+    def load_runner(self) -> Callable[..., dict[str, Any]]:
+        return _load(self.runner)
+
+    def validate_config(self, config: dict[str, Any]) -> dict[str, Any]:
+        """Returns the normalized config; raises pydantic.ValidationError."""
+        if self.config_schema is None:
+            return dict(config)
+        return _load(self.config_schema).model_validate(config).model_dump()
+
+    def load_config(self, db: Session, bot_id: int) -> dict[str, Any]:
+        from app import crud
+
+        return {**self.default_config, **crud.get_bot_config(db, bot_id, self.config_key)}
+
+    def list_source_urls(self, settings: AppSettings) -> list[str]:
+        return list(self.source_urls(settings)) if self.source_urls else []
+
+
+_RUNTIMES: dict[str, BotRuntime] = {}
+
+
+def register(runtime: BotRuntime) -> BotRuntime:
+    if runtime.slug in _RUNTIMES:
+        raise ValueError(f"Bot runtime already registered: {runtime.slug}")
+    _RUNTIMES[runtime.slug] = runtime
+    return runtime
+
+
+def get_runtime(slug: str) -> BotRuntime | None:
+    return _RUNTIMES.get(slug)
+
+
+def list_runtimes() -> list[BotRuntime]:
+    return list(_RUNTIMES.values())
+
+
+def seed_bots(db: Session) -> list[Bot]:
+    from app import crud
+
+    settings = get_settings()
+    return [
+        crud.seed_bot(
+            db,
+            runtime.slug,
+            runtime.name,
+            runtime.config_key,
+            runtime.default_config,
+            source_urls=runtime.list_source_urls(settings),
+            account_for_url=runtime.account_for_url,
+        )
+        for runtime in _RUNTIMES.values()
+    ]
+
+
+# Only the declarative config module is imported here; the runner (and with
+# it Playwright) loads when the first tax run starts.
+register(
+    BotRuntime(
+        slug="tax",
+        name="Tax Bot v0",
+        runner="app.bots.tax.runner:run_tax_refresh",
+        config_schema="app.bots.tax.config:TaxBotConfig",
+        config_key=TAX_CONFIG_KEY,
+        default_config=DEFAULT_TAX_CONFIG,
+        source_urls=lambda settings: list(settings.tax_source_urls),
+        account_for_url=account_number_from_url,
+        resources=ResourceNeeds(browsers=1, max_concurrent_runs=1),
+    )
+)
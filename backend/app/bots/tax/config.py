@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schedules import ScheduleConfig
+
+CONFIG_KEY = "tax.default"
+
+DEFAULT_TAX_CONFIG = {
+    "version": "v1",
+    "table_selector": "table",
+    "source_urls_mode": "database",
+    # Wall-clock budget for a whole refresh; null (the default) disables it. Size it to the
+    # source count: at SCRAPE_HOST_RATE_PER_MINUTE a budget of N seconds fits about rate * N / 60 URLs.
+    "run_deadline_seconds": None,
+    # Incremental refreshes skip accounts scraped more recently than this.
+    "freshness_ttl_seconds": 3600,
+    # Publish the URLs a failed or cancelled run did scrape instead of nothing.
+    "partial_commit": False,
+}
+
+
+class TaxBotConfig(BaseModel):
+    # Unknown keys are kept so newer settings survive a round trip through older code.
+    model_config = ConfigDict(extra="allow")
+
+    version: str = "v1"
+    table_selector: str = Field("table", min_length=1)
+    source_urls_mode: str = "database"
+    profile_sample_rate: float = Field(0.0, ge=0.0, le=1.0)
+    profile_trace_slowest: bool = False
+    run_deadline_seconds: float | None = Field(None, gt=0)
+    freshness_ttl_seconds: int = Field(3600, gt=0)
+    partial_commit: bool = False
+    schedule: ScheduleConfig | None = None
+
+
+def account_number_from_url(url: str) -> str | None:
+    return parse_qs(urlparse(url).query).get("number", [None])[0]
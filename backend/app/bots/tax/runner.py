@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable
 
 from sqlalchemy.orm import Session
 
-from app import crud
-from app.bots.tax.scraper import scrape_tax_data
+from app import artifacts, checkpoints, crud, freshness, latency, run_results, sources
+from app.bots.tax.config import CONFIG_KEY, DEFAULT_TAX_CONFIG
+from app.bots.tax.scraper import scrape_tax_data, scrape_tax_data_pooled
+from app.cancellation import CancelToken
 from app.models import Bot, BotRun
+from app.run_metrics import PhaseTimingSummary, run_metrics
 from app.settings import get_settings
 
 EventCallback = Callable[[dict[str, Any]], None]
@@ -17,38 +22,225 @@ def run_tax_refresh(
     bot: Bot,
     run: BotRun,
     event_callback: EventCallback | None = None,
-    scraper_func: Callable[..., dict[str, Any]] = scrape_tax_data,
+    scraper_func: Callable[..., dict[str, Any]] | None = None,
+    trace_slowest: bool = False,
+    cancel_token: CancelToken | None = None,
+    source_urls: list[str] | None = None,
+    incremental: bool = False,
+    pooled: bool = False,
 ) -> dict[str, Any]:
+    """Scrape and persist the bot's enabled sources.
+
+    Sources are streamed from ``bot_sources`` in chunks, so the account list
+    is never held in memory. Passing ``source_urls`` refreshes just those.
+    ``pooled`` scrapes on the shared warm browser instead of launching one
+    for the run; it is meant for small on-demand refreshes (e.g. one
+    account), not scheduled batches. ``incremental`` narrows the list to
+    accounts that are stale under ``freshness_ttl_seconds`` or failed last
+    time; fresh accounts keep their existing latest snapshot.
+
+    Each scraped URL is checkpointed as it finishes and promoted into
+    ``tax_property_snapshots`` in one transaction at the end: only when every
+    URL succeeded, unless the bot config sets ``partial_commit``. Running the
+    same run again (see ``POST .../runs/{run_id}/resume``) skips the URLs it
+    already checkpointed. Per-URL outcomes go to ``run_url_results`` in
+    batches as the scrape hands them over; the run itself keeps only counts.
+    """
     settings = get_settings()
-    config = crud.get_bot_config(db, bot.id)
+    explicit = source_urls is not None
+    if scraper_func is None:
+        scraper_func = scrape_tax_data_pooled if pooled else scrape_tax_data
+    config = crud.get_bot_config(db, bot.id, CONFIG_KEY, default=DEFAULT_TAX_CONFIG)
     table_selector = str(config.get("table_selector") or "table")
+    deadline_seconds = config.get("run_deadline_seconds", DEFAULT_TAX_CONFIG["run_deadline_seconds"])
+    ttl_seconds = config.get("freshness_ttl_seconds") or DEFAULT_TAX_CONFIG["freshness_ttl_seconds"]
+    started = time.perf_counter()
+
+    def finish(result: dict[str, Any]) -> dict[str, Any]:
+        run_metrics.observe_run(bot.slug, result["status"], time.perf_counter() - started)
+        if event_callback:
+            event_callback({"type": "run_finished", **result})
+        return result
 
     if event_callback:
         event_callback({"type": "run_started", "run_id": run.id, "bot_slug": bot.slug})
 
     try:
+        source_urls, source_count, incremental_details = _select_sources(
+            db, bot.id, source_urls, incremental, ttl_seconds
+        )
+        # URLs checkpointed by an earlier attempt at this run are carried over, not re-scraped.
+        resumed = checkpoints.completed(db, run.id)
+        # Kept with the request's source_urls so a resume repeats the run the same way.
+        selection = {"source_count": source_count}
+        if explicit:
+            selection["source_urls"] = source_urls
+        if pooled:
+            selection["priority"] = True
+        if incremental_details:
+            if event_callback:
+                event_callback({"type": "incremental_selected", "run_id": run.id, **incremental_details})
+            if not source_count:
+                details_json = {**selection, "url_counts": {}, "incremental": incremental_details}
+                crud.finalize_run(db, run, status="success", error_summary=None, details_json=details_json)
+                result = {
+                    "status": "success",
+                    "run_id": run.id,
+                    "bot_slug": bot.slug,
+                    "error_summary": None,
+                    "details_json": details_json,
+                    "snapshot_count": 0,
+                }
+                return finish(result)
+
+        if resumed:
+            selection["resumed"] = len(resumed)
+            # A restart can land between a checkpoint and the batch that would have recorded it.
+            run_results.record(db, run.id, resumed.values())
+            db.commit()
+            source_urls = (url for url in source_urls if url not in resumed)
+
+        def checkpoint(url_result: dict[str, Any], snapshot: dict[str, Any]):
+            checkpoints.stage(db, run.id, url_result, snapshot)
+
+        store = artifacts.ContentAddressedStore(settings.artifacts_dir)
+        phase_timings = PhaseTimingSummary()
+        recorded = failures = artifact_count = 0
+        index_errors: dict[str, str] = {}
+
+        def record_batch(batch: list[dict[str, Any]]):
+            nonlocal recorded, failures, artifact_count
+            run_results.record(db, run.id, batch)
+            db.commit()
+            try:
+                artifact_count += artifacts.record_run_artifacts(db, store, bot.id, run.id, batch, start=recorded + 1)
+            except Exception as exc:
+                # Screenshots are evidence, not results; indexing trouble must not fail the run.
+                db.rollback()
+                index_errors.setdefault("artifact_index_error", str(exc))
+            try:
+                latency.record_url_results(db, bot.id, batch)
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                index_errors.setdefault("latency_stats_error", str(exc))
+            run_metrics.observe_url_results(bot.slug, batch)
+            phase_timings.add(batch)
+            recorded += len(batch)
+            failures += sum(1 for item in batch if item.get("status") != "success")
+
         scrape_result = scraper_func(
             run_id=run.id,
-            source_urls=list(settings.tax_source_urls),
+            source_urls=source_urls,
             artifacts_dir=settings.artifacts_dir,
             table_selector=table_selector,
             event_callback=event_callback,
+            artifact_workers=settings.artifact_writer_workers,
+            artifact_max_pending=settings.artifact_writer_max_pending,
+            trace_slowest=trace_slowest,
+            cancel_token=cancel_token,
+            deadline_seconds=deadline_seconds,
+            checkpoint_callback=checkpoint,
+            results_callback=record_batch,
         )
 
+        # Scrapers that return results and snapshots instead of handing them over are recorded here.
         url_results = scrape_result.get("url_results") or []
-        snapshots = scrape_result.get("snapshots") or []
-        failures = [item for item in url_results if item.get("status") != "success"]
+        by_url = {item.get("source_url"): item for item in url_results}
+        for snapshot in scrape_result.get("snapshots") or []:
+            checkpoint(by_url.get(snapshot["source_url"]) or {}, snapshot)
+        if url_results:
+            record_batch(url_results)
 
+        url_counts = run_results.counts(db, run.id)
         details_json = {
             "artifacts_root": scrape_result.get("artifacts_root"),
-            "source_urls": list(settings.tax_source_urls),
-            "url_results": url_results,
+            **selection,
+            "url_counts": url_counts,
+            "phase_timings": phase_timings.as_dict(),
+            "scrape_duration_ms": round((time.perf_counter() - started) * 1000, 3),
+            **index_errors,
         }
+        if "artifact_index_error" not in index_errors:
+            details_json["artifact_count"] = artifact_count
+        if scrape_result.get("artifact_writes"):
+            details_json["artifact_writes"] = scrape_result["artifact_writes"]
+        if scrape_result.get("trace"):
+            details_json["trace"] = scrape_result["trace"]
+        if scrape_result.get("deadline"):
+            details_json["deadline"] = scrape_result["deadline"]
+        if incremental_details:
+            details_json["incremental"] = incremental_details
+
+        cancelled = bool(scrape_result.get("cancelled"))
+        complete = not cancelled and not failures
+        # Complete runs always promote; partial_commit also publishes what an incomplete run staged.
+        promote = complete or bool(config.get("partial_commit"))
+        created = []
+        if promote:
+            commit_started = time.perf_counter()
+            created = checkpoints.promote(db, bot.id, run.id, final=complete)
+            commit_seconds = time.perf_counter() - commit_started
+            run_metrics.observe_phase(bot.slug, "db_commit", commit_seconds)
+            details_json["saved_snapshot_ids"] = [row.id for row in created]
+            details_json["phase_timings"]["db_commit"] = {
+                "count": 1,
+                "total_ms": round(commit_seconds * 1000, 3),
+                "max_ms": round(commit_seconds * 1000, 3),
+                "avg_ms": round(commit_seconds * 1000, 3),
+            }
+            if not complete:
+                details_json["partial_commit"] = True
+            if event_callback:
+                event_callback(
+                    {
+                        "type": "db_committed",
+                        "run_id": run.id,
+                        "bot_slug": bot.slug,
+                        "snapshot_count": len(created),
+                        "db_commit_ms": round(commit_seconds * 1000, 3),
+                    }
+                )
+
+        try:
+            # Staged successes only count as fresh once they are visible.
+            for outcomes in run_results.iter_chunks(db, run.id, exclude_status=None if promote else "success"):
+                sources.record_outcomes(db, bot.id, outcomes)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            details_json["source_status_error"] = str(exc)
+
+        if cancelled:
+            # Finished URLs stay checkpointed so the run can be resumed.
+            error_summary = (cancel_token.reason if cancel_token else None) or "Run cancelled"
+            details_json["cancelled"] = True
+            crud.finalize_run(
+                db,
+                run,
+                status="cancelled",
+                error_summary=error_summary,
+                details_json=details_json,
+            )
+            result = {
+                "status": "cancelled",
+                "run_id": run.id,
+                "bot_slug": bot.slug,
+                "error_summary": error_summary,
+                "details_json": details_json,
+                "snapshot_count": len(created),
+            }
+            return finish(result)
 
         if failures:
             error_summary = (
-                f"Run failed: {len(failures)} of {len(url_results)} source URL(s) did not return structured table data"
+                f"Run failed: {failures} of {sum(url_counts.values())} source URL(s) did not return structured table data"
             )
+            deadline = details_json.get("deadline") or {}
+            if deadline.get("exceeded"):
+                error_summary += (
+                    f" (run deadline of {deadline['seconds']:g}s exceeded; {deadline['skipped']} URL(s) skipped)"
+                )
             crud.finalize_run(
                 db,
                 run,
@@ -62,14 +254,9 @@ def run_tax_refresh(
                 "bot_slug": bot.slug,
                 "error_summary": error_summary,
                 "details_json": details_json,
-                "snapshot_count": 0,
+                "snapshot_count": len(created),
             }
-            if event_callback:
-                event_callback({"type": "run_finished", **result})
-            return result
-
-        created = crud.create_tax_property_snapshots(db, bot.id, run.id, snapshots)
-        details_json["saved_snapshot_ids"] = [row.id for row in created]
+            return finish(result)
 
         crud.finalize_run(
             db,
@@ -78,17 +265,6 @@ def run_tax_refresh(
             error_summary=None,
             details_json=details_json,
         )
-
-        if event_callback:
-            event_callback(
-                {
-                    "type": "db_committed",
-                    "run_id": run.id,
-                    "bot_slug": bot.slug,
-                    "snapshot_count": len(created),
-                }
-            )
-
         result = {
             "status": "success",
             "run_id": run.id,
@@ -97,12 +273,12 @@ def run_tax_refresh(
             "details_json": details_json,
             "snapshot_count": len(created),
         }
-        if event_callback:
-            event_callback({"type": "run_finished", **result})
-        return result
+        return finish(result)
 
     except Exception as exc:
-        details_json = {"fatal_error": str(exc)}
+        db.rollback()
+        # Keep the queued request (source_urls/incremental) so the run can still be resumed.
+        details_json = {**(run.details_json or {}), "fatal_error": str(exc)}
         crud.finalize_run(
             db,
             run,
@@ -118,6 +294,28 @@ def run_tax_refresh(
             "details_json": details_json,
             "snapshot_count": 0,
         }
-        if event_callback:
-            event_callback({"type": "run_finished", **result})
-        return result
+        return finish(result)
+
+
+def _select_sources(
+    db: Session,
+    bot_id: int,
+    source_urls: list[str] | None,
+    incremental: bool,
+    ttl_seconds: float,
+) -> tuple[Iterable[str], int, dict[str, Any] | None]:
+    """Returns (urls to scrape, how many, incremental summary or None)."""
+    if source_urls is not None:
+        selected = list(source_urls)
+        if not incremental:
+            return selected, len(selected), None
+        stale = freshness.stale_source_urls(db, bot_id, selected, ttl_seconds)
+        return stale, len(stale), {"ttl_seconds": ttl_seconds, "stale": len(stale), "fresh": len(selected) - len(stale)}
+
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds) if incremental else None
+    count = sources.count_enabled(db, bot_id, stale_before)
+    urls = sources.iter_source_urls(db, bot_id, stale_before)
+    if not incremental:
+        return urls, count, None
+    fresh = sources.count_enabled(db, bot_id) - count
+    return urls, count, {"ttl_seconds": ttl_seconds, "stale": count, "fresh": fresh}
@@ -2,26 +2,74 @@ from __future__ import annotations
 
 import asyncio
 import re
+import time
+from contextlib import asynccontextmanager, nullcontext
 from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation
 from pathlib import Path
-from typing import Any, Callable
-from urllib.parse import parse_qs, urlparse
+from typing import TYPE_CHECKING, Any, Callable, Iterable
 
-from playwright.async_api import Page
-from playwright.async_api import async_playwright
+from app.artifacts import ArtifactWriter, ContentAddressedStore
+from app.bots.tax.config import account_number_from_url
+from app.browser_pool import browser_pool
+from app.cancellation import CancelToken
+from app.politeness import HostGuards, RetryPolicy, host_guards, is_transient, retry_policy
+from app.run_metrics import PhaseTimer
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page
 
 Money = Decimal
 EventCallback = Callable[[dict[str, Any]], None]
+# checkpoint_callback(url_result, snapshot) for each URL scraped successfully.
+CheckpointCallback = Callable[[dict[str, Any], dict[str, Any]], None]
+ResultsCallback = Callable[[list[dict[str, Any]]], None]
+# url_results handed to a ResultsCallback at a time.
+RESULTS_BATCH_SIZE = 200
+TRACE_FILENAME = "trace-slowest.zip"
+GOTO_TIMEOUT_MS = 45000
+REDIRECT_TIMEOUT_MS = 15000
+SELECTOR_TIMEOUT_MS = 20000
+# Playwright's own default, used for screenshots, locators and text reads.
+DEFAULT_STEP_TIMEOUT_MS = 30000
 _MONEY_RE = re.compile(r"\$?\s*([0-9]{1,3}(?:,[0-9]{3})*(?:\.[0-9]{2})?)")
 
 
+class RunDeadline:
+    """Wall-clock budget for a whole run.
+
+    Each Playwright step gets ``min(step timeout, remaining budget)``; once
+    the budget is spent steps get 1 ms (Playwright treats 0 as "no timeout")
+    and fail straight away.
+    """
+
+    def __init__(self, seconds: float | None = None, clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self._clock = clock
+        self._expires_at = None if seconds is None else clock() + seconds
+
+    def remaining_ms(self) -> float | None:
+        if self._expires_at is None:
+            return None
+        return max(0.0, (self._expires_at - self._clock()) * 1000)
+
+    @property
+    def expired(self) -> bool:
+        return self._expires_at is not None and self._clock() >= self._expires_at
+
+    def timeout(self, step_ms: float) -> float:
+        remaining = self.remaining_ms()
+        if remaining is None:
+            return step_ms
+        return max(1.0, min(step_ms, remaining))
+
+
 def _normalize_text(text: str) -> str:
     return re.sub(r"\s+", " ", text or "").strip()
 
 
 def _extract_account_number(url: str) -> str | None:
-    return parse_qs(urlparse(url).query).get("number", [None])[0]
+    return account_number_from_url(url)
 
 
 def _artifact_rel(path: Path, artifacts_root: Path) -> str:
@@ -45,6 +93,13 @@ def _parse_money(text: str) -> Money | None:
         return None
 
 
+async def _capture_screenshot(page: Page, writer: ArtifactWriter) -> str:
+    # Only the capture is awaited here; compression and the disk write run
+    # on the writer pool while navigation continues.
+    data = await page.screenshot(full_page=True)
+    return await writer.submit(data, ext="png")
+
+
 async def _extract_tables(page: Page, table_selector: str) -> list[dict[str, Any]]:
     tables: list[dict[str, Any]] = []
     table_locator = page.locator(table_selector)
@@ -139,16 +194,21 @@ def _build_redirect_chain(response) -> list[str]:
 async def _scrape_single_url(
     page: Page,
     source_url: str,
-    artifacts_root: Path,
-    run_dir: Path,
+    writer: ArtifactWriter,
     index: int,
     table_selector: str,
     event_callback: EventCallback | None,
+    deadline: RunDeadline | None = None,
 ) -> dict[str, Any]:
     account_number = _extract_account_number(source_url)
-    slug = account_number or f"url_{index}"
-    url_dir = run_dir / f"{index:02d}_{slug}"
-    url_dir.mkdir(parents=True, exist_ok=True)
+    timer = PhaseTimer()
+    deadline = deadline or RunDeadline()
+
+    def budget(step_ms: float) -> float:
+        # Also clamps calls without an explicit timeout (screenshots, locators).
+        timeout = deadline.timeout(step_ms)
+        page.set_default_timeout(deadline.timeout(DEFAULT_STEP_TIMEOUT_MS))
+        return timeout
 
     if event_callback:
         event_callback(
@@ -160,22 +220,29 @@ async def _scrape_single_url(
             }
         )
 
-    before_path = url_dir / "before.png"
-    await page.screenshot(path=str(before_path), full_page=True)
+    budget(DEFAULT_STEP_TIMEOUT_MS)
+    with timer.phase("screenshot"):
+        before_artifact = await _capture_screenshot(page, writer)
 
     try:
-        response = await page.goto(source_url, wait_until="domcontentloaded", timeout=45000)
-        if response is None:
-            raise RuntimeError("No HTTP response received from source URL")
-
-        await page.wait_for_function(
-            """([startUrl, selector]) => {
-                return window.location.href !== startUrl || !!document.querySelector(selector);
-            }""",
-            arg=[source_url, table_selector],
-            timeout=15000,
-        )
-        await page.wait_for_selector(table_selector, timeout=20000)
+        with timer.phase("goto"):
+            response = await page.goto(source_url, wait_until="domcontentloaded", timeout=budget(GOTO_TIMEOUT_MS))
+            # Inside the phase so politeness can tell an unhealthy host from a page without data.
+            if response is None:
+                raise RuntimeError("No HTTP response received from source URL")
+            if response.status == 429 or response.status >= 500:
+                raise RuntimeError(f"HTTP {response.status} from source URL")
+
+        with timer.phase("wait_for_redirect"):
+            await page.wait_for_function(
+                """([startUrl, selector]) => {
+                    return window.location.href !== startUrl || !!document.querySelector(selector);
+                }""",
+                arg=[source_url, table_selector],
+                timeout=budget(REDIRECT_TIMEOUT_MS),
+            )
+        with timer.phase("wait_for_selector"):
+            await page.wait_for_selector(table_selector, timeout=budget(SELECTOR_TIMEOUT_MS))
 
         final_url = page.url
         redirect_chain = _build_redirect_chain(response)
@@ -191,10 +258,13 @@ async def _scrape_single_url(
         if event_callback:
             event_callback(redirect_event)
 
-        after_redirect_path = url_dir / "after_redirect.png"
-        await page.screenshot(path=str(after_redirect_path), full_page=True)
+        budget(DEFAULT_STEP_TIMEOUT_MS)
+        with timer.phase("screenshot"):
+            after_redirect_artifact = await _capture_screenshot(page, writer)
 
-        tables = await _extract_tables(page, table_selector)
+        budget(DEFAULT_STEP_TIMEOUT_MS)
+        with timer.phase("extract_tables"):
+            tables = await _extract_tables(page, table_selector)
         if not tables:
             raise RuntimeError("Structured table data not found on page")
 
@@ -203,8 +273,10 @@ async def _scrape_single_url(
             raise RuntimeError("Property address could not be extracted from structured table data")
         total_due = _extract_total_due(tables)
 
-        parsed_path = url_dir / "parsed.png"
-        await page.screenshot(path=str(parsed_path), full_page=True)
+        budget(DEFAULT_STEP_TIMEOUT_MS)
+        with timer.phase("screenshot"):
+            parsed_artifact = await _capture_screenshot(page, writer)
+        timings_ms = timer.as_dict()
 
         url_result = {
             "status": "success",
@@ -216,10 +288,11 @@ async def _scrape_single_url(
             "table_count": len(tables),
             "redirect_chain": redirect_chain,
             "artifacts": {
-                "before": _artifact_rel(before_path, artifacts_root),
-                "after_redirect": _artifact_rel(after_redirect_path, artifacts_root),
-                "parsed": _artifact_rel(parsed_path, artifacts_root),
+                "before": before_artifact,
+                "after_redirect": after_redirect_artifact,
+                "parsed": parsed_artifact,
             },
+            "timings_ms": timings_ms,
         }
 
         if event_callback:
@@ -231,6 +304,7 @@ async def _scrape_single_url(
                     "property_address": property_address,
                     "total_due": str(total_due),
                     "property_index": index,
+                    "timings_ms": timings_ms,
                 }
             )
 
@@ -253,10 +327,11 @@ async def _scrape_single_url(
         }
 
     except Exception as exc:
-        error_path = url_dir / "error.png"
+        # Read before the error screenshot so its own failure cannot mask the cause.
+        failed_phase = timer.failed_phase
         try:
-            await page.screenshot(path=str(error_path), full_page=True)
-            error_artifact = _artifact_rel(error_path, artifacts_root)
+            with timer.phase("screenshot"):
+                error_artifact = await _capture_screenshot(page, writer)
         except Exception:
             error_artifact = ""
 
@@ -267,6 +342,9 @@ async def _scrape_single_url(
             excerpt = ""
 
         error = f"{exc}"
+        if deadline.expired:
+            error = f"Run deadline of {deadline.seconds:g}s exceeded during {failed_phase or 'scrape'}: {error}"
+        timings_ms = timer.as_dict()
         failure = {
             "status": "failed",
             "source_url": source_url,
@@ -275,9 +353,11 @@ async def _scrape_single_url(
             "error": error,
             "excerpt": excerpt,
             "artifacts": {
-                "before": _artifact_rel(before_path, artifacts_root),
+                "before": before_artifact,
                 "error": error_artifact,
             },
+            "timings_ms": timings_ms,
+            "failed_phase": failed_phase,
         }
 
         if event_callback:
@@ -288,65 +368,344 @@ async def _scrape_single_url(
                     "source_account_number": account_number,
                     "error": error,
                     "property_index": index,
+                    "timings_ms": timings_ms,
                 }
             )
 
         return {"url_result": failure, "snapshot": None}
 
 
+async def _keep_slowest_trace(
+    context: BrowserContext,
+    run_dir: Path,
+    artifacts_root: Path,
+    url_result: dict[str, Any],
+    slowest: dict[str, Any] | None,
+) -> dict[str, Any] | None:
+    total_ms = (url_result.get("timings_ms") or {}).get("total", 0.0)
+    if slowest is not None and total_ms <= slowest["total_ms"]:
+        # Stopping a chunk without a path discards it.
+        await context.tracing.stop_chunk()
+        return slowest
+
+    trace_path = run_dir / TRACE_FILENAME
+    await context.tracing.stop_chunk(path=str(trace_path))
+    return {
+        "path": _artifact_rel(trace_path, artifacts_root),
+        "source_url": url_result.get("source_url"),
+        "total_ms": total_ms,
+    }
+
+
+def _unattempted_result(source_url: str, status: str, reason: str) -> dict[str, Any]:
+    return {
+        "status": status,
+        "source_url": source_url,
+        "source_account_number": _extract_account_number(source_url),
+        "error": reason,
+        "artifacts": {},
+    }
+
+
+async def _scrape_or_cancel(page: Page, cancelled: asyncio.Event, **kwargs) -> dict[str, Any] | None:
+    """Run one URL, abandoning it as soon as ``cancelled`` is set.
+
+    Returns None when cancelled; the page is closed first so in-flight
+    Playwright calls fail fast instead of waiting out their timeouts.
+    """
+    scrape = asyncio.ensure_future(_scrape_single_url(page=page, **kwargs))
+    cancel_wait = asyncio.ensure_future(cancelled.wait())
+    try:
+        await asyncio.wait({scrape, cancel_wait}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        cancel_wait.cancel()
+    if scrape.done():
+        return scrape.result()
+
+    await page.close()
+    scrape.cancel()
+    await asyncio.gather(scrape, return_exceptions=True)
+    return None
+
+
+async def _pause(seconds: float, cancelled: asyncio.Event) -> bool:
+    """Sleep unless cancelled first; returns False when cancelled."""
+    if seconds <= 0:
+        return not cancelled.is_set()
+    try:
+        await asyncio.wait_for(cancelled.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        return True
+    return False
+
+
+async def _scrape_politely(
+    context: BrowserContext,
+    cancelled: asyncio.Event,
+    deadline: RunDeadline,
+    source_url: str,
+    index: int,
+    event_callback: EventCallback | None,
+    guards: HostGuards | None = None,
+    policy: RetryPolicy | None = None,
+    **kwargs,
+) -> dict[str, Any] | None:
+    """Scrape one URL within its host's rate limit and circuit breaker.
+
+    Transient failures (navigation timeouts, connection errors, 429/5xx) are retried
+    with full-jitter exponential backoff while attempts and the run deadline
+    allow. A URL whose rate-limit slot falls after the run deadline is
+    skipped rather than sent early, and failures once the deadline has passed
+    are not held against the host. The returned ``url_result`` records
+    ``attempts``, ``rate_limited_ms`` and the host's ``breaker_state``;
+    returns None when cancelled.
+    """
+    guard = (guards or host_guards).for_url(source_url)
+    policy = policy or retry_policy
+    attempt = 0
+    waited = 0.0
+    outcome: dict[str, Any] | None = None
+    while grant := guard.breaker.allow():
+        try:
+            wait = guard.bucket.reserve()
+            remaining_ms = deadline.remaining_ms()
+            if remaining_ms is not None and wait * 1000 >= remaining_ms:
+                # Going out early would break the host's rate limit, so hand the token back.
+                guard.bucket.refund()
+                if outcome is None:
+                    reason = f"Run deadline of {deadline.seconds:g}s exceeded before this URL's rate-limit slot"
+                    outcome = {"url_result": _unattempted_result(source_url, "skipped", reason), "snapshot": None}
+                break
+            attempt += 1
+            waited += wait
+            if not await _pause(wait, cancelled):
+                return None
+
+            page = await context.new_page()
+            try:
+                outcome = await _scrape_or_cancel(
+                    page,
+                    cancelled,
+                    source_url=source_url,
+                    index=index,
+                    event_callback=event_callback,
+                    deadline=deadline,
+                    **kwargs,
+                )
+            finally:
+                if not page.is_closed():
+                    await page.close()
+            if outcome is None:
+                return None
+
+            url_result = outcome["url_result"]
+            if url_result["status"] != "success" and deadline.expired:
+                # Running out of run time says nothing about the host's health.
+                break
+            transient = url_result["status"] != "success" and is_transient(url_result)
+            # Only transient errors say the host is unhealthy; a page we cannot parse still answered.
+            if transient:
+                guard.breaker.record_failure()
+            else:
+                guard.breaker.record_success()
+            if not transient or attempt >= policy.max_attempts:
+                break
+
+            delay = policy.delay_seconds(attempt)
+            remaining_ms = deadline.remaining_ms()
+            if remaining_ms is not None and delay * 1000 >= remaining_ms:
+                break
+            if event_callback:
+                event_callback(
+                    {
+                        "type": "url_retrying",
+                        "source_url": source_url,
+                        "property_index": index,
+                        "attempt": attempt,
+                        "delay_ms": round(delay * 1000, 3),
+                        "error": url_result.get("error"),
+                    }
+                )
+            if not await _pause(delay, cancelled):
+                return None
+        finally:
+            # A cancelled or aborted probe must not leave the breaker half-open forever.
+            if grant == "probe":
+                guard.breaker.release_probe()
+
+    if outcome is None:
+        skipped = _unattempted_result(source_url, "skipped", f"Circuit breaker open for {guard.host}")
+        outcome = {"url_result": skipped, "snapshot": None}
+    outcome["url_result"].update(
+        attempts=attempt,
+        rate_limited_ms=round(waited * 1000, 3),
+        breaker_state=guard.breaker.state,
+    )
+    return outcome
+
+
+@asynccontextmanager
+async def _launch_browser():
+    # Imported here so the API process only pays for Playwright when a scrape runs.
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        try:
+            yield browser
+        finally:
+            await browser.close()
+
+
 async def _scrape_all_async(
     run_id: int,
-    source_urls: list[str],
+    source_urls: Iterable[str],
     artifacts_root: Path,
     event_callback: EventCallback | None,
     table_selector: str = "table",
+    artifact_workers: int = 2,
+    artifact_max_pending: int = 8,
+    trace_slowest: bool = False,
+    cancel_token: CancelToken | None = None,
+    deadline_seconds: float | None = None,
+    browser: Browser | None = None,
+    checkpoint_callback: CheckpointCallback | None = None,
+    results_callback: ResultsCallback | None = None,
 ) -> dict[str, Any]:
+    """Scrape ``source_urls`` in order and return the run's outcome.
+
+    With ``results_callback`` the url_results are handed over in batches once
+    their screenshots are on disk and are not kept for the returned dict.
+    """
+    # Started before the browser launches so launch time counts against the budget.
+    deadline = RunDeadline(deadline_seconds)
     run_dir = artifacts_root / "runs" / f"run_{run_id}"
     run_dir.mkdir(parents=True, exist_ok=True)
 
+    writer = ArtifactWriter(
+        ContentAddressedStore(artifacts_root),
+        max_workers=artifact_workers,
+        max_pending=artifact_max_pending,
+    )
     url_results: list[dict[str, Any]] = []
     snapshots: list[dict[str, Any]] = []
-
-    async with async_playwright() as playwright:
-        browser = await playwright.chromium.launch(headless=True)
+    deadline_skipped = 0
+
+    def keep(url_result: dict[str, Any]):
+        nonlocal deadline_skipped
+        if url_result["status"] == "skipped" and str(url_result.get("error") or "").startswith("Run deadline"):
+            deadline_skipped += 1
+        url_results.append(url_result)
+
+    async def hand_over(final: bool = False):
+        nonlocal url_results
+        if results_callback is None or not url_results or (len(url_results) < RESULTS_BATCH_SIZE and not final):
+            return
+        if not final:
+            # The batch's screenshots must be on disk before it is indexed.
+            await writer.flush()
+        batch, url_results = url_results, []
+        results_callback(batch)
+
+    loop = asyncio.get_running_loop()
+    cancelled = asyncio.Event()
+    if cancel_token is not None:
+        cancel_token.add_callback(lambda: loop.call_soon_threadsafe(cancelled.set))
+
+    # A borrowed (pooled) browser is left running; only our context is closed.
+    async with _launch_browser() if browser is None else nullcontext(browser) as browser:
         context = await browser.new_context()
+        slowest_trace: dict[str, Any] | None = None
+        if trace_slowest:
+            await context.tracing.start(screenshots=True, snapshots=True)
         try:
             for index, source_url in enumerate(source_urls, start=1):
-                page = await context.new_page()
-                try:
-                    outcome = await _scrape_single_url(
-                        page=page,
-                        source_url=source_url,
-                        artifacts_root=artifacts_root,
-                        run_dir=run_dir,
-                        index=index,
-                        table_selector=table_selector,
-                        event_callback=event_callback,
+                skip_reason = None
+                if cancelled.is_set():
+                    skip_reason = "Run cancelled before this URL"
+                elif deadline.expired:
+                    skip_reason = f"Run deadline of {deadline.seconds:g}s exceeded before this URL"
+                if skip_reason:
+                    keep(_unattempted_result(source_url, "skipped", skip_reason))
+                    await hand_over()
+                    if event_callback:
+                        event_callback(
+                            {
+                                "type": "url_skipped",
+                                "source_url": source_url,
+                                "property_index": index,
+                                "reason": skip_reason,
+                            }
+                        )
+                    continue
+                if trace_slowest:
+                    await context.tracing.start_chunk(title=source_url)
+                outcome = await _scrape_politely(
+                    context,
+                    cancelled,
+                    deadline,
+                    source_url=source_url,
+                    index=index,
+                    event_callback=event_callback,
+                    writer=writer,
+                    table_selector=table_selector,
+                )
+
+                if outcome is None:
+                    keep(_unattempted_result(source_url, "cancelled", "Run cancelled while scraping"))
+                    if event_callback:
+                        event_callback({"type": "url_cancelled", "source_url": source_url, "property_index": index})
+                    continue
+
+                if trace_slowest:
+                    slowest_trace = await _keep_slowest_trace(
+                        context, run_dir, artifacts_root, outcome["url_result"], slowest_trace
                     )
-                finally:
-                    await page.close()
 
-                url_results.append(outcome["url_result"])
-                if outcome["snapshot"]:
+                keep(outcome["url_result"])
+                if outcome["snapshot"] and checkpoint_callback:
+                    # Persisted as it finishes, so it is not also held for the end of the run.
+                    checkpoint_callback(outcome["url_result"], outcome["snapshot"])
+                elif outcome["snapshot"]:
                     snapshots.append(outcome["snapshot"])
+                await hand_over()
         finally:
             await context.close()
-            await browser.close()
+            artifact_writes = await writer.close()
+    await hand_over(final=True)
+
+    if event_callback:
+        event_callback({"type": "artifacts_flushed", **artifact_writes})
 
     return {
         "run_id": run_id,
         "artifacts_root": _artifact_rel(run_dir, artifacts_root),
         "url_results": url_results,
         "snapshots": snapshots,
+        "artifact_writes": artifact_writes,
+        "trace": slowest_trace,
+        "cancelled": cancelled.is_set(),
+        "deadline": {
+            "seconds": deadline.seconds,
+            "exceeded": deadline.expired,
+            "skipped": deadline_skipped,
+        },
     }
 
 
 def scrape_tax_data(
     run_id: int,
-    source_urls: list[str],
+    source_urls: Iterable[str],
     artifacts_dir: str,
     table_selector: str = "table",
     event_callback: EventCallback | None = None,
+    artifact_workers: int = 2,
+    artifact_max_pending: int = 8,
+    trace_slowest: bool = False,
+    cancel_token: CancelToken | None = None,
+    deadline_seconds: float | None = None,
+    checkpoint_callback: CheckpointCallback | None = None,
+    results_callback: ResultsCallback | None = None,
 ) -> dict[str, Any]:
     artifacts_root = Path(artifacts_dir)
     artifacts_root.mkdir(parents=True, exist_ok=True)
@@ -357,12 +716,44 @@ def scrape_tax_data(
             artifacts_root=artifacts_root,
             event_callback=event_callback,
             table_selector=table_selector,
+            artifact_workers=artifact_workers,
+            artifact_max_pending=artifact_max_pending,
+            trace_slowest=trace_slowest,
+            cancel_token=cancel_token,
+            deadline_seconds=deadline_seconds,
+            checkpoint_callback=checkpoint_callback,
+            results_callback=results_callback,
+        )
+    )
+
+
+def scrape_tax_data_pooled(
+    run_id: int,
+    source_urls: Iterable[str],
+    artifacts_dir: str,
+    **kwargs: Any,
+) -> dict[str, Any]:
+    """Same as ``scrape_tax_data`` but on the shared warm browser.
+
+    Meant for small on-demand scrapes where a browser launch would dominate
+    the latency.
+    """
+    artifacts_root = Path(artifacts_dir)
+    artifacts_root.mkdir(parents=True, exist_ok=True)
+    return browser_pool.run(
+        lambda browser: _scrape_all_async(
+            run_id=run_id,
+            source_urls=source_urls,
+            artifacts_root=artifacts_root,
+            browser=browser,
+            **kwargs,
         )
     )
 
 
 __all__ = [
     "scrape_tax_data",
+    "scrape_tax_data_pooled",
     "_extract_property_address",
     "_extract_total_due",
 ]
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, TypeVar
+
+from app.settings import get_settings
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Playwright
+
+logger = logging.getLogger("app.browser_pool")
+
+T = TypeVar("T")
+
+
+class BrowserPool:
+    """One warm headless Chromium shared by short on-demand scrapes.
+
+    Playwright objects belong to the event loop that created them, so the
+    browser lives on a dedicated loop thread and callers hand it coroutines
+    through ``run``. Each caller opens its own context; the browser is closed
+    after ``idle_seconds`` without a lease, and ``on_close`` is called once it
+    is gone. ``launcher`` replaces the Playwright Chromium launch.
+    """
+
+    def __init__(
+        self,
+        idle_seconds: float = 300.0,
+        launcher: Callable[[], Awaitable[Browser]] | None = None,
+        on_close: Callable[[], None] | None = None,
+    ):
+        self.idle_seconds = idle_seconds
+        self.on_close = on_close
+        self._launcher = launcher or self._launch_chromium
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._launch_lock = asyncio.Lock()
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._idle_handle: asyncio.TimerHandle | None = None
+        self._in_use = 0
+        self.launches = 0
+        self.leases = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._browser is not None
+
+    def run(self, func: Callable[[Browser], Awaitable[T]]) -> T:
+        """Run ``func(browser)`` on the pool loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(self._lease(func), self._ensure_loop()).result()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._launch_lock = asyncio.Lock()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _lease(self, func: Callable[[Browser], Awaitable[T]]) -> T:
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        self._in_use += 1
+        self.leases += 1
+        try:
+            return await func(await self._get_browser())
+        finally:
+            self._in_use -= 1
+            if not self._in_use:
+                loop = asyncio.get_running_loop()
+                self._idle_handle = loop.call_later(
+                    self.idle_seconds, lambda: loop.create_task(self._close_browser())
+                )
+
+    async def _get_browser(self) -> Browser:
+        async with self._launch_lock:
+            if self._browser is None or not self._browser.is_connected():
+                self._browser = await self._launcher()
+                self.launches += 1
+            return self._browser
+
+    async def _launch_chromium(self) -> Browser:
+        from playwright.async_api import async_playwright
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=True)
+
+    async def _close_browser(self):
+        if self._in_use:
+            return
+        browser, playwright = self._browser, self._playwright
+        self._browser = self._playwright = None
+        try:
+            if browser is not None:
+                await browser.close()
+            if playwright is not None:
+                await playwright.stop()
+        except Exception:
+            logger.exception("Closing pooled browser failed")
+        if browser is not None and self.on_close is not None:
+            self.on_close()
+
+    def close(self, timeout: float = 10.0):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_browser(), loop).result(timeout)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "browser_open": self.is_open,
+            "in_use": self._in_use,
+            "launches": self.launches,
+            "leases": self.leases,
+            "idle_seconds": self.idle_seconds,
+        }
+
+
+browser_pool = BrowserPool(idle_seconds=get_settings().browser_pool_idle_seconds)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+
+class CancelToken:
+    """Thread-safe cancellation flag shared between the API and a run worker.
+
+    Callbacks let async code bridge the flag into its own loop (see
+    ``loop.call_soon_threadsafe``); a callback added after cancellation runs
+    immediately.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+        self.reason: str | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "Run cancelled") -> bool:
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+        return True
+
+    def add_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._event.wait(timeout)
+
+
+class RunCancellations:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: dict[int, CancelToken] = {}
+
+    def register(self, run_id: int) -> CancelToken:
+        with self._lock:
+            return self._tokens.setdefault(run_id, CancelToken())
+
+    def get(self, run_id: int) -> CancelToken | None:
+        with self._lock:
+            return self._tokens.get(run_id)
+
+    def cancel(self, run_id: int, reason: str = "Run cancelled") -> bool:
+        token = self.get(run_id)
+        return token.cancel(reason) if token else False
+
+    def discard(self, run_id: int):
+        with self._lock:
+            self._tokens.pop(run_id, None)
+
+
+run_cancellations = RunCancellations()
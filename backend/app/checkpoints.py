@@ -0,0 +1,70 @@
+"""Per-URL run checkpoints and their promotion into visible snapshots.
+
+Each successfully scraped URL is staged in ``run_checkpoints`` as soon as it
+finishes, so a crashed or cancelled run can be resumed without redoing that
+work. Snapshots only become visible to ``/properties/latest`` when the run is
+promoted, which happens in the same transaction as the snapshot inserts.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.models import RunCheckpoint, TaxPropertySnapshot
+
+
+def stage(db: Session, run_id: int, url_result: dict[str, Any], snapshot: dict[str, Any]) -> None:
+    """Checkpoint one scraped URL and commit; re-staging a URL replaces it."""
+    payload = {key: value for key, value in snapshot.items() if key != "scraped_at"}
+    row = (
+        db.query(RunCheckpoint)
+        .filter(RunCheckpoint.run_id == run_id, RunCheckpoint.source_url == snapshot["source_url"])
+        .first()
+    )
+    if row is None:
+        row = RunCheckpoint(run_id=run_id, source_url=snapshot["source_url"])
+        db.add(row)
+    row.url_result_json = url_result
+    row.snapshot_json = payload
+    row.scraped_at = snapshot["scraped_at"]
+    row.promoted = False
+    db.commit()
+
+
+def completed(db: Session, run_id: int) -> dict[str, dict[str, Any]]:
+    """URL results already checkpointed for the run, keyed by source URL."""
+    rows = (
+        db.query(RunCheckpoint.source_url, RunCheckpoint.url_result_json)
+        .filter(RunCheckpoint.run_id == run_id)
+        .order_by(RunCheckpoint.id)
+        .all()
+    )
+    return {source_url: url_result for source_url, url_result in rows}
+
+
+def promote(db: Session, bot_id: int, run_id: int, final: bool = True) -> list[TaxPropertySnapshot]:
+    """Copy staged snapshots into ``tax_property_snapshots`` atomically.
+
+    ``final`` drops the run's checkpoints in the same transaction; a partial
+    promotion keeps them (minus the snapshot payload) so a resume still skips
+    the promoted URLs.
+    """
+    rows = (
+        db.query(RunCheckpoint)
+        .filter(RunCheckpoint.run_id == run_id, RunCheckpoint.promoted.is_(False))
+        .order_by(RunCheckpoint.id)
+        .all()
+    )
+    snapshots = [{**row.snapshot_json, "scraped_at": row.scraped_at} for row in rows]
+    if final:
+        db.query(RunCheckpoint).filter(RunCheckpoint.run_id == run_id).delete(synchronize_session=False)
+    else:
+        for row in rows:
+            row.promoted = True
+            row.snapshot_json = None
+    # create_tax_property_snapshots commits, taking the checkpoint changes with it.
+    return crud.create_tax_property_snapshots(db, bot_id, run_id, snapshots)
+
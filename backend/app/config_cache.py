@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+import logging
+import select
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import BotConfig
+from app.settings import get_settings
+
+logger = logging.getLogger("app.config_cache")
+
+NOTIFY_CHANNEL = "bot_config_changed"
+
+
+@dataclass
+class _Entry:
+    row_id: str
+    version: int
+    config: dict
+    checked_at: float
+
+
+class ConfigCache:
+    """In-process cache of ``bot_configs`` rows keyed by ``(bot_id, key)``.
+
+    Entries are served without touching the database for
+    ``revalidate_seconds``; after that a version-only probe decides whether
+    the JSON has to be reloaded. Local writes invalidate immediately and other
+    processes hear about them through ``ConfigChangeListener``.
+    """
+
+    def __init__(self, revalidate_seconds: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self.revalidate_seconds = revalidate_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[int, str], _Entry] = {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def get(self, db: Session, bot_id: int, key: str) -> tuple[int, dict] | None:
+        cache_key = (bot_id, key)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and now - entry.checked_at < self.revalidate_seconds:
+                self.hits += 1
+                return entry.version, dict(entry.config)
+
+        if entry is not None:
+            probe = (
+                db.query(BotConfig.id, BotConfig.version)
+                .filter(BotConfig.bot_id == bot_id, BotConfig.key == key)
+                .first()
+            )
+            if probe is not None and tuple(probe) == (entry.row_id, entry.version):
+                with self._lock:
+                    self.revalidations += 1
+                    entry.checked_at = now
+                return entry.version, dict(entry.config)
+
+        row = (
+            db.query(BotConfig.id, BotConfig.version, BotConfig.config_json)
+            .filter(BotConfig.bot_id == bot_id, BotConfig.key == key)
+            .first()
+        )
+        with self._lock:
+            self.misses += 1
+            if row is None:
+                self._entries.pop(cache_key, None)
+                return None
+            self._entries[cache_key] = _Entry(row.id, row.version, dict(row.config_json or {}), now)
+        return row.version, dict(row.config_json or {})
+
+    def invalidate(self, bot_id: int | None = None, key: str | None = None):
+        with self._lock:
+            if bot_id is None:
+                self._entries.clear()
+            elif key is None:
+                for cache_key in [item for item in self._entries if item[0] == bot_id]:
+                    del self._entries[cache_key]
+            else:
+                self._entries.pop((bot_id, key), None)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "revalidate_seconds": self.revalidate_seconds,
+            }
+
+
+def notify_payload(bot_id: int, key: str, version: int) -> str:
+    return json.dumps({"bot_id": bot_id, "key": key, "version": version})
+
+
+class ConfigChangeListener:
+    """LISTENs for config writes from other processes (Postgres only)."""
+
+    def __init__(self, engine: Engine, cache: ConfigCache, poll_seconds: float = 5.0):
+        self.engine = engine
+        self.cache = cache
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self.engine.dialect.name != "postgresql" or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Config change listener failed; reconnecting")
+                # Anything may have changed while we were not listening.
+                self.cache.clear()
+                self._stop.wait(self.poll_seconds)
+
+    def _listen(self):
+        connection = self.engine.raw_connection()
+        try:
+            dbapi_connection = connection.dbapi_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            while not self._stop.is_set():
+                readable, _, _ = select.select([dbapi_connection], [], [], self.poll_seconds)
+                if not readable:
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    self._handle(dbapi_connection.notifies.pop(0).payload)
+        finally:
+            connection.invalidate()
+
+    def _handle(self, payload: str):
+        try:
+            message = json.loads(payload)
+            self.cache.invalidate(int(message["bot_id"]), message.get("key"))
+        except (ValueError, KeyError, TypeError):
+            self.cache.clear()
+
+
+bot_config_cache = ConfigCache(revalidate_seconds=get_settings().config_cache_ttl_seconds)
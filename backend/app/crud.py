@@ -2,48 +2,135 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from decimal import Decimal
+from typing import Callable, Iterable, Iterator
 
-from sqlalchemy import and_, desc, func, select
+from sqlalchemy import and_, desc, func, select, text
 from sqlalchemy.orm import Session
 
+from app import diffs, rollups, search, sources
+from app.bots.tax.config import CONFIG_KEY as TAX_CONFIG_KEY
+from app.bots.tax.config import DEFAULT_TAX_CONFIG, account_number_from_url
+from app.config_cache import NOTIFY_CHANNEL, bot_config_cache, notify_payload
 from app.models import Bot, BotConfig, BotRun, TaxPropertySnapshot
-
-DEFAULT_TAX_CONFIG = {
-    "version": "v1",
-    "table_selector": "table",
-    "source_urls_mode": "hard_coded",
-}
-
-
-def seed_tax_bot(db: Session) -> Bot:
-    bot = db.query(Bot).filter(Bot.slug == "tax").first()
+from app.settings import get_settings
+
+# Column order matches schemas.PropertySnapshotItem so row tuples can be
+# serialized straight into the wire format without building ORM objects.
+SNAPSHOT_ITEM_COLUMNS = (
+    TaxPropertySnapshot.id,
+    TaxPropertySnapshot.run_id,
+    TaxPropertySnapshot.source_url,
+    TaxPropertySnapshot.source_account_number,
+    TaxPropertySnapshot.final_url,
+    TaxPropertySnapshot.property_address,
+    TaxPropertySnapshot.total_due,
+    TaxPropertySnapshot.tables_json,
+    TaxPropertySnapshot.metadata_json,
+    TaxPropertySnapshot.scraped_at,
+)
+
+def seed_bot(
+    db: Session,
+    slug: str,
+    name: str,
+    config_key: str,
+    default_config: dict,
+    source_urls: Iterable[str] = (),
+    account_for_url: Callable[[str], str | None] | None = None,
+) -> Bot:
+    bot = db.query(Bot).filter(Bot.slug == slug).first()
     if not bot:
-        bot = Bot(slug="tax", name="Tax Bot v0")
+        bot = Bot(slug=slug, name=name)
         db.add(bot)
         db.commit()
         db.refresh(bot)
 
+    # Settings only seed an empty source list; afterwards the table is managed via the API.
+    if sources.seed_sources(db, bot.id, source_urls, account_for_url):
+        db.commit()
+
     config = (
         db.query(BotConfig)
-        .filter(BotConfig.bot_id == bot.id, BotConfig.key == "tax.default")
+        .filter(BotConfig.bot_id == bot.id, BotConfig.key == config_key)
         .first()
     )
     if not config:
-        config = BotConfig(bot_id=bot.id, key="tax.default", config_json=DEFAULT_TAX_CONFIG)
+        config = BotConfig(bot_id=bot.id, key=config_key, config_json=dict(default_config))
         db.add(config)
         db.commit()
     return bot
 
 
+def seed_tax_bot(db: Session) -> Bot:
+    return seed_bot(
+        db,
+        "tax",
+        "Tax Bot v0",
+        TAX_CONFIG_KEY,
+        DEFAULT_TAX_CONFIG,
+        source_urls=get_settings().tax_source_urls,
+        account_for_url=account_number_from_url,
+    )
+
+
 def get_bot_by_slug(db: Session, slug: str) -> Bot | None:
     return db.query(Bot).filter(Bot.slug == slug).first()
 
 
-def get_bot_config(db: Session, bot_id: int, key: str = "tax.default") -> dict:
-    config = db.query(BotConfig).filter(BotConfig.bot_id == bot_id, BotConfig.key == key).first()
-    if not config:
-        return DEFAULT_TAX_CONFIG
-    return config.config_json or DEFAULT_TAX_CONFIG
+class ConfigVersionConflict(Exception):
+    def __init__(self, current_version: int):
+        super().__init__(f"Config was modified concurrently (current version {current_version})")
+        self.current_version = current_version
+
+
+def get_bot_config(db: Session, bot_id: int, key: str = TAX_CONFIG_KEY, default: dict | None = None) -> dict:
+    cached = bot_config_cache.get(db, bot_id, key)
+    if cached is None or not cached[1]:
+        return dict(default or {})
+    return cached[1]
+
+
+def get_bot_config_row(db: Session, bot_id: int, key: str = TAX_CONFIG_KEY) -> BotConfig | None:
+    return db.query(BotConfig).filter(BotConfig.bot_id == bot_id, BotConfig.key == key).first()
+
+
+def update_bot_config(
+    db: Session,
+    bot_id: int,
+    config_json: dict,
+    key: str = TAX_CONFIG_KEY,
+    expected_version: int | None = None,
+) -> BotConfig:
+    config = (
+        db.query(BotConfig)
+        .filter(BotConfig.bot_id == bot_id, BotConfig.key == key)
+        .with_for_update()
+        .first()
+    )
+    if config is None:
+        if expected_version not in (None, 0):
+            raise ConfigVersionConflict(0)
+        config = BotConfig(bot_id=bot_id, key=key, config_json=config_json, version=1)
+        db.add(config)
+    else:
+        if expected_version is not None and expected_version != config.version:
+            db.rollback()
+            raise ConfigVersionConflict(config.version)
+        config.config_json = config_json
+        config.version += 1
+        config.updated_at = datetime.now(timezone.utc)
+    db.flush()
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Delivered on commit; other API/worker processes drop their cached copy.
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": NOTIFY_CHANNEL, "payload": notify_payload(bot_id, key, config.version)},
+        )
+    db.commit()
+    db.refresh(config)
+    bot_config_cache.invalidate(bot_id, key)
+    return config
 
 
 def list_bot_summaries(db: Session) -> list[dict]:
@@ -83,12 +170,14 @@ def list_recent_runs_for_bot(db: Session, bot_id: int, limit: int = 20) -> list[
     )
 
 
-def create_run(db: Session, bot_id: int) -> BotRun:
+def create_run(db: Session, bot_id: int, status: str = "running", details_json: dict | None = None) -> BotRun:
+    now = datetime.now(timezone.utc)
     run = BotRun(
         bot_id=bot_id,
-        status="running",
-        started_at=datetime.now(timezone.utc),
-        details_json={},
+        status=status,
+        queued_at=now if status == "queued" else None,
+        started_at=now,
+        details_json=dict(details_json or {}),
     )
     db.add(run)
     db.commit()
@@ -96,6 +185,65 @@ def create_run(db: Session, bot_id: int) -> BotRun:
     return run
 
 
+def has_active_run(db: Session, bot_id: int, since: datetime) -> bool:
+    """Whether a run queued or started after ``since`` is still unfinished.
+
+    ``since`` keeps runs orphaned by a crashed process from blocking forever.
+    """
+    return (
+        db.query(BotRun.id)
+        .filter(BotRun.bot_id == bot_id, BotRun.finished_at.is_(None), BotRun.started_at >= since)
+        .first()
+        is not None
+    )
+
+
+RESUMABLE_RUN_STATUSES = ("failed", "cancelled")
+
+
+def requeue_run(db: Session, run: BotRun) -> BotRun | None:
+    """Put a failed or cancelled run back in the queue; its checkpoints are kept.
+
+    The status check and the flip to ``queued`` are one UPDATE, so of two
+    concurrent resumes only one wins; the other gets None.
+    """
+    now = datetime.now(timezone.utc)
+    requeued = (
+        db.query(BotRun)
+        .filter(BotRun.id == run.id, BotRun.status.in_(RESUMABLE_RUN_STATUSES))
+        .update(
+            {
+                BotRun.status: "queued",
+                BotRun.queued_at: now,
+                BotRun.started_at: now,
+                BotRun.finished_at: None,
+                BotRun.error_summary: None,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    if not requeued:
+        return None
+    db.refresh(run)
+    return run
+
+
+def mark_run_started(db: Session, run: BotRun) -> float:
+    """Move a queued run to running; returns the seconds it spent queued."""
+    now = datetime.now(timezone.utc)
+    waited = 0.0
+    if run.queued_at is not None:
+        queued_at = run.queued_at if run.queued_at.tzinfo else run.queued_at.replace(tzinfo=timezone.utc)
+        waited = max(0.0, (now - queued_at).total_seconds())
+    run.status = "running"
+    run.started_at = now
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return waited
+
+
 def finalize_run(
     db: Session,
     run: BotRun,
@@ -114,6 +262,36 @@ def finalize_run(
     return run
 
 
+def fail_interrupted_runs(db: Session) -> int:
+    """Fail every queued or running run; call at startup, before any run is admitted.
+
+    They were orphaned by the previous process and stay resumable.
+    """
+    interrupted = (
+        db.query(BotRun)
+        .filter(BotRun.finished_at.is_(None), BotRun.status.in_(("queued", "running")))
+        .update(
+            {
+                BotRun.status: "failed",
+                BotRun.finished_at: datetime.now(timezone.utc),
+                BotRun.error_summary: "Interrupted by a restart before finishing",
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return interrupted
+
+
+def merge_run_details(db: Session, run: BotRun, extra: dict) -> BotRun:
+    # Reassign rather than mutate so the JSON column is flagged dirty.
+    run.details_json = {**(run.details_json or {}), **extra}
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
 def create_tax_property_snapshots(
     db: Session,
     bot_id: int,
@@ -137,15 +315,21 @@ def create_tax_property_snapshots(
         db.add(row)
         rows.append(row)
 
+    # Rollups, diffs and the search index are maintained in the same
+    # transaction as the snapshots.
+    db.flush()
+    rollups.apply_snapshots(db, rows)
+    diffs.record_snapshot_diffs(db, rows)
+    search.index_snapshots(db, rows)
     db.commit()
     for row in rows:
         db.refresh(row)
     return rows
 
 
-def list_latest_properties_for_bot(db: Session, bot_id: int) -> list[TaxPropertySnapshot]:
+def latest_snapshot_ids(bot_id: int):
     invalid_addresses = {"", "Property Number", "Property Address"}
-    ranked = (
+    return (
         select(
             TaxPropertySnapshot.id.label("snapshot_id"),
             func.row_number()
@@ -162,6 +346,9 @@ def list_latest_properties_for_bot(db: Session, bot_id: int) -> list[TaxProperty
         .subquery()
     )
 
+
+def list_latest_properties_for_bot(db: Session, bot_id: int) -> list[TaxPropertySnapshot]:
+    ranked = latest_snapshot_ids(bot_id)
     return (
         db.query(TaxPropertySnapshot)
         .join(ranked, TaxPropertySnapshot.id == ranked.c.snapshot_id)
@@ -171,6 +358,17 @@ def list_latest_properties_for_bot(db: Session, bot_id: int) -> list[TaxProperty
     )
 
 
+def list_latest_property_rows(db: Session, bot_id: int) -> list[tuple]:
+    ranked = latest_snapshot_ids(bot_id)
+    stmt = (
+        select(*SNAPSHOT_ITEM_COLUMNS)
+        .join(ranked, TaxPropertySnapshot.id == ranked.c.snapshot_id)
+        .where(ranked.c.rn == 1)
+        .order_by(TaxPropertySnapshot.property_address.asc())
+    )
+    return db.execute(stmt).all()
+
+
 def list_property_history(
     db: Session,
     bot_id: int,
@@ -191,6 +389,47 @@ def list_property_history(
     )
 
 
+def list_property_history_rows(
+    db: Session,
+    bot_id: int,
+    property_address: str,
+    limit: int,
+) -> list[tuple]:
+    stmt = (
+        select(*SNAPSHOT_ITEM_COLUMNS)
+        .where(
+            TaxPropertySnapshot.bot_id == bot_id,
+            TaxPropertySnapshot.property_address == property_address,
+        )
+        .order_by(desc(TaxPropertySnapshot.scraped_at), desc(TaxPropertySnapshot.id))
+        .limit(limit)
+    )
+    return db.execute(stmt).all()
+
+
+def iter_snapshot_row_batches(
+    db: Session,
+    bot_id: int,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    batch_size: int = 500,
+) -> Iterator[list[tuple]]:
+    stmt = select(*SNAPSHOT_ITEM_COLUMNS).where(TaxPropertySnapshot.bot_id == bot_id)
+    if since is not None:
+        stmt = stmt.where(TaxPropertySnapshot.scraped_at >= since)
+    if until is not None:
+        stmt = stmt.where(TaxPropertySnapshot.scraped_at < until)
+    stmt = stmt.order_by(TaxPropertySnapshot.scraped_at.asc(), TaxPropertySnapshot.id.asc())
+
+    # yield_per streams through a server-side cursor on Postgres.
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            yield list(partition)
+    finally:
+        result.close()
+
+
 def get_run_by_id(db: Session, bot_id: int, run_id: int) -> BotRun | None:
     return db.query(BotRun).filter(BotRun.bot_id == bot_id, BotRun.id == run_id).first()
 
@@ -211,6 +450,7 @@ def get_run_details(db: Session, bot_slug: str, bot_id: int, run_id: int) -> dic
         "run_id": run.id,
         "bot_slug": bot_slug,
         "status": run.status,
+        "queued_at": run.queued_at,
         "started_at": run.started_at,
         "finished_at": run.finished_at,
         "error_summary": run.error_summary,
@@ -3,6 +3,7 @@ from __future__ import annotations
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+from app.db_metrics import DatabaseMetrics, InstrumentedQueuePool, instrument_engine
 from app.settings import get_settings
 
 settings = get_settings()
@@ -13,8 +14,23 @@ engine_kwargs: dict = {
 }
 if settings.database_url.startswith("sqlite"):
     engine_kwargs["connect_args"] = {"check_same_thread": False}
+else:
+    engine_kwargs.update(
+        {
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout_seconds,
+            # 0 disables recycling, matching SQLAlchemy's -1 sentinel.
+            "pool_recycle": settings.db_pool_recycle_seconds or -1,
+        }
+    )
+    if settings.db_statement_timeout_ms and settings.database_url.startswith("postgresql"):
+        engine_kwargs["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
 
 engine = create_engine(settings.database_url, **engine_kwargs)
+db_metrics = DatabaseMetrics(slow_query_ms=settings.db_slow_query_ms)
+instrument_engine(engine, db_metrics)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False, future=True)
 Base = declarative_base()
 
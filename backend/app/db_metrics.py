@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger("app.db")
+
+SLOW_QUERY_HISTORY = 50
+
+
+class DatabaseMetrics:
+    def __init__(self, slow_query_ms: int = 500):
+        self._lock = threading.Lock()
+        self.slow_query_ms = slow_query_ms
+        self._checkouts = 0
+        self._checkout_wait_total = 0.0
+        self._checkout_wait_max = 0.0
+        self._checkout_timeouts = 0
+        self._checked_out = 0
+        self._connections_created = 0
+        self._statements = 0
+        self._statement_time_total = 0.0
+        self._statement_time_max = 0.0
+        self._slow_statements = 0
+        self._slow_queries: deque[dict[str, Any]] = deque(maxlen=SLOW_QUERY_HISTORY)
+
+    def record_checkout_wait(self, seconds: float):
+        with self._lock:
+            self._checkout_wait_total += seconds
+            self._checkout_wait_max = max(self._checkout_wait_max, seconds)
+
+    def record_checkout_timeout(self):
+        with self._lock:
+            self._checkout_timeouts += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self._checkouts += 1
+            self._checked_out += 1
+
+    def record_checkin(self):
+        with self._lock:
+            self._checked_out = max(0, self._checked_out - 1)
+
+    def record_connect(self):
+        with self._lock:
+            self._connections_created += 1
+
+    def record_statement(self, statement: str, seconds: float):
+        elapsed_ms = seconds * 1000
+        slow = self.slow_query_ms > 0 and elapsed_ms >= self.slow_query_ms
+        with self._lock:
+            self._statements += 1
+            self._statement_time_total += seconds
+            self._statement_time_max = max(self._statement_time_max, seconds)
+            if slow:
+                self._slow_statements += 1
+                self._slow_queries.append(
+                    {
+                        "statement": " ".join(statement.split())[:500],
+                        "duration_ms": round(elapsed_ms, 2),
+                        "at": time.time(),
+                    }
+                )
+        if slow:
+            logger.warning("Slow query (%.1f ms): %s", elapsed_ms, " ".join(statement.split())[:500])
+
+    def snapshot(self, pool=None) -> dict[str, Any]:
+        with self._lock:
+            checkouts = self._checkouts
+            statements = self._statements
+            data: dict[str, Any] = {
+                "checkouts": checkouts,
+                "checked_out": self._checked_out,
+                "connections_created": self._connections_created,
+                "checkout_timeouts": self._checkout_timeouts,
+                "checkout_wait_ms_total": round(self._checkout_wait_total * 1000, 3),
+                "checkout_wait_ms_avg": round(self._checkout_wait_total * 1000 / checkouts, 3) if checkouts else 0.0,
+                "checkout_wait_ms_max": round(self._checkout_wait_max * 1000, 3),
+                "statements": statements,
+                "statement_ms_total": round(self._statement_time_total * 1000, 3),
+                "statement_ms_avg": round(self._statement_time_total * 1000 / statements, 3) if statements else 0.0,
+                "statement_ms_max": round(self._statement_time_max * 1000, 3),
+                "slow_query_threshold_ms": self.slow_query_ms,
+                "slow_statements": self._slow_statements,
+                "recent_slow_queries": list(self._slow_queries),
+            }
+        data["pool"] = _pool_status(pool)
+        return data
+
+
+def _pool_status(pool) -> dict[str, Any]:
+    if pool is None:
+        return {}
+    status: dict[str, Any] = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        getter = getattr(pool, name, None)
+        if callable(getter):
+            status[name] = getter()
+    return status
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long callers wait for a free connection."""
+
+    metrics: DatabaseMetrics | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_checkout_timeout()
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_checkout_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument_engine(engine: Engine, metrics: DatabaseMetrics) -> None:
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics.record_checkin()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started_at")
+        if not started:
+            return
+        metrics.record_statement(statement, time.perf_counter() - started.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
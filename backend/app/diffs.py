@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Iterable
+
+from sqlalchemy import and_, desc, or_
+from sqlalchemy.orm import Session
+
+from app.models import TaxPropertySnapshot, TaxPropertySnapshotDiff
+
+
+def _table_rows(tables: list[dict[str, Any]] | None) -> dict[int, list[list[str]]]:
+    indexed: dict[int, list[list[str]]] = {}
+    for position, table in enumerate(tables or []):
+        indexed[table.get("table_index", position)] = table.get("rows") or []
+    return indexed
+
+
+def diff_tables(old: list[dict[str, Any]] | None, new: list[dict[str, Any]] | None) -> dict[str, Any]:
+    """Positional cell diff; a missing cell on either side is reported as null."""
+    old_tables = _table_rows(old)
+    new_tables = _table_rows(new)
+    cells: list[list[Any]] = []
+
+    for table_index in sorted(set(old_tables) | set(new_tables)):
+        old_rows = old_tables.get(table_index, [])
+        new_rows = new_tables.get(table_index, [])
+        for row_index in range(max(len(old_rows), len(new_rows))):
+            old_row = old_rows[row_index] if row_index < len(old_rows) else []
+            new_row = new_rows[row_index] if row_index < len(new_rows) else []
+            for column_index in range(max(len(old_row), len(new_row))):
+                old_value = old_row[column_index] if column_index < len(old_row) else None
+                new_value = new_row[column_index] if column_index < len(new_row) else None
+                if old_value != new_value:
+                    cells.append([table_index, row_index, column_index, old_value, new_value])
+
+    changes: dict[str, Any] = {"cells": cells}
+    if len(old_tables) != len(new_tables):
+        changes["table_count"] = [len(old_tables), len(new_tables)]
+    return changes
+
+
+def _previous_snapshot(db: Session, snapshot: TaxPropertySnapshot) -> TaxPropertySnapshot | None:
+    return (
+        db.query(TaxPropertySnapshot)
+        .filter(
+            TaxPropertySnapshot.bot_id == snapshot.bot_id,
+            TaxPropertySnapshot.property_address == snapshot.property_address,
+            TaxPropertySnapshot.id != snapshot.id,
+            or_(
+                TaxPropertySnapshot.scraped_at < snapshot.scraped_at,
+                and_(
+                    TaxPropertySnapshot.scraped_at == snapshot.scraped_at,
+                    TaxPropertySnapshot.id < snapshot.id,
+                ),
+            ),
+        )
+        .order_by(desc(TaxPropertySnapshot.scraped_at), desc(TaxPropertySnapshot.id))
+        .first()
+    )
+
+
+def record_snapshot_diffs(db: Session, snapshots: Iterable[TaxPropertySnapshot]) -> list[TaxPropertySnapshotDiff]:
+    rows: list[TaxPropertySnapshotDiff] = []
+    for snapshot in snapshots:
+        previous = _previous_snapshot(db, snapshot)
+        if previous is None:
+            changes: dict[str, Any] = {}
+            change_count = 0
+            total_due_delta = None
+        else:
+            changes = diff_tables(previous.tables_json, snapshot.tables_json)
+            change_count = len(changes["cells"]) + (1 if "table_count" in changes else 0)
+            total_due_delta = Decimal(str(snapshot.total_due)) - Decimal(str(previous.total_due))
+
+        row = TaxPropertySnapshotDiff(
+            snapshot_id=snapshot.id,
+            previous_snapshot_id=previous.id if previous else None,
+            bot_id=snapshot.bot_id,
+            run_id=snapshot.run_id,
+            property_address=snapshot.property_address,
+            total_due_delta=total_due_delta,
+            change_count=change_count,
+            changes_json=changes,
+            scraped_at=snapshot.scraped_at,
+        )
+        db.add(row)
+        rows.append(row)
+    return rows
+
+
+def list_property_changes(
+    db: Session,
+    bot_id: int,
+    property_address: str,
+    limit: int,
+    include_unchanged: bool = False,
+) -> list[TaxPropertySnapshotDiff]:
+    query = db.query(TaxPropertySnapshotDiff).filter(
+        TaxPropertySnapshotDiff.bot_id == bot_id,
+        TaxPropertySnapshotDiff.property_address == property_address,
+        TaxPropertySnapshotDiff.previous_snapshot_id.isnot(None),
+    )
+    if not include_unchanged:
+        query = query.filter(TaxPropertySnapshotDiff.change_count > 0)
+    return (
+        query.order_by(desc(TaxPropertySnapshotDiff.scraped_at), desc(TaxPropertySnapshotDiff.id))
+        .limit(limit)
+        .all()
+    )
+
+
+def summarize_run_changes(db: Session, bot_id: int, run_id: int) -> dict[str, Any]:
+    rows = (
+        db.query(TaxPropertySnapshotDiff)
+        .filter(TaxPropertySnapshotDiff.bot_id == bot_id, TaxPropertySnapshotDiff.run_id == run_id)
+        .order_by(TaxPropertySnapshotDiff.property_address.asc(), TaxPropertySnapshotDiff.id.asc())
+        .all()
+    )
+    new_properties = [row.property_address for row in rows if row.previous_snapshot_id is None]
+    changed = [row for row in rows if row.previous_snapshot_id is not None and row.change_count > 0]
+    unchanged_count = sum(1 for row in rows if row.previous_snapshot_id is not None and row.change_count == 0)
+    return {
+        "run_id": run_id,
+        "snapshot_count": len(rows),
+        "new_properties": new_properties,
+        "unchanged_count": unchanged_count,
+        "changed": changed,
+    }
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import csv
+import importlib.util
+import io
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Sequence
+
+import orjson
+
+from app import crud
+from app.db import SessionLocal
+from app.fast_json import SNAPSHOT_ITEM_FIELDS, dumps
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+CSV_HEADER = (
+    "snapshot_id",
+    "run_id",
+    "source_url",
+    "source_account_number",
+    "final_url",
+    "property_address",
+    "total_due",
+    "scraped_at",
+    "table_index",
+    "row_index",
+    "column_index",
+    "value",
+)
+
+Batch = Sequence[Sequence[Any]]
+
+
+def parquet_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _iso(value: datetime | None) -> str:
+    return value.isoformat() if value is not None else ""
+
+
+def iter_ndjson(batches: Iterable[Batch]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(dumps(dict(zip(SNAPSHOT_ITEM_FIELDS, row))) + b"\n" for row in batch)
+
+
+def iter_csv(batches: Iterable[Batch]) -> Iterator[bytes]:
+    # One CSV line per table cell keeps a fixed header no matter how the
+    # scraped tables are shaped.
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for batch in batches:
+        for row in batch:
+            item = dict(zip(SNAPSHOT_ITEM_FIELDS, row))
+            prefix = (
+                item["id"],
+                item["run_id"],
+                item["source_url"],
+                item["source_account_number"] or "",
+                item["final_url"],
+                item["property_address"],
+                str(item["total_due"]),
+                _iso(item["scraped_at"]),
+            )
+            wrote_cell = False
+            for table_position, table in enumerate(item["tables_json"] or []):
+                table_index = table.get("table_index", table_position)
+                for row_index, cells in enumerate(table.get("rows") or []):
+                    for column_index, value in enumerate(cells):
+                        writer.writerow((*prefix, table_index, row_index, column_index, value))
+                        wrote_cell = True
+            if not wrote_cell:
+                writer.writerow((*prefix, "", "", "", ""))
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+class _DrainableSink(io.RawIOBase):
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_parquet(batches: Iterable[Batch]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("run_id", pa.int64()),
+            ("source_url", pa.string()),
+            ("source_account_number", pa.string()),
+            ("final_url", pa.string()),
+            ("property_address", pa.string()),
+            ("total_due", pa.decimal128(12, 2)),
+            ("tables_json", pa.string()),
+            ("metadata_json", pa.string()),
+            ("scraped_at", pa.timestamp("us", tz="UTC")),
+        ]
+    )
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    try:
+        for batch in batches:
+            columns: dict[str, list[Any]] = {name: [] for name in SNAPSHOT_ITEM_FIELDS}
+            for row in batch:
+                for name, value in zip(SNAPSHOT_ITEM_FIELDS, row):
+                    if name in {"tables_json", "metadata_json"}:
+                        value = orjson.dumps(value).decode("utf-8")
+                    columns[name].append(value)
+            # Each batch becomes one row group, so memory is bounded by yield_per.
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+_ENCODERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+    "parquet": iter_parquet,
+}
+
+
+def stream_snapshot_export(
+    bot_id: int,
+    export_format: str,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    batch_size: int = 500,
+) -> Iterator[bytes]:
+    # The request-scoped session is closed before a StreamingResponse body is
+    # sent, so the export owns its own session for the lifetime of the cursor.
+    db = SessionLocal()
+    try:
+        batches = crud.iter_snapshot_row_batches(db, bot_id, since=since, until=until, batch_size=batch_size)
+        yield from _ENCODERS[export_format](batches)
+    finally:
+        db.close()
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi.responses import Response
+
+from app.crud import SNAPSHOT_ITEM_COLUMNS
+
+SNAPSHOT_ITEM_FIELDS: tuple[str, ...] = tuple(column.key for column in SNAPSHOT_ITEM_COLUMNS)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    # OPT_UTC_Z keeps datetimes identical to Pydantic's "...Z" rendering.
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+def snapshot_rows_to_json(rows: Iterable[Sequence[Any]]) -> bytes:
+    return dumps([dict(zip(SNAPSHOT_ITEM_FIELDS, row)) for row in rows])
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def snapshot_list_response(rows: Iterable[Sequence[Any]]) -> FastJSONResponse:
+    return FastJSONResponse(snapshot_rows_to_json(rows))
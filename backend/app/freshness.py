@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import sources
+from app.models import TaxPropertySnapshot
+
+
+def last_scraped_at(db: Session, bot_id: int, source_urls: Iterable[str]) -> dict[str, datetime]:
+    rows = (
+        db.query(TaxPropertySnapshot.source_url, func.max(TaxPropertySnapshot.scraped_at))
+        .filter(TaxPropertySnapshot.bot_id == bot_id, TaxPropertySnapshot.source_url.in_(list(source_urls)))
+        .group_by(TaxPropertySnapshot.source_url)
+        .all()
+    )
+    return {source_url: _aware(scraped_at) for source_url, scraped_at in rows}
+
+
+def stale_source_urls(
+    db: Session,
+    bot_id: int,
+    source_urls: list[str],
+    ttl_seconds: float,
+    now: datetime | None = None,
+) -> list[str]:
+    """Source URLs never scraped, scraped longer than ``ttl_seconds`` ago, or failed since.
+
+    URLs in ``bot_sources`` go by its last success/failure stamps, like full
+    incremental runs; others by their newest snapshot. Keeps the input order
+    so incremental runs visit accounts like a full run.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(seconds=ttl_seconds)
+    known, stale = sources.stale_among(db, bot_id, source_urls, cutoff)
+    scraped = last_scraped_at(db, bot_id, [url for url in source_urls if url not in known])
+    return [
+        url
+        for url in source_urls
+        if url in stale or (url not in known and (url not in scraped or scraped[url] < cutoff))
+    ]
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes for timezone-aware columns.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import date, datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.models import UrlLatencyStat
+
+# Upper bounds (ms) of a roughly log-spaced histogram; one overflow bucket
+# follows. Percentiles are interpolated inside the winning bucket, so the
+# error is bounded by the bucket width rather than by how many runs we keep.
+LATENCY_BUCKETS_MS = (
+    10, 25, 50, 100, 150, 250, 400, 600, 1000, 1500, 2500, 4000,
+    6000, 10000, 15000, 25000, 40000, 60000, 100000, 180000, 300000,
+)
+TOTAL_PHASE = "total"
+PERCENTILES = (50, 95, 99)
+
+
+def _empty_buckets() -> list[int]:
+    return [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+
+# Keys per locking SELECT when folding a run into the stats rows.
+LOOKUP_CHUNK_SIZE = 500
+
+
+def _new_delta() -> dict[str, Any]:
+    return {"sample_count": 0, "failure_count": 0, "total_ms": 0.0, "max_ms": 0.0, "buckets": _empty_buckets()}
+
+
+def _observe(delta: dict[str, Any], elapsed_ms: float, failed: bool):
+    delta["buckets"][bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+    delta["sample_count"] += 1
+    delta["total_ms"] += elapsed_ms
+    delta["max_ms"] = max(delta["max_ms"], elapsed_ms)
+    if failed:
+        delta["failure_count"] += 1
+
+
+def _insert_missing(db: Session, bot_id: int, day: date, keys: list[tuple[str, str]]):
+    """Create absent stats rows; rows another run created concurrently are left alone."""
+    rows = [
+        {
+            "bot_id": bot_id,
+            "source_url": source_url,
+            "phase": phase,
+            "period_start": day,
+            "sample_count": 0,
+            "failure_count": 0,
+            "total_ms": 0.0,
+            "max_ms": 0.0,
+            "buckets": _empty_buckets(),
+        }
+        for source_url, phase in keys
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Latency stats are not supported on {dialect}")
+    unique = ["bot_id", "source_url", "phase", "period_start"]
+    db.execute(insert(UrlLatencyStat).on_conflict_do_nothing(index_elements=unique), rows)
+
+
+def _locked_stats(db: Session, bot_id: int, day: date, source_urls: list[str]) -> list[UrlLatencyStat]:
+    query = (
+        db.query(UrlLatencyStat)
+        .filter(
+            UrlLatencyStat.bot_id == bot_id,
+            UrlLatencyStat.period_start == day,
+            UrlLatencyStat.source_url.in_(source_urls),
+        )
+        # A stable lock order keeps concurrent runs over the same URLs from deadlocking.
+        .order_by(UrlLatencyStat.id)
+        # Rows already in the session may predate another run's increments.
+        .populate_existing()
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update()
+    return query.all()
+
+
+def record_url_results(
+    db: Session,
+    bot_id: int,
+    url_results: Iterable[dict[str, Any]],
+    recorded_at: datetime | None = None,
+) -> int:
+    """Fold per-URL phase timings into the daily stats rows (caller commits).
+
+    The run is aggregated in memory first, then applied with one insert and
+    one row-locking SELECT per chunk of URLs, so concurrent runs feeding the
+    same rows neither lose increments nor race on the unique constraint.
+    """
+    day = (recorded_at or datetime.now(timezone.utc)).astimezone(timezone.utc).date()
+    deltas: dict[tuple[str, str], dict[str, Any]] = {}
+    observed = 0
+    for url_result in url_results:
+        timings = url_result.get("timings_ms") or {}
+        source_url = url_result.get("source_url")
+        if not timings or not source_url:
+            continue
+        failed = url_result.get("status") != "success"
+        failed_phase = url_result.get("failed_phase")
+        for phase, elapsed_ms in timings.items():
+            failed_here = failed and (phase == TOTAL_PHASE or phase == failed_phase)
+            _observe(deltas.setdefault((source_url, phase), _new_delta()), float(elapsed_ms), failed_here)
+            observed += 1
+
+    source_urls = sorted({source_url for source_url, _ in deltas})
+    for offset in range(0, len(source_urls), LOOKUP_CHUNK_SIZE):
+        chunk = set(source_urls[offset : offset + LOOKUP_CHUNK_SIZE])
+        keys = [key for key in deltas if key[0] in chunk]
+        _insert_missing(db, bot_id, day, keys)
+        for stat in _locked_stats(db, bot_id, day, sorted(chunk)):
+            delta = deltas.get((stat.source_url, stat.phase))
+            if delta is None:
+                continue
+            # Reassign so the JSON column is flagged dirty.
+            stat.buckets = [a + b for a, b in zip(stat.buckets or _empty_buckets(), delta["buckets"])]
+            stat.sample_count += delta["sample_count"]
+            stat.failure_count += delta["failure_count"]
+            stat.total_ms += delta["total_ms"]
+            stat.max_ms = max(stat.max_ms, delta["max_ms"])
+        db.flush()
+    return observed
+
+
+def _percentile(buckets: list[int], count: int, max_ms: float, percentile: int) -> float | None:
+    if count == 0:
+        return None
+    rank = count * percentile / 100
+    seen = 0
+    for position, bucket_count in enumerate(buckets):
+        if bucket_count and seen + bucket_count >= rank:
+            lower = LATENCY_BUCKETS_MS[position - 1] if position else 0
+            upper = LATENCY_BUCKETS_MS[position] if position < len(LATENCY_BUCKETS_MS) else max_ms
+            estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+            return round(min(estimate, max_ms), 3)
+        seen += bucket_count
+    return round(max_ms, 3)
+
+
+def _summarize(rows: list[UrlLatencyStat]) -> dict[str, Any]:
+    buckets = _empty_buckets()
+    count = failures = 0
+    total_ms = max_ms = 0.0
+    for row in rows:
+        for position, value in enumerate(row.buckets or []):
+            buckets[position] += value
+        count += row.sample_count
+        failures += row.failure_count
+        total_ms += row.total_ms
+        max_ms = max(max_ms, row.max_ms)
+
+    summary: dict[str, Any] = {
+        "sample_count": count,
+        "failure_count": failures,
+        "failure_rate": round(failures / count, 4) if count else 0.0,
+        "avg_ms": round(total_ms / count, 3) if count else None,
+        "max_ms": round(max_ms, 3) if count else None,
+    }
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}_ms"] = _percentile(buckets, count, max_ms, percentile)
+    return summary
+
+
+def latency_report(
+    db: Session,
+    bot_id: int,
+    since: date,
+    until: date,
+    source_url: str | None = None,
+) -> dict[str, Any]:
+    query = db.query(UrlLatencyStat).filter(
+        UrlLatencyStat.bot_id == bot_id,
+        UrlLatencyStat.period_start >= since,
+        UrlLatencyStat.period_start <= until,
+    )
+    if source_url is not None:
+        query = query.filter(UrlLatencyStat.source_url == source_url)
+
+    by_url: dict[str, dict[str, list[UrlLatencyStat]]] = {}
+    by_phase: dict[str, list[UrlLatencyStat]] = {}
+    for row in query.all():
+        by_url.setdefault(row.source_url, {}).setdefault(row.phase, []).append(row)
+        by_phase.setdefault(row.phase, []).append(row)
+
+    urls = []
+    for url, phases in sorted(by_url.items()):
+        urls.append(
+            {
+                "source_url": url,
+                **_summarize(phases.get(TOTAL_PHASE, [])),
+                "phases": [
+                    {"phase": phase, **_summarize(rows)} for phase, rows in sorted(phases.items()) if phase != TOTAL_PHASE
+                ],
+            }
+        )
+
+    return {
+        "since": since,
+        "until": until,
+        "overall": _summarize(by_phase.get(TOTAL_PHASE, [])),
+        "phases": [
+            {"phase": phase, **_summarize(rows)} for phase, rows in sorted(by_phase.items()) if phase != TOTAL_PHASE
+        ],
+        "urls": urls,
+    }
@@ -6,19 +6,45 @@ import queue
 import threading
 import time
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Literal
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import ValidationError
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app import crud, schemas
-from app.bots.tax.runner import run_tax_refresh
-from app.db import SessionLocal, get_db
+from app import (
+    artifacts,
+    crud,
+    diffs,
+    export,
+    fast_json,
+    latency,
+    profiling,
+    rollups,
+    run_results,
+    schemas,
+    search,
+    sources,
+    table_filters,
+)
+from app.bots import registry
+from app.bots.executor import QueueFull, RunExecutor
+from app.browser_pool import browser_pool
+from app.cancellation import run_cancellations
+from app.config_cache import ConfigChangeListener, bot_config_cache
+from app.db import SessionLocal, db_metrics, engine, get_db
 from app.models import Bot, BotRun
+from app.politeness import host_guards
+from app.run_metrics import run_metrics
+from app.scheduler import BotScheduler, schedule_status
 from app.settings import get_settings
 
 
@@ -57,21 +83,70 @@ class RunEventHub:
             if not subscribers:
                 self._subscribers.pop(run_id, None)
 
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "streams": len(self._subscribers),
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+                "history_runs": len(self._history),
+                "history_events": sum(len(events) for events in self._history.values()),
+            }
+
 
 run_event_hub = RunEventHub()
 settings = get_settings()
+artifact_store = artifacts.ContentAddressedStore(settings.artifacts_dir)
+artifact_gc = artifacts.ArtifactGarbageCollector(
+    SessionLocal,
+    artifact_store,
+    artifacts.RetentionPolicy(
+        max_age_days=settings.artifact_retention_days,
+        failed_max_age_days=settings.artifact_failed_retention_days,
+        max_total_bytes=settings.artifact_max_total_mb * 1024 * 1024,
+        grace_seconds=settings.artifact_gc_grace_seconds,
+    ),
+    interval_seconds=settings.artifact_gc_interval_seconds,
+)
+config_listener = ConfigChangeListener(engine, bot_config_cache)
+run_executor = RunExecutor(
+    max_concurrent_runs=settings.max_concurrent_runs,
+    max_browsers=settings.max_concurrent_browsers,
+    max_queue=settings.run_queue_max,
+    # The warm browser for on-demand refreshes counts against MAX_CONCURRENT_BROWSERS while it is up.
+    pool_browser_open=lambda: browser_pool.is_open,
+)
+browser_pool.on_close = run_executor.wake
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     os.makedirs(settings.artifacts_dir, exist_ok=True)
 
+    # The container entrypoint (app.bootstrap) already migrated and seeded.
+    if settings.seed_on_startup:
+        db = SessionLocal()
+        try:
+            registry.seed_bots(db)
+        finally:
+            db.close()
+
+    # The run queue lives in memory, so runs left queued or running by a previous process will never finish.
     db = SessionLocal()
     try:
-        crud.seed_tax_bot(db)
+        crud.fail_interrupted_runs(db)
     finally:
         db.close()
-    yield
+
+    artifact_gc.start()
+    config_listener.start()
+    bot_scheduler.start()
+    try:
+        yield
+    finally:
+        bot_scheduler.stop()
+        config_listener.stop()
+        artifact_gc.stop()
+        browser_pool.close()
 
 
 def create_app() -> FastAPI:
@@ -94,6 +169,74 @@ def create_app() -> FastAPI:
             "llm_model": settings.llm_model,
         }
 
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def prometheus_metrics():
+        hub = run_event_hub.stats()
+        executor = run_executor.stats()
+        pool = browser_pool.stats()
+        gauges = {
+            "agents_event_hub_streams": ("Runs with at least one SSE subscriber.", hub["streams"]),
+            "agents_event_hub_subscribers": ("Connected SSE subscribers.", hub["subscribers"]),
+            "agents_event_hub_history_runs": ("Runs with buffered event history.", hub["history_runs"]),
+            "agents_event_hub_history_events": ("Buffered run events.", hub["history_events"]),
+            "agents_executor_active_runs": ("Bot runs currently executing.", executor["active_runs"]),
+            "agents_executor_queue_depth": ("Bot runs waiting for a concurrency slot.", executor["queue_depth"]),
+            "agents_executor_oldest_wait_seconds": ("Age of the oldest queued run.", executor["oldest_wait_seconds"]),
+            "agents_executor_avg_wait_seconds": ("Mean queue wait of recent runs.", executor["avg_wait_seconds"]),
+            "agents_executor_rejected_total": ("Refreshes rejected with 429.", executor["rejected_total"]),
+            "agents_executor_browsers_in_use": ("Browser slots held by executing runs.", executor["browsers_in_use"]),
+            "agents_browser_pool_open": ("Whether the shared warm browser is running.", int(pool["browser_open"])),
+            "agents_browser_pool_leases_total": ("On-demand scrapes served by the shared browser.", pool["leases"]),
+        }
+        return PlainTextResponse(
+            run_metrics.render(gauges),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    @app.get("/api/run-queue", response_model=schemas.RunQueueStats)
+    def get_run_queue():
+        return {**run_executor.stats(), "host_breakers": host_guards.stats()}
+
+    @app.get("/api/metrics/db", response_model=schemas.DatabaseMetricsResponse)
+    def database_metrics():
+        return db_metrics.snapshot(engine.pool)
+
+    @app.get("/api/artifact-store", response_model=schemas.ArtifactStoreStats)
+    def get_artifact_store_stats(db: Session = Depends(get_db)):
+        return {**artifacts.store_stats(db), "last_gc": artifact_gc.last_result}
+
+    @app.post("/api/artifact-store/gc", response_model=schemas.ArtifactGCResult)
+    def run_artifact_gc():
+        return artifact_gc.run_once()
+
+    @app.get("/api/artifact-store/blobs/{sha256}")
+    def get_artifact_blob(
+        sha256: str,
+        request: Request,
+        variant: Literal["thumb", "preview", "full"] = Query("full"),
+    ):
+        if not artifacts.is_sha256(sha256):
+            raise HTTPException(status_code=404, detail="Artifact not found")
+
+        # Blobs are content-addressed, so every variant is immutable.
+        etag = f'"{sha256}-{variant}"'
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+
+        if variant == "full":
+            path = artifacts.find_blob_file(artifact_store, sha256)
+        else:
+            try:
+                path = artifacts.render_variant(artifact_store, sha256, variant)
+            except ImportError:
+                raise HTTPException(status_code=501, detail="Downscaled variants require Pillow")
+        if path is None:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+
+        media_type = "image/webp" if variant != "full" else artifacts.CONTENT_TYPES.get(path.suffix.lstrip("."))
+        return FileResponse(path, media_type=media_type, headers=headers)
+
     @app.get("/api/bots", response_model=list[schemas.BotSummary])
     def list_bots(db: Session = Depends(get_db)):
         return crud.list_bot_summaries(db)
@@ -104,14 +247,121 @@ def create_app() -> FastAPI:
         if not bot:
             raise HTTPException(status_code=404, detail="Bot not found")
 
+        runtime = registry.get_runtime(bot.slug)
         return {
             "slug": bot.slug,
             "name": bot.name,
-            "source_urls": list(settings.tax_source_urls) if slug == "tax" else [],
-            "config": crud.get_bot_config(db, bot.id),
+            "source_urls": [row.url for row in sources.list_sources(db, bot.id, enabled=True, limit=50)],
+            "source_count": sources.count_enabled(db, bot.id),
+            "config": runtime.load_config(db, bot.id) if runtime else {},
             "recent_runs": crud.list_recent_runs_for_bot(db, bot.id, limit=20),
         }
 
+    @app.get("/api/bots/{slug}/config", response_model=schemas.BotConfigResponse)
+    def get_bot_config(slug: str, key: str | None = Query(None), db: Session = Depends(get_db)):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        runtime = registry.get_runtime(bot.slug)
+        key = key or (runtime.config_key if runtime else None)
+        config = crud.get_bot_config_row(db, bot.id, key) if key else None
+        if not config:
+            raise HTTPException(status_code=404, detail="Config not found")
+        return config
+
+    @app.put("/api/bots/{slug}/config", response_model=schemas.BotConfigResponse)
+    def update_bot_config(slug: str, payload: schemas.BotConfigUpdate, db: Session = Depends(get_db)):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        runtime = registry.get_runtime(bot.slug)
+        key = payload.key or (runtime.config_key if runtime else None)
+        if not key:
+            raise HTTPException(status_code=422, detail="Config key is required for bots without a runtime")
+
+        config_json = payload.config_json
+        if runtime and key == runtime.config_key:
+            try:
+                config_json = runtime.validate_config(config_json)
+            except ValidationError as exc:
+                raise HTTPException(status_code=422, detail=exc.errors(include_url=False, include_context=False))
+        try:
+            return crud.update_bot_config(
+                db,
+                bot.id,
+                config_json,
+                key=key,
+                expected_version=payload.expected_version,
+            )
+        except crud.ConfigVersionConflict as exc:
+            raise HTTPException(status_code=409, detail=str(exc))
+
+    @app.get("/api/bots/{slug}/sources", response_model=schemas.BotSourceList)
+    def list_bot_sources(
+        slug: str,
+        enabled: bool | None = Query(None),
+        after_id: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        db: Session = Depends(get_db),
+    ):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        items = sources.list_sources(db, bot.id, enabled=enabled, after_id=after_id, limit=limit)
+        return {
+            "total": sources.count_sources(db, bot.id, enabled=enabled),
+            "items": items,
+            "next_after_id": items[-1].id if len(items) == limit else None,
+        }
+
+    @app.post("/api/bots/{slug}/sources/import", response_model=schemas.SourceImportResult)
+    async def import_bot_sources(slug: str, request: Request):
+        """Upsert sources from a CSV body with a ``url`` column.
+
+        The body is parsed as it streams in and written in chunks, so large
+        account lists never sit in memory whole.
+        """
+        db = SessionLocal()
+        try:
+            bot = await run_in_threadpool(crud.get_bot_by_slug, db, slug)
+            if not bot:
+                raise HTTPException(status_code=404, detail="Bot not found")
+            runtime = registry.get_runtime(bot.slug)
+            account_for_url = runtime.account_for_url if runtime else None
+            counts = sources.ImportCounts()
+            chunk: list[dict[str, str]] = []
+            async for row in sources.aiter_csv_rows(request.stream()):
+                chunk.append(row)
+                if len(chunk) >= sources.CHUNK_SIZE:
+                    counts.add(await run_in_threadpool(sources.upsert_chunk, db, bot.id, chunk, account_for_url))
+                    chunk = []
+            if chunk:
+                counts.add(await run_in_threadpool(sources.upsert_chunk, db, bot.id, chunk, account_for_url))
+            return counts
+        finally:
+            db.close()
+
+    @app.patch("/api/bots/{slug}/sources/{source_id}", response_model=schemas.BotSourceItem)
+    def update_bot_source(
+        slug: str,
+        source_id: int,
+        payload: schemas.BotSourceUpdate,
+        db: Session = Depends(get_db),
+    ):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        source = sources.update_source(
+            db,
+            bot.id,
+            source_id,
+            enabled=payload.enabled,
+            metadata_json=payload.metadata_json,
+        )
+        if not source:
+            raise HTTPException(status_code=404, detail="Source not found")
+        return source
+
     @app.get(
         "/api/bots/{slug}/properties/latest",
         response_model=list[schemas.PropertySnapshotItem],
@@ -120,8 +370,53 @@ def create_app() -> FastAPI:
         bot = crud.get_bot_by_slug(db, slug)
         if not bot:
             raise HTTPException(status_code=404, detail="Bot not found")
+        if settings.fast_json_responses:
+            return fast_json.snapshot_list_response(crud.list_latest_property_rows(db, bot.id))
         return crud.list_latest_properties_for_bot(db, bot.id)
 
+    @app.get(
+        "/api/bots/{slug}/properties/filter",
+        response_model=list[schemas.PropertySnapshotItem],
+    )
+    def filter_properties(
+        slug: str,
+        row_label: str | None = Query(None, max_length=255),
+        min_amount: Decimal | None = Query(None),
+        max_amount: Decimal | None = Query(None),
+        table_count_changed: bool = Query(False),
+        latest_only: bool = Query(True),
+        limit: int = Query(100, ge=1, le=1000),
+        db: Session = Depends(get_db),
+    ):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        if row_label is None and (min_amount is not None or max_amount is not None):
+            raise HTTPException(status_code=422, detail="min_amount/max_amount require row_label")
+        return table_filters.filter_snapshots(
+            db,
+            bot.id,
+            row_label=row_label,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            table_count_changed=table_count_changed,
+            latest_only=latest_only,
+            limit=limit,
+        )
+
+    @app.get("/api/bots/{slug}/search", response_model=schemas.PropertySearchResponse)
+    def search_properties(
+        slug: str,
+        q: str = Query(..., min_length=2, max_length=200),
+        limit: int = Query(20, ge=1, le=100),
+        offset: int = Query(0, ge=0),
+        db: Session = Depends(get_db),
+    ):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        return search.search_properties(db, bot.id, q, limit=limit, offset=offset)
+
     @app.get(
         "/api/bots/{slug}/properties/{property_address}/history",
         response_model=list[schemas.PropertySnapshotItem],
@@ -135,22 +430,181 @@ def create_app() -> FastAPI:
         bot = crud.get_bot_by_slug(db, slug)
         if not bot:
             raise HTTPException(status_code=404, detail="Bot not found")
+        if settings.fast_json_responses:
+            return fast_json.snapshot_list_response(
+                crud.list_property_history_rows(db, bot.id, property_address, limit)
+            )
         return crud.list_property_history(db, bot.id, property_address, limit)
 
-    @app.post("/api/bots/{slug}/refresh", response_model=schemas.RefreshResponse)
-    def refresh_bot(slug: str, db: Session = Depends(get_db)):
+    @app.get(
+        "/api/bots/{slug}/properties/{property_address}/changes",
+        response_model=list[schemas.SnapshotChange],
+    )
+    def get_property_changes(
+        slug: str,
+        property_address: str,
+        limit: int = Query(20, ge=1, le=200),
+        include_unchanged: bool = Query(False),
+        db: Session = Depends(get_db),
+    ):
         bot = crud.get_bot_by_slug(db, slug)
         if not bot:
             raise HTTPException(status_code=404, detail="Bot not found")
+        return diffs.list_property_changes(db, bot.id, property_address, limit, include_unchanged=include_unchanged)
+
+    @app.get("/api/bots/{slug}/analytics/total-due", response_model=schemas.TotalDueAnalytics)
+    def get_total_due_analytics(
+        slug: str,
+        granularity: Literal["day", "month"] = Query("day"),
+        since: date | None = Query(None),
+        until: date | None = Query(None),
+        property_address: str | None = Query(None),
+        limit: int = Query(10, ge=1, le=100),
+        db: Session = Depends(get_db),
+    ):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+
+        return {
+            "granularity": granularity,
+            "property_address": property_address,
+            "series": rollups.total_due_series(
+                db, bot.id, granularity, since=since, until=until, property_address=property_address
+            ),
+            "largest_changes": (
+                rollups.largest_changes(db, bot.id, granularity, since=since, until=until, limit=limit)
+                if property_address is None
+                else []
+            ),
+        }
 
-        run = crud.create_run(db, bot.id)
-        thread = threading.Thread(
-            target=_run_refresh_in_background,
-            args=(slug, run.id),
-            daemon=True,
+    @app.get("/api/bots/{slug}/reports/latency", response_model=schemas.LatencyReport)
+    def get_latency_report(
+        slug: str,
+        since: date | None = Query(None),
+        until: date | None = Query(None),
+        source_url: str | None = Query(None),
+        db: Session = Depends(get_db),
+    ):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+
+        until = until or datetime.now(timezone.utc).date()
+        since = since or until - timedelta(days=6)
+        if since > until:
+            raise HTTPException(status_code=422, detail="since must not be after until")
+        return latency.latency_report(db, bot.id, since, until, source_url=source_url)
+
+    @app.get("/api/bots/{slug}/export")
+    def export_snapshots(
+        slug: str,
+        format: Literal["ndjson", "csv", "parquet"] = Query("ndjson"),
+        since: datetime | None = Query(None),
+        until: datetime | None = Query(None),
+        db: Session = Depends(get_db),
+    ):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        if format == "parquet" and not export.parquet_available():
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+        filename = f"{bot.slug}_snapshots.{format}"
+        return StreamingResponse(
+            export.stream_snapshot_export(bot.id, format, since=since, until=until),
+            media_type=export.EXPORT_MEDIA_TYPES[format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
         )
-        thread.start()
-        return {"run_id": run.id, "status": "running"}
+
+    @app.post("/api/bots/{slug}/refresh", response_model=schemas.RefreshResponse)
+    def refresh_bot(
+        slug: str,
+        profile: bool = Query(False),
+        trace: bool = Query(False),
+        mode: Literal["full", "incremental"] = Query("full"),
+        db: Session = Depends(get_db),
+    ):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        runtime = registry.get_runtime(bot.slug)
+        if not runtime:
+            raise HTTPException(status_code=409, detail="Bot has no registered runtime")
+        try:
+            return _enqueue_run(db, bot, runtime, profile=profile, trace=trace, incremental=mode == "incremental")
+        except QueueFull as exc:
+            raise _queue_full_error(exc)
+
+    @app.post("/api/bots/{slug}/properties/{account}/refresh", response_model=schemas.RefreshResponse)
+    def refresh_account(slug: str, account: str, db: Session = Depends(get_db)):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        runtime = registry.get_runtime(bot.slug)
+        if not runtime:
+            raise HTTPException(status_code=409, detail="Bot has no registered runtime")
+        source = sources.find_by_account(db, bot.id, account)
+        if not source or not source.enabled:
+            raise HTTPException(status_code=404, detail="Account not found in bot source URLs")
+        try:
+            return _enqueue_run(db, bot, runtime, source_urls=[source.url], priority=True)
+        except QueueFull as exc:
+            raise _queue_full_error(exc)
+
+    @app.get("/api/bots/{slug}/schedule", response_model=schemas.ScheduleStatus)
+    def get_schedule(slug: str, db: Session = Depends(get_db)):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        runtime = registry.get_runtime(bot.slug)
+        if not runtime:
+            raise HTTPException(status_code=409, detail="Bot has no registered runtime")
+        return schedule_status(db, runtime, bot)
+
+    @app.post("/api/bots/{slug}/runs/{run_id}/cancel", response_model=schemas.RunCancelResponse)
+    def cancel_run(slug: str, run_id: int, db: Session = Depends(get_db)):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        run = crud.get_run_by_id(db, bot.id, run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail="Run not found")
+        if run.finished_at is not None:
+            raise HTTPException(status_code=409, detail=f"Run already finished with status {run.status}")
+        if not run_cancellations.cancel(run.id, reason="Cancelled by user"):
+            raise HTTPException(status_code=409, detail="Run is not active in this process")
+        run_event_hub.publish(run.id, {"type": "run_cancelling", "bot_slug": bot.slug})
+        return {"run_id": run.id, "status": "cancelling"}
+
+    @app.post("/api/bots/{slug}/runs/{run_id}/resume", response_model=schemas.RefreshResponse)
+    def resume_run(slug: str, run_id: int, db: Session = Depends(get_db)):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        runtime = registry.get_runtime(bot.slug)
+        if not runtime:
+            raise HTTPException(status_code=409, detail="Bot has no registered runtime")
+        run = crud.get_run_by_id(db, bot.id, run_id)
+        if not run:
+            raise HTTPException(status_code=404, detail="Run not found")
+        # Runs orphaned by a restart were failed at startup, so they are covered too.
+        if run.status not in crud.RESUMABLE_RUN_STATUSES:
+            raise HTTPException(status_code=409, detail=f"Run is {run.status}; only failed or cancelled runs resume")
+        details = run.details_json or {}
+        try:
+            return _enqueue_run(
+                db,
+                bot,
+                runtime,
+                source_urls=details.get("source_urls"),
+                incremental=bool(details.get("incremental")),
+                priority=bool(details.get("priority")),
+                resume_run=run,
+            )
+        except QueueFull as exc:
+            raise _queue_full_error(exc)
 
     @app.get("/api/bots/{slug}/runs/{run_id}", response_model=schemas.RunDetails)
     def get_run_details(slug: str, run_id: int, db: Session = Depends(get_db)):
@@ -163,6 +617,37 @@ def create_app() -> FastAPI:
             raise HTTPException(status_code=404, detail="Run not found")
         return details
 
+    @app.get("/api/bots/{slug}/runs/{run_id}/url-results", response_model=schemas.RunUrlResultList)
+    def list_run_url_results(
+        slug: str,
+        run_id: int,
+        status: str | None = Query(None),
+        after_id: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        db: Session = Depends(get_db),
+    ):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        if not crud.get_run_by_id(db, bot.id, run_id):
+            raise HTTPException(status_code=404, detail="Run not found")
+        counts = run_results.counts(db, run_id)
+        items = run_results.list_results(db, run_id, status=status, after_id=after_id, limit=limit)
+        return {
+            "total": counts.get(status, 0) if status else sum(counts.values()),
+            "items": items,
+            "next_after_id": items[-1].id if len(items) == limit else None,
+        }
+
+    @app.get("/api/bots/{slug}/runs/{run_id}/changes", response_model=schemas.RunChangeSummary)
+    def get_run_changes(slug: str, run_id: int, db: Session = Depends(get_db)):
+        bot = crud.get_bot_by_slug(db, slug)
+        if not bot:
+            raise HTTPException(status_code=404, detail="Bot not found")
+        if not crud.get_run_by_id(db, bot.id, run_id):
+            raise HTTPException(status_code=404, detail="Run not found")
+        return diffs.summarize_run_changes(db, bot.id, run_id)
+
     @app.get("/api/bots/{slug}/runs/{run_id}/events")
     def stream_run_events(slug: str, run_id: int):
         subscriber = run_event_hub.subscribe(run_id)
@@ -185,7 +670,86 @@ def create_app() -> FastAPI:
     return app
 
 
-def _run_refresh_in_background(slug: str, run_id: int):
+def _enqueue_run(
+    db: Session,
+    bot: Bot,
+    runtime: registry.BotRuntime,
+    profile: bool = False,
+    trace: bool = False,
+    source_urls: list[str] | None = None,
+    priority: bool = False,
+    incremental: bool = False,
+    resume_run: BotRun | None = None,
+) -> dict:
+    """Admit a run into the executor; raises ``QueueFull`` when saturated.
+
+    ``priority`` runs queue ahead of bulk runs and scrape on the shared warm
+    browser, so it is only for small on-demand refreshes. ``resume_run``
+    re-queues an existing run instead of creating one, so the runner picks
+    up its checkpoints.
+    """
+    run_executor.reserve()
+    try:
+        if resume_run is not None:
+            run = crud.requeue_run(db, resume_run)
+            if run is None:
+                raise HTTPException(status_code=409, detail="Run was already resumed")
+        else:
+            # The request is kept on the run so a resume can repeat it.
+            request = {"source_urls": source_urls} if source_urls is not None else {}
+            if incremental:
+                request["incremental"] = True
+            if priority:
+                request["priority"] = True
+            run = crud.create_run(db, bot.id, status="queued", details_json=request)
+    except Exception:
+        run_executor.release()
+        raise
+    run_cancellations.register(run.id)
+    # Published before submitting so the worker's run_dequeued/run_started cannot overtake it.
+    run_event_hub.publish(run.id, {"type": "run_queued", "bot_slug": bot.slug, "source_urls": source_urls})
+    run_executor.submit(
+        runtime,
+        _run_refresh_in_background,
+        bot.slug,
+        run.id,
+        profile,
+        trace,
+        source_urls,
+        priority=priority,
+        incremental=incremental,
+        pooled=priority,
+    )
+    return {"run_id": run.id, "status": "queued", "queue_depth": run_executor.stats()["queue_depth"]}
+
+
+def _queue_full_error(exc: QueueFull) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
+
+
+def _submit_scheduled_run(slug: str, source_urls: list[str] | None, incremental: bool) -> int:
+    db = SessionLocal()
+    try:
+        bot = crud.get_bot_by_slug(db, slug)
+        return _enqueue_run(db, bot, registry.get_runtime(slug), source_urls=source_urls, incremental=incremental)[
+            "run_id"
+        ]
+    finally:
+        db.close()
+
+
+bot_scheduler = BotScheduler(SessionLocal, _submit_scheduled_run, poll_seconds=settings.scheduler_poll_seconds)
+
+
+def _run_refresh_in_background(
+    slug: str,
+    run_id: int,
+    profile: bool = False,
+    trace: bool = False,
+    source_urls: list[str] | None = None,
+    incremental: bool = False,
+    pooled: bool = False,
+):
     db = SessionLocal()
     try:
         bot = crud.get_bot_by_slug(db, slug)
@@ -198,10 +762,53 @@ def _run_refresh_in_background(slug: str, run_id: int):
             run_event_hub.publish(run_id, {"type": "run_finished", "status": "failed", "error_summary": "Run not found"})
             return
 
+        runtime = registry.get_runtime(bot.slug)
+        if not runtime:
+            raise RuntimeError(f"No runtime registered for bot {bot.slug}")
+
         def event_callback(event: dict):
             run_event_hub.publish(run_id, event)
 
-        run_tax_refresh(db, bot, run, event_callback=event_callback)
+        cancel_token = run_cancellations.register(run_id)
+        if cancel_token.cancelled:
+            # Cancelled while queued: never start a browser.
+            crud.finalize_run(db, run, status="cancelled", error_summary=cancel_token.reason)
+            event_callback(
+                {
+                    "type": "run_finished",
+                    "status": "cancelled",
+                    "run_id": run.id,
+                    "bot_slug": bot.slug,
+                    "error_summary": cancel_token.reason,
+                    "snapshot_count": 0,
+                }
+            )
+            return
+
+        waited = crud.mark_run_started(db, run)
+        event_callback({"type": "run_dequeued", "queue_wait_seconds": round(waited, 3)})
+
+        runner = runtime.load_runner()
+        config = runtime.load_config(db, bot.id)
+        runner_kwargs = {"event_callback": event_callback, "cancel_token": cancel_token}
+        if source_urls is not None:
+            runner_kwargs["source_urls"] = source_urls
+        if incremental:
+            runner_kwargs["incremental"] = True
+        if pooled:
+            runner_kwargs["pooled"] = True
+        if not profiling.should_profile(profile, config.get("profile_sample_rate")):
+            runner(db, bot, run, **runner_kwargs)
+            return
+
+        trace_slowest = trace or bool(config.get("profile_trace_slowest"))
+        profiler = profiling.SamplingProfiler(interval_seconds=settings.profile_interval_ms / 1000)
+        with profiler:
+            runner(db, bot, run, trace_slowest=trace_slowest, **runner_kwargs)
+
+        relative = f"runs/run_{run.id}/{profiling.PROFILE_FILENAME}"
+        summary = profiler.write_folded(Path(settings.artifacts_dir) / relative)
+        crud.merge_run_details(db, run, {"profile": {"path": f"/artifacts/{relative}", **summary}})
     except Exception as exc:
         run_event_hub.publish(
             run_id,
@@ -212,6 +819,7 @@ def _run_refresh_in_background(slug: str, run_id: int):
             },
         )
     finally:
+        run_cancellations.discard(run_id)
         db.close()
 
 
@@ -2,12 +2,30 @@ from __future__ import annotations
 
 import uuid
 
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.db import Base
 
+# Stored as JSONB on Postgres so table contents can be indexed and queried.
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Bot(Base):
     __tablename__ = "bots"
@@ -20,6 +38,7 @@ class Bot(Base):
     runs = relationship("BotRun", back_populates="bot")
     snapshots = relationship("TaxPropertySnapshot", back_populates="bot")
     configs = relationship("BotConfig", back_populates="bot")
+    sources = relationship("BotSource", back_populates="bot")
 
 
 class BotConfig(Base):
@@ -30,6 +49,7 @@ class BotConfig(Base):
     bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
     key = Column(String(255), nullable=False)
     config_json = Column(JSON, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
@@ -42,6 +62,7 @@ class BotRun(Base):
     id = Column(Integer, primary_key=True, index=True)
     bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
     status = Column(String(32), nullable=False, index=True)
+    queued_at = Column(DateTime(timezone=True), nullable=True)
     started_at = Column(DateTime(timezone=True), nullable=False)
     finished_at = Column(DateTime(timezone=True), nullable=True)
     error_summary = Column(Text, nullable=True)
@@ -62,9 +83,195 @@ class TaxPropertySnapshot(Base):
     final_url = Column(String(1024), nullable=False)
     property_address = Column(String(1024), nullable=False, index=True)
     total_due = Column(Numeric(12, 2), nullable=False)
-    tables_json = Column(JSON, nullable=False)
-    metadata_json = Column(JSON, nullable=False, default=dict)
+    tables_json = Column(JSONDocument, nullable=False)
+    metadata_json = Column(JSONDocument, nullable=False, default=dict)
     scraped_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
     run = relationship("BotRun", back_populates="property_snapshots")
     bot = relationship("Bot", back_populates="snapshots")
+
+
+class TaxDuePropertyRollup(Base):
+    __tablename__ = "tax_due_property_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "bot_id",
+            "property_address",
+            "granularity",
+            "period_start",
+            name="uq_tax_due_property_rollups_period",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
+    property_address = Column(String(1024), nullable=False)
+    granularity = Column(String(8), nullable=False)
+    period_start = Column(Date, nullable=False)
+    snapshot_count = Column(Integer, nullable=False, default=0)
+    min_total_due = Column(Numeric(12, 2), nullable=False)
+    max_total_due = Column(Numeric(12, 2), nullable=False)
+    first_total_due = Column(Numeric(12, 2), nullable=False)
+    last_total_due = Column(Numeric(12, 2), nullable=False)
+    first_scraped_at = Column(DateTime(timezone=True), nullable=False)
+    last_scraped_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class TaxDueBotRollup(Base):
+    __tablename__ = "tax_due_bot_rollups"
+    __table_args__ = (
+        UniqueConstraint("bot_id", "granularity", "period_start", name="uq_tax_due_bot_rollups_period"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
+    granularity = Column(String(8), nullable=False)
+    period_start = Column(Date, nullable=False)
+    snapshot_count = Column(Integer, nullable=False, default=0)
+    property_count = Column(Integer, nullable=False, default=0)
+    # Sum of each property's last total_due within the period.
+    total_due = Column(Numeric(14, 2), nullable=False)
+
+
+class TaxPropertySnapshotDiff(Base):
+    __tablename__ = "tax_property_snapshot_diffs"
+
+    id = Column(Integer, primary_key=True)
+    snapshot_id = Column(Integer, ForeignKey("tax_property_snapshots.id"), nullable=False, unique=True)
+    previous_snapshot_id = Column(Integer, ForeignKey("tax_property_snapshots.id"), nullable=True)
+    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
+    run_id = Column(Integer, ForeignKey("bot_runs.id"), nullable=False, index=True)
+    property_address = Column(String(1024), nullable=False, index=True)
+    total_due_delta = Column(Numeric(12, 2), nullable=True)
+    change_count = Column(Integer, nullable=False, default=0)
+    # {"cells": [[table_index, row_index, column_index, old, new], ...], "table_count": [old, new]}
+    changes_json = Column(JSON, nullable=False, default=dict)
+    scraped_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class TaxPropertySearchEntry(Base):
+    """Latest searchable text per property, refreshed whenever a snapshot is inserted."""
+
+    __tablename__ = "tax_property_search"
+    __table_args__ = (UniqueConstraint("bot_id", "property_address", name="uq_tax_property_search_property"),)
+
+    id = Column(Integer, primary_key=True)
+    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
+    property_address = Column(String(1024), nullable=False)
+    snapshot_id = Column(Integer, ForeignKey("tax_property_snapshots.id"), nullable=False)
+    source_account_number = Column(String(64), nullable=True)
+    total_due = Column(Numeric(12, 2), nullable=False)
+    scraped_at = Column(DateTime(timezone=True), nullable=False)
+    search_text = Column(Text, nullable=False, default="")
+
+
+class ArtifactBlob(Base):
+    __tablename__ = "artifact_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    path = Column(String(1024), nullable=False)
+    content_type = Column(String(64), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class RunArtifact(Base):
+    __tablename__ = "run_artifacts"
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("bot_runs.id"), nullable=False, index=True)
+    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
+    label = Column(String(64), nullable=False)
+    property_index = Column(Integer, nullable=True)
+    source_url = Column(String(1024), nullable=True)
+    blob_sha256 = Column(String(64), ForeignKey("artifact_blobs.sha256"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class UrlLatencyStat(Base):
+    __tablename__ = "url_latency_stats"
+    __table_args__ = (
+        UniqueConstraint("bot_id", "source_url", "phase", "period_start", name="uq_url_latency_stats_period"),
+        Index("ix_url_latency_stats_bot_period", "bot_id", "period_start"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, index=True)
+    source_url = Column(String(1024), nullable=False)
+    phase = Column(String(64), nullable=False)
+    period_start = Column(Date, nullable=False)
+    sample_count = Column(Integer, nullable=False, default=0)
+    failure_count = Column(Integer, nullable=False, default=0)
+    total_ms = Column(Float, nullable=False, default=0.0)
+    max_ms = Column(Float, nullable=False, default=0.0)
+    buckets = Column(JSON, nullable=False)
+
+
+class BotSchedule(Base):
+    """Scheduler progress per bot, so restarts know which slots were missed."""
+
+    __tablename__ = "bot_schedules"
+
+    id = Column(Integer, primary_key=True)
+    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False, unique=True)
+    last_slot_at = Column(DateTime(timezone=True), nullable=True)
+    last_fired_at = Column(DateTime(timezone=True), nullable=True)
+    last_run_id = Column(Integer, ForeignKey("bot_runs.id"), nullable=True)
+    last_error = Column(Text, nullable=True)
+    fired_total = Column(Integer, nullable=False, default=0)
+    dropped_total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class BotSource(Base):
+    __tablename__ = "bot_sources"
+    __table_args__ = (
+        UniqueConstraint("bot_id", "url", name="uq_bot_sources_bot_url"),
+        # Keyset pagination over a bot's enabled sources.
+        Index("ix_bot_sources_bot_enabled_id", "bot_id", "enabled", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    bot_id = Column(Integer, ForeignKey("bots.id"), nullable=False)
+    url = Column(String(1024), nullable=False)
+    account_number = Column(String(64), nullable=True, index=True)
+    enabled = Column(Boolean, nullable=False, default=True)
+    metadata_json = Column(JSON, nullable=False, default=dict)
+    last_success_at = Column(DateTime(timezone=True), nullable=True)
+    last_failure_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    bot = relationship("Bot", back_populates="sources")
+
+
+class RunUrlResult(Base):
+    """Outcome of one URL in a run; ``bot_runs.details_json`` only keeps the counts."""
+
+    __tablename__ = "run_url_results"
+    __table_args__ = (UniqueConstraint("run_id", "source_url", name="uq_run_url_results_run_url"),)
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("bot_runs.id", ondelete="CASCADE"), nullable=False)
+    source_url = Column(String(1024), nullable=False)
+    status = Column(String(32), nullable=False)
+    result_json = Column(JSON, nullable=False, default=dict)
+    recorded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class RunCheckpoint(Base):
+    """Staged result of one successfully scraped URL, kept until the run is promoted."""
+
+    __tablename__ = "run_checkpoints"
+    __table_args__ = (UniqueConstraint("run_id", "source_url", name="uq_run_checkpoints_run_url"),)
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("bot_runs.id", ondelete="CASCADE"), nullable=False)
+    source_url = Column(String(1024), nullable=False)
+    url_result_json = Column(JSON, nullable=False, default=dict)
+    # Cleared once promoted into tax_property_snapshots by a partial commit.
+    snapshot_json = Column(JSON, nullable=True)
+    scraped_at = Column(DateTime(timezone=True), nullable=False)
+    promoted = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
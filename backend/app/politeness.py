@@ -0,0 +1,197 @@
+"""Per-host politeness for scrapes: rate limiting, retry backoff and circuit breaking.
+
+State is per process and shared by every run, so concurrent runs against the
+same host draw from one token bucket and trip one breaker.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+from app.settings import get_settings
+
+# Timeouts, dropped connections and overloaded servers while navigating; parse failures are not retried.
+_TRANSIENT_ERROR = re.compile(
+    r"Timeout \d+(\.\d+)?ms exceeded|net::ERR_(CONNECTION|TIMED_OUT|NAME_NOT_RESOLVED|NETWORK|ADDRESS|EMPTY_RESPONSE)"
+    r"|HTTP (429|5\d\d)\b|No HTTP response",
+)
+# Only navigation talks to the host; later phases time out on pages that simply lack data.
+_TRANSIENT_PHASES = frozenset({"goto"})
+
+
+def is_transient(url_result: dict[str, Any]) -> bool:
+    if url_result.get("failed_phase") not in _TRANSIENT_PHASES:
+        return False
+    return bool(_TRANSIENT_ERROR.search(str(url_result.get("error") or "")))
+
+
+class TokenBucket:
+    """Allows ``rate_per_second`` requests on average with bursts of up to ``burst``.
+
+    ``reserve`` takes a token immediately and returns how long the caller must
+    wait before using it, so waiters are served in arrival order.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_second
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self):
+        """Return a reserved token that was never used."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive transient failures.
+
+    While open every request is refused; after ``reset_seconds`` one probe is
+    let through (half-open) and its outcome closes or re-opens the breaker. A
+    probe released without an outcome leaves the breaker half-open for the
+    next caller.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or self._clock() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> str | None:
+        """Return ``"closed"`` or ``"probe"`` when a request may go out, None when refused.
+
+        A ``"probe"`` grant must end in ``record_success``, ``record_failure``
+        or ``release_probe``; until then no other probe is let through.
+        """
+        if self.failure_threshold <= 0:
+            return "closed"
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return "closed"
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return "probe"
+            return None
+
+    def release_probe(self):
+        """Give up an unfinished probe so the next request may probe instead."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self.failure_threshold > 0 and self._failures >= self.failure_threshold):
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay_ms: int = 1000
+    max_delay_ms: int = 30000
+
+    def delay_seconds(self, attempt: int, rng: random.Random | None = None) -> float:
+        """Full-jitter exponential backoff before retry number ``attempt`` (1-based)."""
+        ceiling = min(self.max_delay_ms, self.base_delay_ms * 2 ** (attempt - 1))
+        return (rng or random).uniform(0, ceiling) / 1000
+
+
+@dataclass
+class HostGuard:
+    host: str
+    bucket: TokenBucket
+    breaker: CircuitBreaker
+
+
+class HostGuards:
+    def __init__(self, rate_per_minute: int, burst: int, breaker_failures: int, breaker_reset_seconds: int):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.breaker_failures = breaker_failures
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self._lock = threading.Lock()
+        self._guards: dict[str, HostGuard] = {}
+
+    def for_url(self, url: str) -> HostGuard:
+        host = (urlparse(url).hostname or "").lower()
+        with self._lock:
+            guard = self._guards.get(host)
+            if guard is None:
+                guard = HostGuard(
+                    host=host,
+                    bucket=TokenBucket(self.rate_per_minute / 60, self.burst),
+                    breaker=CircuitBreaker(self.breaker_failures, self.breaker_reset_seconds),
+                )
+                self._guards[host] = guard
+            return guard
+
+    def stats(self) -> dict[str, str]:
+        """Breaker state per host seen so far."""
+        with self._lock:
+            guards = list(self._guards.values())
+        return {guard.host: guard.breaker.state for guard in guards}
+
+
+def _from_settings() -> tuple[HostGuards, RetryPolicy]:
+    settings = get_settings()
+    guards = HostGuards(
+        rate_per_minute=settings.scrape_host_rate_per_minute,
+        burst=settings.scrape_host_burst,
+        breaker_failures=settings.scrape_breaker_failures,
+        breaker_reset_seconds=settings.scrape_breaker_reset_seconds,
+    )
+    policy = RetryPolicy(
+        max_attempts=settings.scrape_max_attempts,
+        base_delay_ms=settings.scrape_retry_base_ms,
+        max_delay_ms=settings.scrape_retry_max_ms,
+    )
+    return guards, policy
+
+
+host_guards, retry_policy = _from_settings()
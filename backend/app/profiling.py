@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+PROFILE_FILENAME = "profile.folded"
+MAX_STACK_DEPTH = 128
+
+
+def should_profile(requested: bool, sample_rate: Any) -> bool:
+    if requested:
+        return True
+    try:
+        rate = float(sample_rate or 0)
+    except (TypeError, ValueError):
+        return False
+    return rate > 0 and random.random() < rate
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    # ';' separates frames and ' ' separates the count in the folded format.
+    name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return name.replace(";", ":").replace(" ", "_")
+
+
+def _fold(frame: FrameType | None) -> str:
+    labels: list[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class SamplingProfiler:
+    """Wall-clock sampler for a single thread, emitting folded stacks.
+
+    The output (``frame;frame;frame count`` per line) feeds directly into
+    flamegraph.pl, speedscope or inferno. Time the scraper spends awaiting
+    Playwright shows up as event-loop frames, which is intentional: it is
+    wall-clock time the run spent.
+    """
+
+    def __init__(self, interval_seconds: float = 0.01, thread_id: int | None = None):
+        self.interval_seconds = interval_seconds
+        self.thread_id = thread_id
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started_at = 0.0
+        self.duration_seconds = 0.0
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name="run-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.duration_seconds = time.perf_counter() - self._started_at
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[_fold(frame)] += 1
+
+    def write_folded(self, path: Path) -> dict[str, Any]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with tmp.open("w", encoding="utf-8") as handle:
+            for stack, count in self.samples.most_common():
+                handle.write(f"{stack} {count}\n")
+        os.replace(tmp, path)
+        return {
+            "format": "folded",
+            "sample_count": sum(self.samples.values()),
+            "unique_stacks": len(self.samples),
+            "interval_ms": round(self.interval_seconds * 1000, 3),
+            "duration_ms": round(self.duration_seconds * 1000, 3),
+        }
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Iterable
+
+from sqlalchemy.orm import Session
+
+from app.models import TaxDueBotRollup, TaxDuePropertyRollup, TaxPropertySnapshot
+
+GRANULARITIES = ("day", "month")
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything stored is UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def period_start(value: date | datetime, granularity: str) -> date:
+    if isinstance(value, datetime):
+        value = _as_utc(value).date()
+    if granularity == "day":
+        return value
+    if granularity == "month":
+        return value.replace(day=1)
+    raise ValueError(f"Unsupported rollup granularity: {granularity}")
+
+
+# Property addresses per locking SELECT when folding snapshots into the rollups.
+LOOKUP_CHUNK_SIZE = 500
+
+
+def _insert_missing(db: Session, model: type, rows: list[dict[str, Any]], unique: list[str]):
+    """Create absent rollup rows; rows another run created concurrently are left alone."""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Rollups are not supported on {dialect}")
+    db.execute(insert(model).on_conflict_do_nothing(index_elements=unique), rows)
+
+
+def _locked(query):
+    # A stable lock order keeps concurrent promotes over the same periods from
+    # deadlocking; rows already in the session may predate their increments.
+    query = query.populate_existing()
+    if query.session.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update()
+    return query.all()
+
+
+def _fold(deltas: dict[tuple, dict[str, Any]], key: tuple, total_due: Decimal, scraped_at: datetime):
+    delta = deltas.get(key)
+    if delta is None:
+        deltas[key] = {
+            "snapshot_count": 1,
+            "min_total_due": total_due,
+            "max_total_due": total_due,
+            "first_total_due": total_due,
+            "last_total_due": total_due,
+            "first_scraped_at": scraped_at,
+            "last_scraped_at": scraped_at,
+        }
+        return
+    delta["snapshot_count"] += 1
+    delta["min_total_due"] = min(delta["min_total_due"], total_due)
+    delta["max_total_due"] = max(delta["max_total_due"], total_due)
+    if scraped_at < delta["first_scraped_at"]:
+        delta["first_total_due"] = total_due
+        delta["first_scraped_at"] = scraped_at
+    if scraped_at >= delta["last_scraped_at"]:
+        delta["last_total_due"] = total_due
+        delta["last_scraped_at"] = scraped_at
+
+
+def apply_snapshots(db: Session, snapshots: Iterable[TaxPropertySnapshot]) -> None:
+    """Fold snapshots into the day/month rollups (caller commits).
+
+    The batch is aggregated in memory first, then each touched rollup row is
+    created if missing and updated under a row lock, so runs promoting at the
+    same time neither lose increments nor trip the unique period constraints.
+    """
+    # (bot_id, granularity, period_start) -> property_address -> delta
+    deltas: dict[tuple, dict[str, dict[str, Any]]] = {}
+    for snapshot in snapshots:
+        total_due = Decimal(str(snapshot.total_due))
+        scraped_at = _as_utc(snapshot.scraped_at)
+        for granularity in GRANULARITIES:
+            period = (snapshot.bot_id, granularity, period_start(scraped_at, granularity))
+            _fold(deltas.setdefault(period, {}), snapshot.property_address, total_due, scraped_at)
+    if not deltas:
+        return
+
+    zero = Decimal("0.00")
+    _insert_missing(
+        db,
+        TaxDueBotRollup,
+        [
+            {
+                "bot_id": bot_id,
+                "granularity": granularity,
+                "period_start": start,
+                "snapshot_count": 0,
+                "property_count": 0,
+                "total_due": zero,
+            }
+            for bot_id, granularity, start in deltas
+        ],
+        ["bot_id", "granularity", "period_start"],
+    )
+    # Bot rows are always locked before property rows, in id order.
+    bot_rollups = {
+        (row.bot_id, row.granularity, row.period_start): row
+        for row in _locked(
+            db.query(TaxDueBotRollup)
+            .filter(
+                TaxDueBotRollup.bot_id.in_({bot_id for bot_id, _, _ in deltas}),
+                TaxDueBotRollup.granularity.in_({granularity for _, granularity, _ in deltas}),
+                TaxDueBotRollup.period_start.in_({start for _, _, start in deltas}),
+            )
+            .order_by(TaxDueBotRollup.id)
+        )
+    }
+
+    for period, by_address in sorted(deltas.items()):
+        bot_id, granularity, start = period
+        bot_rollup = bot_rollups[period]
+        addresses = sorted(by_address)
+        for offset in range(0, len(addresses), LOOKUP_CHUNK_SIZE):
+            chunk = addresses[offset : offset + LOOKUP_CHUNK_SIZE]
+            # Placeholders start at snapshot_count 0 and are filled in below.
+            _insert_missing(
+                db,
+                TaxDuePropertyRollup,
+                [
+                    {
+                        **by_address[address],
+                        "bot_id": bot_id,
+                        "property_address": address,
+                        "granularity": granularity,
+                        "period_start": start,
+                        "snapshot_count": 0,
+                    }
+                    for address in chunk
+                ],
+                ["bot_id", "property_address", "granularity", "period_start"],
+            )
+            rows = _locked(
+                db.query(TaxDuePropertyRollup)
+                .filter(
+                    TaxDuePropertyRollup.bot_id == bot_id,
+                    TaxDuePropertyRollup.granularity == granularity,
+                    TaxDuePropertyRollup.period_start == start,
+                    TaxDuePropertyRollup.property_address.in_(chunk),
+                )
+                .order_by(TaxDuePropertyRollup.id)
+            )
+            for rollup in rows:
+                delta = by_address[rollup.property_address]
+                _apply_delta(bot_rollup, rollup, delta)
+                bot_rollup.snapshot_count += delta["snapshot_count"]
+    db.flush()
+
+
+def _apply_delta(bot_rollup: TaxDueBotRollup, rollup: TaxDuePropertyRollup, delta: dict[str, Any]):
+    if not rollup.snapshot_count:
+        for name, value in delta.items():
+            setattr(rollup, name, value)
+        bot_rollup.property_count += 1
+        bot_rollup.total_due += delta["last_total_due"]
+        return
+    rollup.snapshot_count += delta["snapshot_count"]
+    rollup.min_total_due = min(rollup.min_total_due, delta["min_total_due"])
+    rollup.max_total_due = max(rollup.max_total_due, delta["max_total_due"])
+    if delta["first_scraped_at"] < _as_utc(rollup.first_scraped_at):
+        rollup.first_total_due = delta["first_total_due"]
+        rollup.first_scraped_at = delta["first_scraped_at"]
+    if delta["last_scraped_at"] >= _as_utc(rollup.last_scraped_at):
+        bot_rollup.total_due += delta["last_total_due"] - rollup.last_total_due
+        rollup.last_total_due = delta["last_total_due"]
+        rollup.last_scraped_at = delta["last_scraped_at"]
+
+
+def total_due_series(
+    db: Session,
+    bot_id: int,
+    granularity: str,
+    since: date | None = None,
+    until: date | None = None,
+    property_address: str | None = None,
+) -> list[dict]:
+    if property_address is None:
+        model = TaxDueBotRollup
+        query = db.query(TaxDueBotRollup).filter(TaxDueBotRollup.bot_id == bot_id)
+    else:
+        model = TaxDuePropertyRollup
+        query = db.query(TaxDuePropertyRollup).filter(
+            TaxDuePropertyRollup.bot_id == bot_id,
+            TaxDuePropertyRollup.property_address == property_address,
+        )
+    query = query.filter(model.granularity == granularity)
+    if since is not None:
+        query = query.filter(model.period_start >= period_start(since, granularity))
+    if until is not None:
+        query = query.filter(model.period_start <= period_start(until, granularity))
+
+    series: list[dict] = []
+    previous: Decimal | None = None
+    for row in query.order_by(model.period_start.asc()).all():
+        if property_address is None:
+            value = Decimal(row.total_due)
+            property_count = row.property_count
+        else:
+            value = Decimal(row.last_total_due)
+            property_count = 1
+        series.append(
+            {
+                "period_start": row.period_start,
+                "total_due": value,
+                "delta": value - previous if previous is not None else None,
+                "snapshot_count": row.snapshot_count,
+                "property_count": property_count,
+            }
+        )
+        previous = value
+    return series
+
+
+def largest_changes(
+    db: Session,
+    bot_id: int,
+    granularity: str,
+    since: date | None = None,
+    until: date | None = None,
+    limit: int = 10,
+) -> list[dict]:
+    query = db.query(
+        TaxDuePropertyRollup.property_address,
+        TaxDuePropertyRollup.period_start,
+        TaxDuePropertyRollup.first_total_due,
+        TaxDuePropertyRollup.last_total_due,
+    ).filter(
+        TaxDuePropertyRollup.bot_id == bot_id,
+        TaxDuePropertyRollup.granularity == granularity,
+    )
+    if since is not None:
+        query = query.filter(TaxDuePropertyRollup.period_start >= period_start(since, granularity))
+    if until is not None:
+        query = query.filter(TaxDuePropertyRollup.period_start <= period_start(until, granularity))
+    rows = query.order_by(
+        TaxDuePropertyRollup.property_address.asc(),
+        TaxDuePropertyRollup.period_start.asc(),
+    ).all()
+
+    spans: dict[str, dict] = {}
+    for address, start, first_total, last_total in rows:
+        span = spans.get(address)
+        if span is None:
+            spans[address] = {
+                "property_address": address,
+                "start_period": start,
+                "end_period": start,
+                "start_total_due": Decimal(first_total),
+                "end_total_due": Decimal(last_total),
+            }
+        else:
+            span["end_period"] = start
+            span["end_total_due"] = Decimal(last_total)
+
+    changes = []
+    for span in spans.values():
+        span["delta"] = span["end_total_due"] - span["start_total_due"]
+        if span["delta"]:
+            changes.append(span)
+    changes.sort(key=lambda item: (-abs(item["delta"]), item["property_address"]))
+    return changes[:limit]
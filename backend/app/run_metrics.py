@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterable
+
+PHASE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 45.0, 90.0)
+RUN_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+
+class PhaseTimer:
+    """Accumulates monotonic-clock durations per named phase.
+
+    A phase entered more than once (screenshots) is summed. The first phase
+    to raise is remembered as ``failed_phase``.
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._totals: dict[str, float] = {}
+        self.failed_phase: str | None = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            if self.failed_phase is None:
+                self.failed_phase = name
+            raise
+        finally:
+            self._totals[name] = self._totals.get(name, 0.0) + time.perf_counter() - started
+
+    def as_dict(self) -> dict[str, float]:
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self._totals.items()}
+        timings["total"] = round((time.perf_counter() - self._started) * 1000, 3)
+        return timings
+
+
+class PhaseTimingSummary:
+    """Per-phase count, total, max and mean of ``timings_ms``, fed a batch at a time."""
+
+    def __init__(self):
+        self._entries: dict[str, dict[str, float]] = {}
+
+    def add(self, url_results: Iterable[dict[str, Any]]):
+        for url_result in url_results:
+            for name, elapsed_ms in (url_result.get("timings_ms") or {}).items():
+                entry = self._entries.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+                entry["count"] += 1
+                entry["total_ms"] += elapsed_ms
+                entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        return {
+            name: {
+                **entry,
+                "total_ms": round(entry["total_ms"], 3),
+                "avg_ms": round(round(entry["total_ms"], 3) / entry["count"], 3),
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+def summarize_phase_timings(url_results: Iterable[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    summary = PhaseTimingSummary()
+    summary.add(url_results)
+    return summary.as_dict()
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple[tuple[str, str], ...], **extra: str) -> str:
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+class RunMetrics:
+    """Process-local run/phase metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._run_duration: dict[tuple, _Histogram] = {}
+        self._phase_duration: dict[tuple, _Histogram] = {}
+        self._runs: dict[tuple, int] = {}
+        self._url_results: dict[tuple, int] = {}
+
+    def observe_phase(self, bot_slug: str, phase: str, seconds: float):
+        key = (("bot", bot_slug), ("phase", phase))
+        with self._lock:
+            self._phase_duration.setdefault(key, _Histogram(PHASE_BUCKETS)).observe(seconds)
+
+    def observe_run(
+        self,
+        bot_slug: str,
+        status: str,
+        duration_seconds: float,
+        url_results: Iterable[dict[str, Any]] = (),
+    ):
+        run_key = (("bot", bot_slug), ("status", status))
+        with self._lock:
+            self._run_duration.setdefault(run_key, _Histogram(RUN_BUCKETS)).observe(duration_seconds)
+            self._runs[run_key] = self._runs.get(run_key, 0) + 1
+        self.observe_url_results(bot_slug, url_results)
+
+    def observe_url_results(self, bot_slug: str, url_results: Iterable[dict[str, Any]]):
+        """Count URL outcomes and their phase timings; runs report these as batches finish."""
+        with self._lock:
+            for url_result in url_results:
+                url_key = (("bot", bot_slug), ("status", str(url_result.get("status") or "unknown")))
+                self._url_results[url_key] = self._url_results.get(url_key, 0) + 1
+                for name, elapsed_ms in (url_result.get("timings_ms") or {}).items():
+                    if name == "total":
+                        continue
+                    phase_key = (("bot", bot_slug), ("phase", name))
+                    self._phase_duration.setdefault(phase_key, _Histogram(PHASE_BUCKETS)).observe(elapsed_ms / 1000)
+
+    def render(self, gauges: dict[str, tuple[str, float]] | None = None) -> str:
+        lines: list[str] = []
+        with self._lock:
+            self._render_histograms(
+                lines, "agents_run_duration_seconds", "Wall-clock duration of bot runs.", self._run_duration
+            )
+            self._render_histograms(
+                lines,
+                "agents_phase_duration_seconds",
+                "Duration of individual scrape phases per source URL.",
+                self._phase_duration,
+            )
+            self._render_counter(lines, "agents_runs_total", "Finished bot runs by status.", self._runs)
+            self._render_counter(
+                lines, "agents_url_results_total", "Scraped source URLs by outcome.", self._url_results
+            )
+        for name, (help_text, value) in (gauges or {}).items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines: list[str], name: str, help_text: str, series: dict[tuple, _Histogram]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in sorted(series.items()):
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f"{name}_bucket{_labels(labels, le=repr(bound))} {count}")
+            lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {histogram.count}')
+            lines.append(f"{name}_sum{_labels(labels)} {round(histogram.sum, 6)}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    @staticmethod
+    def _render_counter(lines: list[str], name: str, help_text: str, series: dict[tuple, int]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in sorted(series.items()):
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+
+run_metrics = RunMetrics()
@@ -0,0 +1,84 @@
+"""Per-URL outcomes of a run, kept in ``run_url_results`` rather than on the run row.
+
+A run over tens of thousands of sources would otherwise hold every result in
+memory and write them all into ``bot_runs.details_json``; the runner records
+them here in batches as they finish and keeps only counts on the run.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import RunUrlResult
+
+CHUNK_SIZE = 1000
+
+
+def record(db: Session, run_id: int, url_results: Iterable[dict[str, Any]]) -> int:
+    """Store results for the run (caller commits); a URL seen again, e.g. on resume, is replaced."""
+    by_url = {item["source_url"]: item for item in url_results if item.get("source_url")}
+    if not by_url:
+        return 0
+    urls = list(by_url)
+    existing = {}
+    for start in range(0, len(urls), CHUNK_SIZE):
+        chunk = urls[start : start + CHUNK_SIZE]
+        rows = db.query(RunUrlResult).filter(RunUrlResult.run_id == run_id, RunUrlResult.source_url.in_(chunk))
+        existing.update((row.source_url, row) for row in rows)
+    for source_url, item in by_url.items():
+        row = existing.get(source_url)
+        if row is None:
+            row = RunUrlResult(run_id=run_id, source_url=source_url)
+            db.add(row)
+        row.status = str(item.get("status") or "unknown")
+        row.result_json = item
+    db.flush()
+    return len(by_url)
+
+
+def counts(db: Session, run_id: int) -> dict[str, int]:
+    rows = (
+        db.query(RunUrlResult.status, func.count(RunUrlResult.id))
+        .filter(RunUrlResult.run_id == run_id)
+        .group_by(RunUrlResult.status)
+        .all()
+    )
+    return {status: count for status, count in sorted(rows)}
+
+
+def iter_chunks(
+    db: Session,
+    run_id: int,
+    exclude_status: str | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield the run's results in id order, ``chunk_size`` at a time (keyset paging)."""
+    after_id = 0
+    while True:
+        query = db.query(RunUrlResult.id, RunUrlResult.result_json).filter(
+            RunUrlResult.run_id == run_id, RunUrlResult.id > after_id
+        )
+        if exclude_status is not None:
+            query = query.filter(RunUrlResult.status != exclude_status)
+        rows = query.order_by(RunUrlResult.id).limit(chunk_size).all()
+        if not rows:
+            return
+        after_id = rows[-1].id
+        yield [row.result_json for row in rows]
+
+
+def list_results(
+    db: Session,
+    run_id: int,
+    status: str | None = None,
+    after_id: int = 0,
+    limit: int = 100,
+) -> list[RunUrlResult]:
+    query = db.query(RunUrlResult).filter(RunUrlResult.run_id == run_id, RunUrlResult.id > after_id)
+    if status is not None:
+        query = query.filter(RunUrlResult.status == status)
+    return query.order_by(RunUrlResult.id).limit(limit).all()
+
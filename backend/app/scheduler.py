@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app import crud, schedules, sources
+from app.bots import registry
+from app.bots.executor import QueueFull
+from app.models import Bot, BotSchedule
+
+logger = logging.getLogger("app.scheduler")
+
+# A run unfinished for longer than this is assumed orphaned and no longer defers slots.
+ACTIVE_RUN_STALE_AFTER = timedelta(hours=6)
+
+# submit(bot_slug, source_urls or None for all, incremental) -> run id; may raise QueueFull.
+SubmitRun = Callable[[str, list[str] | None, bool], int]
+
+
+def load_schedule(config: dict[str, Any]) -> schedules.ScheduleConfig | None:
+    raw = config.get("schedule")
+    if not raw:
+        return None
+    try:
+        return schedules.ScheduleConfig.model_validate(raw)
+    except ValidationError as exc:
+        logger.warning("Ignoring invalid schedule config: %s", exc)
+        return None
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _batch_urls(db: Session, bot_id: int, slots: list[schedules.Slot]) -> list[str] | None:
+    """Source URLs of the slots' batches, or None when they cover every source."""
+    batch_count = slots[0].batch_count
+    indexes = sorted({slot.batch_index for slot in slots if slot.batch_count == batch_count})
+    if batch_count <= 1 or len(indexes) == batch_count:
+        return None
+    return [url for index in indexes for url in sources.batch_urls(db, bot_id, index, batch_count)]
+
+
+def _claim_state(db: Session, bot_id: int) -> BotSchedule:
+    # Row lock so only one API process fires a given slot.
+    query = db.query(BotSchedule).filter(BotSchedule.bot_id == bot_id)
+    if db.bind.dialect.name == "postgresql":
+        query = query.with_for_update()
+    state = query.first()
+    if state is None:
+        state = BotSchedule(bot_id=bot_id, fired_total=0, dropped_total=0)
+        db.add(state)
+        db.flush()
+    return state
+
+
+class BotScheduler:
+    """Fires bot runs from the ``schedule`` section of each bot's config.
+
+    Every ``poll_seconds`` the due batch slots of each enabled schedule are
+    fired through ``submit``; slots found more than ``grace`` past their
+    jittered time are missed and handled by the schedule's ``catch_up``
+    policy. Progress is kept in ``bot_schedules`` so restarts see what they
+    missed. Slots wait while the bot still has an unfinished run.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        submit: SubmitRun,
+        poll_seconds: int = 15,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self._session_factory = session_factory
+        self._submit = submit
+        self._poll = poll_seconds
+        self._clock = clock
+        self.grace = timedelta(seconds=max(60, 3 * poll_seconds))
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self, now: datetime | None = None) -> list[dict[str, Any]]:
+        now = now or self._clock()
+        fired: list[dict[str, Any]] = []
+        with self._lock:
+            db = self._session_factory()
+            try:
+                for runtime in registry.list_runtimes():
+                    try:
+                        fired.extend(self._tick(db, runtime, now))
+                    except Exception:
+                        db.rollback()
+                        logger.exception("Scheduler pass for %s failed", runtime.slug)
+            finally:
+                db.close()
+        return fired
+
+    def _tick(self, db: Session, runtime: registry.BotRuntime, now: datetime) -> list[dict[str, Any]]:
+        bot = crud.get_bot_by_slug(db, runtime.slug)
+        if not bot:
+            return []
+        schedule = load_schedule(runtime.load_config(db, bot.id))
+        if schedule is None or not schedule.enabled:
+            return []
+
+        state = _claim_state(db, bot.id)
+        if state.last_slot_at is None:
+            # A new schedule starts from now rather than catching up on history.
+            state.last_slot_at = now
+            db.commit()
+            return []
+
+        batches = schedules.batch_count(schedule, sources.count_enabled(db, bot.id))
+        slots = schedules.slots_between(schedule, batches, _aware(state.last_slot_at), now)
+        fire, dropped, handled = schedules.select_due_slots(schedule, bot.id, slots, now, self.grace)
+        if handled is None or (fire and crud.has_active_run(db, bot.id, now - ACTIVE_RUN_STALE_AFTER)):
+            db.commit()
+            return []
+
+        state.last_slot_at = handled.at
+        state.dropped_total += len(dropped)
+        fired = []
+        # Under catch_up="latest" the first run fired also takes the batches of the slots it
+        # replaces, so their accounts are not left out for the rest of the cycle.
+        carried = dropped if schedule.catch_up == "latest" else []
+        for slot in fire:
+            batch = _batch_urls(db, bot.id, [slot, *carried])
+            carried = []
+            try:
+                run_id = self._submit(bot.slug, batch, schedule.mode == "incremental")
+            except QueueFull as exc:
+                state.last_error = str(exc)
+                state.dropped_total += 1
+                continue
+            state.last_run_id = run_id
+            state.last_fired_at = now
+            state.last_error = None
+            state.fired_total += 1
+            fired.append(
+                {
+                    "bot_slug": bot.slug,
+                    "run_id": run_id,
+                    "slot_at": slot.at,
+                    "batch_index": slot.batch_index,
+                    "batch_count": slot.batch_count,
+                }
+            )
+        db.commit()
+        if dropped:
+            logger.info("Dropped %d missed slot(s) for %s (catch_up=%s)", len(dropped), bot.slug, schedule.catch_up)
+        return fired
+
+    def _loop(self):
+        while not self._stop.wait(self._poll):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Scheduler pass failed")
+
+    def start(self):
+        if self._poll <= 0 or self._thread is not None:
+            return
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="bot-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def schedule_status(db: Session, runtime: registry.BotRuntime, bot: Bot, now: datetime | None = None) -> dict[str, Any]:
+    now = now or datetime.now(timezone.utc)
+    config = runtime.load_config(db, bot.id)
+    schedule = load_schedule(config)
+    state = db.query(BotSchedule).filter(BotSchedule.bot_id == bot.id).first()
+    batches = schedules.batch_count(schedule, sources.count_enabled(db, bot.id)) if schedule else 1
+    upcoming = []
+    if schedule is not None and schedule.enabled:
+        upcoming = [
+            {
+                "at": slot.at + schedules.jitter_for(bot.id, slot, schedule.jitter_seconds),
+                "batch_index": slot.batch_index,
+                "batch_count": slot.batch_count,
+            }
+            for slot in schedules.upcoming_slots(schedule, batches, now)
+        ]
+    return {
+        "enabled": bool(schedule and schedule.enabled),
+        "schedule": schedule.model_dump() if schedule else config.get("schedule"),
+        "batch_count": batches,
+        "last_slot_at": _aware(state.last_slot_at) if state else None,
+        "last_fired_at": _aware(state.last_fired_at) if state else None,
+        "last_run_id": state.last_run_id if state else None,
+        "last_error": state.last_error if state else None,
+        "fired_total": state.fired_total if state else 0,
+        "dropped_total": state.dropped_total if state else 0,
+        "upcoming": upcoming,
+    }
@@ -0,0 +1,248 @@
+"""Schedule specs stored in bot configs and the slot arithmetic behind them.
+
+Pure functions only; ``app.scheduler`` does the database work and firing.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+# Longest gap scanned for missed slots; older ones are dropped whatever the policy.
+MAX_LOOKBACK = timedelta(days=31)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_CRON_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+
+
+def _parse_cron_field(text: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in text.split(","):
+        base, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if step < 1:
+            raise ValueError(f"Invalid cron step: {part}")
+        if base == "*":
+            start, end = low, high
+        elif "-" in base:
+            start_text, end_text = base.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(base)
+            end = high if step_text else start
+        if not low <= start <= end <= high:
+            raise ValueError(f"Cron value out of range {low}-{high}: {part}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSpec:
+    """Five-field cron expression evaluated in UTC (``minute hour day month weekday``)."""
+
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    day_restricted: bool
+    weekday_restricted: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronSpec":
+        fields = expression.split()
+        if len(fields) != len(_CRON_FIELDS):
+            raise ValueError("Cron expressions need five fields: minute hour day month weekday")
+        parsed = [_parse_cron_field(text, low, high) for text, (_, low, high) in zip(fields, _CRON_FIELDS)]
+        # Both 0 and 7 mean Sunday; Python counts Monday as 0.
+        weekdays = frozenset((day - 1) % 7 for day in parsed[4])
+        return cls(
+            minutes=parsed[0],
+            hours=parsed[1],
+            days=parsed[2],
+            months=parsed[3],
+            weekdays=weekdays,
+            day_restricted=fields[2] != "*",
+            weekday_restricted=fields[4] != "*",
+        )
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        # Standard cron: when both are restricted either one may match.
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.astimezone(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError("Cron expression never matches")
+
+
+@lru_cache(maxsize=64)
+def _cron_spec(expression: str) -> CronSpec:
+    return CronSpec.parse(expression)
+
+
+class ScheduleConfig(BaseModel):
+    """The ``schedule`` section of a bot config."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = False
+    interval_seconds: int | None = Field(None, ge=60)
+    cron: str | None = None
+    jitter_seconds: int = Field(60, ge=0)
+    # Accounts per scheduled run; batches are spread evenly across each cycle.
+    batch_size: int | None = Field(None, ge=1)
+    # "latest" fires one run for a run of missed slots, covering all of their batches.
+    catch_up: Literal["skip", "latest", "all"] = "latest"
+    max_catch_up_runs: int = Field(5, ge=1)
+    mode: Literal["full", "incremental"] = "incremental"
+
+    @field_validator("cron")
+    @classmethod
+    def _valid_cron(cls, value: str | None) -> str | None:
+        if value is not None:
+            CronSpec.parse(value)
+        return value
+
+    @model_validator(mode="after")
+    def _one_trigger(self) -> "ScheduleConfig":
+        if self.enabled and (self.interval_seconds is None) == (self.cron is None):
+            raise ValueError("An enabled schedule needs exactly one of interval_seconds or cron")
+        return self
+
+
+@dataclass(frozen=True)
+class Slot:
+    at: datetime
+    batch_index: int
+    batch_count: int
+
+
+def _next_cycle(schedule: ScheduleConfig, moment: datetime) -> datetime:
+    if schedule.cron:
+        return _cron_spec(schedule.cron).next_after(moment)
+    interval = schedule.interval_seconds
+    elapsed = (moment - EPOCH).total_seconds()
+    return EPOCH + timedelta(seconds=(math.floor(elapsed / interval) + 1) * interval)
+
+
+def batch_count(schedule: ScheduleConfig, account_count: int) -> int:
+    if not schedule.batch_size or account_count <= schedule.batch_size:
+        return 1
+    return math.ceil(account_count / schedule.batch_size)
+
+
+def slots_between(schedule: ScheduleConfig, batches: int, after: datetime, until: datetime) -> list[Slot]:
+    """Batch slots with ``after < at <= until``, oldest first.
+
+    Batch ``k`` of a cycle starting at ``C`` (next cycle ``C'``) is due at
+    ``C + k * (C' - C) / batches``.
+    """
+    after = max(after, until - MAX_LOOKBACK)
+    slots: list[Slot] = []
+    # Step back one cycle so batches of a cycle that started before ``after`` are found.
+    cycle = _previous_cycle_start(schedule, after)
+    while cycle <= until:
+        following = _next_cycle(schedule, cycle)
+        spacing = (following - cycle) / batches
+        for index in range(batches):
+            at = cycle + spacing * index
+            if after < at <= until:
+                slots.append(Slot(at, index, batches))
+        cycle = following
+    return slots
+
+
+def _previous_cycle_start(schedule: ScheduleConfig, moment: datetime) -> datetime:
+    if not schedule.cron:
+        interval = schedule.interval_seconds
+        elapsed = (moment - EPOCH).total_seconds()
+        return EPOCH + timedelta(seconds=math.floor(elapsed / interval) * interval)
+    # Cron cycles are irregular: find any start in a widening window, then walk forward.
+    for days in (1, 7, 32, 366):
+        start = _next_cycle(schedule, moment - timedelta(days=days))
+        if start > moment:
+            continue
+        while (following := _next_cycle(schedule, start)) <= moment:
+            start = following
+        return start
+    return moment
+
+
+def upcoming_slots(schedule: ScheduleConfig, batches: int, now: datetime, count: int = 5) -> list[Slot]:
+    horizon = now
+    found: list[Slot] = []
+    while len(found) < count:
+        horizon = _next_cycle(schedule, horizon)
+        found = slots_between(schedule, batches, now, horizon)
+    return found[:count]
+
+
+def jitter_for(bot_id: int, slot: Slot, jitter_seconds: int) -> timedelta:
+    # Seeded by slot so every poll (and every process) agrees on the delay.
+    rng = random.Random(f"{bot_id}:{slot.at.isoformat()}:{slot.batch_index}")
+    return timedelta(seconds=rng.uniform(0, jitter_seconds))
+
+
+def select_due_slots(
+    schedule: ScheduleConfig,
+    bot_id: int,
+    slots: list[Slot],
+    now: datetime,
+    grace: timedelta,
+) -> tuple[list[Slot], list[Slot], Slot | None]:
+    """Split slots into (fire, dropped) by catch-up policy and return the last one handled.
+
+    A slot is due once ``at + jitter`` has passed; a due slot more than
+    ``grace`` late counts as missed (the scheduler was down or busy).
+    Slots still waiting on their jitter are left for a later poll.
+    """
+    fire_at = {slot: slot.at + jitter_for(bot_id, slot, schedule.jitter_seconds) for slot in slots}
+    # Only a due prefix is handled, so a slot still in its jitter window is never skipped over.
+    due: list[Slot] = []
+    for slot in slots:
+        if fire_at[slot] > now:
+            break
+        due.append(slot)
+    if not due:
+        return [], [], None
+    current = [slot for slot in due if now - fire_at[slot] <= grace]
+    missed = [slot for slot in due if slot not in current]
+
+    if schedule.catch_up == "all":
+        caught_up = missed[-schedule.max_catch_up_runs :]
+    elif schedule.catch_up == "latest" and not current:
+        caught_up = missed[-1:]
+    else:
+        caught_up = []
+    fire = caught_up + current
+    dropped = [slot for slot in missed if slot not in caught_up]
+    return fire, dropped, due[-1]
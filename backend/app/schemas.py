@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -12,11 +12,70 @@ class HealthResponse(BaseModel):
     llm_model: str
 
 
+class SlowQuery(BaseModel):
+    statement: str
+    duration_ms: float
+    at: float
+
+
+class DatabaseMetricsResponse(BaseModel):
+    pool: dict = Field(default_factory=dict)
+    checkouts: int
+    checked_out: int
+    connections_created: int
+    checkout_timeouts: int
+    checkout_wait_ms_total: float
+    checkout_wait_ms_avg: float
+    checkout_wait_ms_max: float
+    statements: int
+    statement_ms_total: float
+    statement_ms_avg: float
+    statement_ms_max: float
+    slow_query_threshold_ms: int
+    slow_statements: int
+    recent_slow_queries: list[SlowQuery] = Field(default_factory=list)
+
+
+class ArtifactGCResult(BaseModel):
+    runs_expired: int
+    references_released: int
+    blobs_deleted: int
+    bytes_freed: int
+    stray_files_deleted: int
+    run_dirs_deleted: int
+    finished_at: datetime
+
+
+class ArtifactStoreStats(BaseModel):
+    blob_count: int
+    blob_bytes: int
+    referenced_bytes: int
+    reference_count: int
+    runs_with_artifacts: int
+    last_gc: ArtifactGCResult | None = None
+
+
+class BotConfigResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    key: str
+    version: int
+    updated_at: datetime
+    config_json: dict = Field(default_factory=dict)
+
+
+class BotConfigUpdate(BaseModel):
+    key: str | None = Field(None, min_length=1, max_length=255)
+    config_json: dict
+    expected_version: int | None = Field(None, ge=0)
+
+
 class BotRunSummary(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
     status: str
+    queued_at: datetime | None = None
     started_at: datetime
     finished_at: datetime | None = None
     error_summary: str | None = None
@@ -35,11 +94,44 @@ class BotSummary(BaseModel):
 class BotDetail(BaseModel):
     slug: str
     name: str
+    # First page of enabled sources; ``source_count`` is the full total.
     source_urls: list[str] = Field(default_factory=list)
+    source_count: int = 0
     config: dict = Field(default_factory=dict)
     recent_runs: list[BotRunSummary] = Field(default_factory=list)
 
 
+class BotSourceItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    url: str
+    account_number: str | None = None
+    enabled: bool
+    metadata_json: dict = Field(default_factory=dict)
+    last_success_at: datetime | None = None
+    last_failure_at: datetime | None = None
+    last_error: str | None = None
+    updated_at: datetime
+
+
+class BotSourceList(BaseModel):
+    total: int
+    items: list[BotSourceItem] = Field(default_factory=list)
+    next_after_id: int | None = None
+
+
+class BotSourceUpdate(BaseModel):
+    enabled: bool | None = None
+    metadata_json: dict | None = None
+
+
+class SourceImportResult(BaseModel):
+    inserted: int
+    updated: int
+    skipped: int
+
+
 class PropertySnapshotItem(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -58,14 +150,168 @@ class PropertySnapshotItem(BaseModel):
 class RefreshResponse(BaseModel):
     run_id: int
     status: str
+    queue_depth: int = 0
+
+
+class ScheduleSlot(BaseModel):
+    at: datetime
+    batch_index: int
+    batch_count: int
+
+
+class ScheduleStatus(BaseModel):
+    enabled: bool
+    schedule: dict | None = None
+    batch_count: int
+    last_slot_at: datetime | None = None
+    last_fired_at: datetime | None = None
+    last_run_id: int | None = None
+    last_error: str | None = None
+    fired_total: int
+    dropped_total: int
+    upcoming: list[ScheduleSlot] = Field(default_factory=list)
+
+
+class RunCancelResponse(BaseModel):
+    run_id: int
+    status: str
+
+
+class RunQueueStats(BaseModel):
+    active_runs: int
+    queue_depth: int
+    priority_queue_depth: int = 0
+    reserved: int
+    browsers_in_use: int
+    max_concurrent_runs: int
+    max_browsers: int
+    max_queue: int
+    saturated: bool
+    started_total: int
+    rejected_total: int
+    oldest_wait_seconds: float
+    avg_wait_seconds: float
+    max_wait_seconds: float
+    avg_run_seconds: float | None = None
+    retry_after_seconds: int
+    active_by_bot: dict[str, int] = Field(default_factory=dict)
+    host_breakers: dict[str, str] = Field(default_factory=dict)
 
 
 class RunDetails(BaseModel):
     run_id: int
     bot_slug: str
     status: str
+    queued_at: datetime | None = None
     started_at: datetime
     finished_at: datetime | None = None
     error_summary: str | None = None
     details_json: dict = Field(default_factory=dict)
     property_snapshots: list[PropertySnapshotItem] = Field(default_factory=list)
+
+
+class RunUrlResultItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    source_url: str
+    status: str
+    result_json: dict = Field(default_factory=dict)
+    recorded_at: datetime
+
+
+class RunUrlResultList(BaseModel):
+    total: int
+    items: list[RunUrlResultItem] = Field(default_factory=list)
+    next_after_id: int | None = None
+
+
+class TotalDuePoint(BaseModel):
+    period_start: date
+    total_due: Decimal
+    delta: Decimal | None = None
+    snapshot_count: int
+    property_count: int
+
+
+class TotalDueChange(BaseModel):
+    property_address: str
+    start_period: date
+    end_period: date
+    start_total_due: Decimal
+    end_total_due: Decimal
+    delta: Decimal
+
+
+class TotalDueAnalytics(BaseModel):
+    granularity: str
+    property_address: str | None = None
+    series: list[TotalDuePoint] = Field(default_factory=list)
+    largest_changes: list[TotalDueChange] = Field(default_factory=list)
+
+
+class LatencySummary(BaseModel):
+    sample_count: int
+    failure_count: int
+    failure_rate: float
+    avg_ms: float | None = None
+    max_ms: float | None = None
+    p50_ms: float | None = None
+    p95_ms: float | None = None
+    p99_ms: float | None = None
+
+
+class PhaseLatency(LatencySummary):
+    phase: str
+
+
+class UrlLatency(LatencySummary):
+    source_url: str
+    phases: list[PhaseLatency] = Field(default_factory=list)
+
+
+class LatencyReport(BaseModel):
+    since: date
+    until: date
+    overall: LatencySummary
+    phases: list[PhaseLatency] = Field(default_factory=list)
+    urls: list[UrlLatency] = Field(default_factory=list)
+
+
+class SnapshotChange(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    snapshot_id: int
+    previous_snapshot_id: int | None = None
+    run_id: int
+    property_address: str
+    scraped_at: datetime
+    total_due_delta: Decimal | None = None
+    change_count: int
+    changes_json: dict = Field(default_factory=dict)
+
+
+class RunChangeSummary(BaseModel):
+    run_id: int
+    snapshot_count: int
+    new_properties: list[str] = Field(default_factory=list)
+    unchanged_count: int = 0
+    changed: list[SnapshotChange] = Field(default_factory=list)
+
+
+class PropertySearchHit(BaseModel):
+    property_address: str
+    snapshot_id: int
+    source_account_number: str | None = None
+    total_due: Decimal
+    scraped_at: datetime
+    rank: float
+    matched_on: str
+
+
+class PropertySearchResponse(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    items: list[PropertySearchHit] = Field(default_factory=list)
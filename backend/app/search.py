@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import case, func, literal_column, or_
+from sqlalchemy.orm import Session
+
+from app.models import TaxPropertySearchEntry, TaxPropertySnapshot
+
+MAX_SEARCH_TEXT = 100_000
+# Must match the expression indexed in migration 0007.
+TS_CONFIG = literal_column("'simple'")
+
+
+def flatten_tables(tables: list[dict[str, Any]] | None) -> str:
+    cells = [cell for table in tables or [] for row in table.get("rows") or [] for cell in row if cell]
+    return " ".join(str(cell) for cell in cells)[:MAX_SEARCH_TEXT]
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def index_snapshots(db: Session, snapshots: Iterable[TaxPropertySnapshot]) -> None:
+    """Upsert each property's entry from its newest snapshot (caller commits).
+
+    Runs promoting the same property concurrently both land on the unique
+    key; the entry only moves forward, so an older snapshot never replaces a
+    newer one whichever commits first.
+    """
+    newest: dict[tuple[int, str], TaxPropertySnapshot] = {}
+    for snapshot in snapshots:
+        key = (snapshot.bot_id, snapshot.property_address)
+        current = newest.get(key)
+        if current is None or _as_utc(snapshot.scraped_at) >= _as_utc(current.scraped_at):
+            newest[key] = snapshot
+    if not newest:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"The search index is not supported on {dialect}")
+    statement = insert(TaxPropertySearchEntry)
+    updated = ("snapshot_id", "source_account_number", "total_due", "scraped_at", "search_text")
+    statement = statement.on_conflict_do_update(
+        index_elements=["bot_id", "property_address"],
+        set_={name: statement.excluded[name] for name in updated},
+        where=statement.excluded.scraped_at >= TaxPropertySearchEntry.scraped_at,
+    )
+    db.execute(
+        statement,
+        [
+            {
+                "bot_id": snapshot.bot_id,
+                "property_address": snapshot.property_address,
+                "snapshot_id": snapshot.id,
+                "source_account_number": snapshot.source_account_number,
+                "total_due": snapshot.total_due,
+                "scraped_at": snapshot.scraped_at,
+                "search_text": flatten_tables(snapshot.tables_json),
+            }
+            for snapshot in newest.values()
+        ],
+    )
+
+
+def search_properties(db: Session, bot_id: int, q: str, limit: int, offset: int) -> dict[str, Any]:
+    q = q.strip()
+    entry = TaxPropertySearchEntry
+    address_contains = entry.property_address.icontains(q, autoescape=True)
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Backed by a pg_trgm GIN index on property_address and a GIN index
+        # over to_tsvector('simple', search_text).
+        tsquery = func.websearch_to_tsquery(TS_CONFIG, q)
+        vector = func.to_tsvector(TS_CONFIG, entry.search_text)
+        address_match = or_(entry.property_address.op("%")(q), address_contains)
+        table_match = vector.op("@@")(tsquery)
+        rank = func.greatest(func.similarity(entry.property_address, q), func.ts_rank(vector, tsquery))
+    else:
+        address_match = address_contains
+        table_match = entry.search_text.icontains(q, autoescape=True)
+        rank = case((address_match, 1.0), else_=0.5)
+    condition = or_(address_match, table_match)
+
+    base = db.query(entry).filter(entry.bot_id == bot_id, condition)
+    total = base.count()
+    rows = (
+        db.query(entry, rank.label("rank"), address_match.label("address_match"))
+        .filter(entry.bot_id == bot_id, condition)
+        .order_by(rank.desc(), entry.property_address.asc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return {
+        "query": q,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "items": [
+            {
+                "property_address": row.property_address,
+                "snapshot_id": row.snapshot_id,
+                "source_account_number": row.source_account_number,
+                "total_due": row.total_due,
+                "scraped_at": row.scraped_at,
+                "rank": float(rank_value or 0.0),
+                "matched_on": "address" if matched_address else "tables",
+            }
+            for row, rank_value, matched_address in rows
+        ],
+    }
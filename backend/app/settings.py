@@ -25,6 +25,36 @@ class AppSettings:
     dashboard_port: int
     notification_text_phone: str
     tax_source_urls: tuple[str, ...]
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800
+    db_statement_timeout_ms: int = 0
+    db_slow_query_ms: int = 500
+    fast_json_responses: bool = False
+    artifact_retention_days: int = 30
+    artifact_failed_retention_days: int = 90
+    artifact_max_total_mb: int = 5120
+    artifact_gc_interval_seconds: int = 3600
+    artifact_gc_grace_seconds: int = 21600
+    artifact_writer_workers: int = 2
+    artifact_writer_max_pending: int = 8
+    profile_interval_ms: int = 10
+    skip_migrations: bool = False
+    seed_on_startup: bool = True
+    config_cache_ttl_seconds: int = 5
+    max_concurrent_runs: int = 2
+    max_concurrent_browsers: int = 2
+    run_queue_max: int = 10
+    browser_pool_idle_seconds: int = 300
+    scheduler_poll_seconds: int = 15
+    scrape_host_rate_per_minute: int = 30
+    scrape_host_burst: int = 3
+    scrape_max_attempts: int = 3
+    scrape_retry_base_ms: int = 1000
+    scrape_retry_max_ms: int = 30000
+    scrape_breaker_failures: int = 5
+    scrape_breaker_reset_seconds: int = 60
 
 
 def _require_env_present(name: str) -> str:
@@ -45,6 +75,31 @@ def _parse_dashboard_port() -> int:
     return value
 
 
+def _parse_int_env(name: str, default: int, minimum: int = 0) -> int:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        value = int(raw.strip())
+    except ValueError as exc:
+        raise RuntimeError(f"{name} must be an integer") from exc
+    if value < minimum:
+        raise RuntimeError(f"{name} must be greater than or equal to {minimum}")
+    return value
+
+
+def _parse_bool_env(name: str, default: bool = False) -> bool:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    value = raw.strip().lower()
+    if value in {"1", "true", "yes", "on"}:
+        return True
+    if value in {"0", "false", "no", "off"}:
+        return False
+    raise RuntimeError(f"{name} must be a boolean (1/0, true/false)")
+
+
 def _validate_llm_env(provider: str) -> None:
     requirements = PROVIDER_REQUIREMENTS.get(provider)
     if requirements is None:
@@ -77,6 +132,36 @@ def load_settings() -> AppSettings:
         dashboard_port=dashboard_port,
         notification_text_phone=notification_text_phone,
         tax_source_urls=DEFAULT_TAX_SOURCE_URLS,
+        db_pool_size=_parse_int_env("DB_POOL_SIZE", 5, minimum=1),
+        db_max_overflow=_parse_int_env("DB_MAX_OVERFLOW", 10),
+        db_pool_timeout_seconds=_parse_int_env("DB_POOL_TIMEOUT_SECONDS", 30, minimum=1),
+        db_pool_recycle_seconds=_parse_int_env("DB_POOL_RECYCLE_SECONDS", 1800),
+        db_statement_timeout_ms=_parse_int_env("DB_STATEMENT_TIMEOUT_MS", 0),
+        db_slow_query_ms=_parse_int_env("DB_SLOW_QUERY_MS", 500),
+        fast_json_responses=_parse_bool_env("FAST_JSON_RESPONSES"),
+        artifact_retention_days=_parse_int_env("ARTIFACT_RETENTION_DAYS", 30, minimum=1),
+        artifact_failed_retention_days=_parse_int_env("ARTIFACT_FAILED_RETENTION_DAYS", 90, minimum=1),
+        artifact_max_total_mb=_parse_int_env("ARTIFACT_MAX_TOTAL_MB", 5120),
+        artifact_gc_interval_seconds=_parse_int_env("ARTIFACT_GC_INTERVAL_SECONDS", 3600),
+        artifact_gc_grace_seconds=_parse_int_env("ARTIFACT_GC_GRACE_SECONDS", 21600),
+        artifact_writer_workers=_parse_int_env("ARTIFACT_WRITER_WORKERS", 2, minimum=1),
+        artifact_writer_max_pending=_parse_int_env("ARTIFACT_WRITER_MAX_PENDING", 8, minimum=1),
+        profile_interval_ms=_parse_int_env("PROFILE_INTERVAL_MS", 10, minimum=1),
+        skip_migrations=_parse_bool_env("SKIP_MIGRATIONS"),
+        seed_on_startup=_parse_bool_env("SEED_ON_STARTUP", True),
+        config_cache_ttl_seconds=_parse_int_env("CONFIG_CACHE_TTL_SECONDS", 5),
+        max_concurrent_runs=_parse_int_env("MAX_CONCURRENT_RUNS", 2, minimum=1),
+        max_concurrent_browsers=_parse_int_env("MAX_CONCURRENT_BROWSERS", 2, minimum=1),
+        run_queue_max=_parse_int_env("RUN_QUEUE_MAX", 10),
+        browser_pool_idle_seconds=_parse_int_env("BROWSER_POOL_IDLE_SECONDS", 300, minimum=1),
+        scheduler_poll_seconds=_parse_int_env("SCHEDULER_POLL_SECONDS", 15),
+        scrape_host_rate_per_minute=_parse_int_env("SCRAPE_HOST_RATE_PER_MINUTE", 30),
+        scrape_host_burst=_parse_int_env("SCRAPE_HOST_BURST", 3, minimum=1),
+        scrape_max_attempts=_parse_int_env("SCRAPE_MAX_ATTEMPTS", 3, minimum=1),
+        scrape_retry_base_ms=_parse_int_env("SCRAPE_RETRY_BASE_MS", 1000),
+        scrape_retry_max_ms=_parse_int_env("SCRAPE_RETRY_MAX_MS", 30000),
+        scrape_breaker_failures=_parse_int_env("SCRAPE_BREAKER_FAILURES", 5),
+        scrape_breaker_reset_seconds=_parse_int_env("SCRAPE_BREAKER_RESET_SECONDS", 60, minimum=1),
     )
 
 
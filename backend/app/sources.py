@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models import BotSource
+
+CHUNK_SIZE = 1000
+_TRUE = {"1", "true", "yes", "y", "on"}
+_FALSE = {"0", "false", "no", "n", "off"}
+
+AccountForUrl = Callable[[str], str | None]
+
+
+@dataclass
+class ImportCounts:
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+    def add(self, other: "ImportCounts"):
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+
+
+def seed_sources(db: Session, bot_id: int, urls: Iterable[str], account_for_url: AccountForUrl | None = None) -> int:
+    """Insert default sources for a bot that has none yet (caller commits)."""
+    if db.query(BotSource.id).filter(BotSource.bot_id == bot_id).first() is not None:
+        return 0
+    rows = [
+        BotSource(
+            bot_id=bot_id,
+            url=url,
+            account_number=account_for_url(url) if account_for_url else None,
+            metadata_json={},
+        )
+        for url in dict.fromkeys(urls)
+    ]
+    db.add_all(rows)
+    return len(rows)
+
+
+def _parse_enabled(value: str | None) -> bool | None:
+    text = (value or "").strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    return None
+
+
+def upsert_chunk(
+    db: Session,
+    bot_id: int,
+    rows: list[dict[str, str]],
+    account_for_url: AccountForUrl | None = None,
+) -> ImportCounts:
+    """Insert or update one chunk of CSV rows keyed by ``url`` and commit.
+
+    ``account_number`` and ``enabled`` columns map to their fields; every
+    other column is merged into ``metadata_json``.
+    """
+    counts = ImportCounts()
+    by_url: dict[str, dict[str, str]] = {}
+    for row in rows:
+        url = (row.get("url") or "").strip()
+        if not url:
+            counts.skipped += 1
+            continue
+        by_url[url] = row
+
+    existing = {
+        source.url: source
+        for source in db.query(BotSource).filter(BotSource.bot_id == bot_id, BotSource.url.in_(list(by_url)))
+    }
+    for url, row in by_url.items():
+        account = (row.get("account_number") or "").strip() or (account_for_url(url) if account_for_url else None)
+        enabled = _parse_enabled(row.get("enabled"))
+        metadata = {
+            key: value
+            for key, value in row.items()
+            if key and key not in {"url", "account_number", "enabled"} and value not in (None, "")
+        }
+        source = existing.get(url)
+        if source is None:
+            db.add(
+                BotSource(
+                    bot_id=bot_id,
+                    url=url,
+                    account_number=account,
+                    enabled=True if enabled is None else enabled,
+                    metadata_json=metadata,
+                )
+            )
+            counts.inserted += 1
+            continue
+        source.account_number = account or source.account_number
+        if enabled is not None:
+            source.enabled = enabled
+        if metadata:
+            source.metadata_json = {**(source.metadata_json or {}), **metadata}
+        counts.updated += 1
+    db.commit()
+    return counts
+
+
+def import_csv(
+    db: Session,
+    bot_id: int,
+    lines: Iterable[str],
+    account_for_url: AccountForUrl | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> ImportCounts:
+    counts = ImportCounts()
+    chunk: list[dict[str, str]] = []
+    for row in csv.DictReader(lines):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            counts.add(upsert_chunk(db, bot_id, chunk, account_for_url))
+            chunk = []
+    if chunk:
+        counts.add(upsert_chunk(db, bot_id, chunk, account_for_url))
+    return counts
+
+
+class _LineFeed:
+    """Lines for one ``csv.reader``, refilled as the body streams in.
+
+    Only whole records are queued, so the reader never runs dry inside a
+    quoted field; it simply stops until more text arrives.
+    """
+
+    def __init__(self):
+        self._lines: deque[str] = deque()
+        self._record: list[str] = []
+        self._quotes = 0
+        self._partial = ""
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self._lines:
+            raise StopIteration
+        return self._lines.popleft()
+
+    def write(self, text: str):
+        *lines, self._partial = (self._partial + text).split("\n")
+        for line in lines:
+            self._add(line + "\n")
+
+    def close(self):
+        if self._partial:
+            self._add(self._partial)
+            self._partial = ""
+        self._lines.extend(self._record)
+        self._record.clear()
+
+    def _add(self, line: str):
+        self._record.append(line)
+        # Doubled quotes keep the parity, so an odd count means a quoted field spans the newline.
+        self._quotes += line.count('"')
+        if self._quotes % 2 == 0:
+            self._lines.extend(self._record)
+            self._record.clear()
+            self._quotes = 0
+
+
+async def aiter_csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict[str, str]]:
+    """Parse a streamed CSV body, header row first; quoted fields may span lines."""
+    header: list[str] | None = None
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    # Incremental so multi-byte characters split across chunks decode correctly.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    done = False
+    while not done:
+        try:
+            feed.write(decoder.decode(await anext(chunks)))
+        except StopAsyncIteration:
+            feed.write(decoder.decode(b"", final=True))
+            feed.close()
+            done = True
+        for record in reader:
+            if header is None:
+                header = [name.strip() for name in record]
+            elif record:
+                yield dict(zip(header, record))
+
+
+def _stale(stale_before: datetime):
+    # Never succeeded, succeeded too long ago, or failed since the last success.
+    return or_(
+        BotSource.last_success_at.is_(None),
+        BotSource.last_success_at < stale_before,
+        BotSource.last_failure_at > BotSource.last_success_at,
+    )
+
+
+def _enabled_query(db: Session, bot_id: int, stale_before: datetime | None = None):
+    query = db.query(BotSource).filter(BotSource.bot_id == bot_id, BotSource.enabled.is_(True))
+    if stale_before is not None:
+        query = query.filter(_stale(stale_before))
+    return query
+
+
+def stale_among(db: Session, bot_id: int, urls: list[str], stale_before: datetime) -> tuple[set[str], set[str]]:
+    """Split ``urls`` into (those with a source row, those of them that are stale).
+
+    Staleness is judged exactly as ``iter_source_urls`` judges it, so explicit
+    URL lists and full incremental runs agree.
+    """
+    known: set[str] = set()
+    stale: set[str] = set()
+    for start in range(0, len(urls), CHUNK_SIZE):
+        rows = db.query(BotSource.url, _stale(stale_before)).filter(
+            BotSource.bot_id == bot_id, BotSource.url.in_(urls[start : start + CHUNK_SIZE])
+        )
+        for url, is_stale in rows:
+            known.add(url)
+            if is_stale:
+                stale.add(url)
+    return known, stale
+
+
+def count_enabled(db: Session, bot_id: int, stale_before: datetime | None = None) -> int:
+    return _enabled_query(db, bot_id, stale_before).count()
+
+
+def iter_source_urls(
+    db: Session,
+    bot_id: int,
+    stale_before: datetime | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[str]:
+    """Yield enabled source URLs in id order, ``chunk_size`` rows per query.
+
+    Keyset pagination keeps memory flat for very long account lists; with
+    ``stale_before`` only sources never scraped, last scraped before it, or
+    failing since their last success are yielded.
+    """
+    after_id = 0
+    while True:
+        rows = (
+            _enabled_query(db, bot_id, stale_before)
+            .with_entities(BotSource.id, BotSource.url)
+            .filter(BotSource.id > after_id)
+            .order_by(BotSource.id)
+            .limit(chunk_size)
+            .all()
+        )
+        for row in rows:
+            yield row.url
+        if len(rows) < chunk_size:
+            return
+        after_id = rows[-1].id
+
+
+def batch_urls(db: Session, bot_id: int, batch_index: int, batch_count: int) -> list[str]:
+    total = count_enabled(db, bot_id)
+    size = math.ceil(total / batch_count)
+    rows = (
+        _enabled_query(db, bot_id)
+        .with_entities(BotSource.url)
+        .order_by(BotSource.id)
+        .offset(batch_index * size)
+        .limit(size)
+        .all()
+    )
+    return [row.url for row in rows]
+
+
+def find_by_account(db: Session, bot_id: int, account: str) -> BotSource | None:
+    return (
+        db.query(BotSource)
+        .filter(BotSource.bot_id == bot_id, BotSource.account_number == account)
+        .order_by(BotSource.id)
+        .first()
+    )
+
+
+def record_outcomes(
+    db: Session,
+    bot_id: int,
+    url_results: Iterable[dict[str, Any]],
+    finished_at: datetime | None = None,
+) -> int:
+    """Stamp last success/failure on the scraped sources (caller commits).
+
+    Skipped and cancelled URLs were never attempted and are left alone.
+    """
+    finished_at = finished_at or datetime.now(timezone.utc)
+    succeeded: list[str] = []
+    failed: dict[str, str] = {}
+    for item in url_results:
+        if item.get("status") == "success":
+            succeeded.append(item["source_url"])
+        elif item.get("status") == "failed":
+            failed[item["source_url"]] = str(item.get("error") or "")[:2000]
+
+    updated = 0
+    for start in range(0, len(succeeded), CHUNK_SIZE):
+        updated += (
+            db.query(BotSource)
+            .filter(BotSource.bot_id == bot_id, BotSource.url.in_(succeeded[start : start + CHUNK_SIZE]))
+            .update({"last_success_at": finished_at, "last_error": None}, synchronize_session=False)
+        )
+    for url, error in failed.items():
+        updated += (
+            db.query(BotSource)
+            .filter(BotSource.bot_id == bot_id, BotSource.url == url)
+            .update({"last_failure_at": finished_at, "last_error": error}, synchronize_session=False)
+        )
+    return updated
+
+
+def count_sources(db: Session, bot_id: int, enabled: bool | None = None) -> int:
+    query = db.query(BotSource).filter(BotSource.bot_id == bot_id)
+    if enabled is not None:
+        query = query.filter(BotSource.enabled.is_(enabled))
+    return query.count()
+
+
+def update_source(
+    db: Session,
+    bot_id: int,
+    source_id: int,
+    enabled: bool | None = None,
+    metadata_json: dict[str, Any] | None = None,
+) -> BotSource | None:
+    source = db.query(BotSource).filter(BotSource.bot_id == bot_id, BotSource.id == source_id).first()
+    if source is None:
+        return None
+    if enabled is not None:
+        source.enabled = enabled
+    if metadata_json is not None:
+        source.metadata_json = metadata_json
+    db.commit()
+    db.refresh(source)
+    return source
+
+
+def list_sources(
+    db: Session,
+    bot_id: int,
+    enabled: bool | None = None,
+    after_id: int = 0,
+    limit: int = 100,
+) -> list[BotSource]:
+    query = db.query(BotSource).filter(BotSource.bot_id == bot_id, BotSource.id > after_id)
+    if enabled is not None:
+        query = query.filter(BotSource.enabled.is_(enabled))
+    return query.order_by(BotSource.id).limit(limit).all()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session, aliased
+
+from app.crud import latest_snapshot_ids
+from app.models import TaxPropertySnapshot, TaxPropertySnapshotDiff
+
+# Amounts are read from the last cell of a row, the same cell the scraper's
+# total_due extraction prefers ("City Tax", ..., "$1,234.56").
+_PG_AMOUNT = (
+    "CASE WHEN regexp_replace(rw.value ->> -1, '[^0-9.]', '', 'g') ~ '^[0-9]+(\\.[0-9]+)?$' "
+    "THEN CAST(regexp_replace(rw.value ->> -1, '[^0-9.]', '', 'g') AS numeric) END"
+)
+_PG_ROW_MATCH = """
+EXISTS (
+    SELECT 1
+    FROM jsonb_array_elements(tax_property_snapshots.tables_json) AS tbl(value),
+         jsonb_array_elements(tbl.value -> 'rows') AS rw(value)
+    WHERE rw.value ->> 0 = :row_label{amount_clause}
+)
+"""
+
+_SQLITE_AMOUNT = (
+    "CAST(replace(replace(replace(json_extract(rw.value, '$[#-1]'), '$', ''), ',', ''), ' ', '') AS REAL)"
+)
+_SQLITE_AMOUNT_GUARD = "json_extract(rw.value, '$[#-1]') GLOB '*[0-9]*'"
+_SQLITE_ROW_MATCH = """
+EXISTS (
+    SELECT 1
+    FROM json_each(tax_property_snapshots.tables_json) AS tbl,
+         json_each(tbl.value, '$.rows') AS rw
+    WHERE json_extract(rw.value, '$[0]') = :row_label{amount_clause}
+)
+"""
+
+
+def _row_label_clause(dialect: str, row_label: str, min_amount: Decimal | None, max_amount: Decimal | None):
+    if dialect == "postgresql":
+        template, amount, guard = _PG_ROW_MATCH, _PG_AMOUNT, None
+    elif dialect == "sqlite":
+        template, amount, guard = _SQLITE_ROW_MATCH, _SQLITE_AMOUNT, _SQLITE_AMOUNT_GUARD
+    else:
+        raise ValueError(f"Table filters are not supported on {dialect}")
+
+    conditions = []
+    params = [bindparam("row_label", row_label)]
+    if min_amount is not None:
+        conditions.append(f"{amount} > :min_amount")
+        params.append(bindparam("min_amount", min_amount))
+    if max_amount is not None:
+        conditions.append(f"{amount} < :max_amount")
+        params.append(bindparam("max_amount", max_amount))
+    if conditions and guard:
+        conditions.insert(0, guard)
+    amount_clause = "".join(f"\n      AND {condition}" for condition in conditions)
+    return text(template.format(amount_clause=amount_clause)).bindparams(*params)
+
+
+def filter_snapshots(
+    db: Session,
+    bot_id: int,
+    row_label: str | None = None,
+    min_amount: Decimal | None = None,
+    max_amount: Decimal | None = None,
+    table_count_changed: bool = False,
+    latest_only: bool = True,
+    limit: int = 100,
+) -> list[TaxPropertySnapshot]:
+    dialect = db.get_bind().dialect.name
+    query = db.query(TaxPropertySnapshot).filter(TaxPropertySnapshot.bot_id == bot_id)
+
+    if latest_only:
+        ranked = latest_snapshot_ids(bot_id)
+        query = query.join(ranked, TaxPropertySnapshot.id == ranked.c.snapshot_id).filter(ranked.c.rn == 1)
+
+    if row_label is not None:
+        if dialect == "postgresql":
+            # Containment lets the jsonb_path_ops GIN index discard snapshots
+            # without the label before the per-row amount check runs.
+            probe = json.dumps([{"rows": [[row_label]]}])
+            query = query.filter(
+                text("tax_property_snapshots.tables_json @> CAST(:label_probe AS jsonb)").bindparams(
+                    label_probe=probe
+                )
+            )
+        query = query.filter(_row_label_clause(dialect, row_label, min_amount, max_amount))
+
+    if table_count_changed:
+        previous = aliased(TaxPropertySnapshot)
+        query = (
+            query.join(TaxPropertySnapshotDiff, TaxPropertySnapshotDiff.snapshot_id == TaxPropertySnapshot.id)
+            .join(previous, previous.id == TaxPropertySnapshotDiff.previous_snapshot_id)
+            .filter(
+                TaxPropertySnapshot.metadata_json["table_count"].as_integer()
+                != previous.metadata_json["table_count"].as_integer()
+            )
+        )
+
+    return (
+        query.order_by(TaxPropertySnapshot.property_address.asc(), TaxPropertySnapshot.scraped_at.desc())
+        .limit(limit)
+        .all()
+    )
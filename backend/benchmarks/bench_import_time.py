@@ -0,0 +1,89 @@
+"""Measure API cold-start import cost with ``python -X importtime``.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_import_time --module app.main --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+# Modules an API process must not load until a run or an export needs them.
+HEAVY_MODULES = ("playwright", "pyarrow", "PIL")
+
+BENCH_ENV = {
+    "OPENAI_API_KEY": "bench-key",
+    "LLM_PROVIDER": "openai",
+    "LLM_MODEL": "bench",
+    "DASHBOARD_PORT": "3000",
+    "NOTIFICATION_TEXT_PHONE": "",
+    "DATABASE_URL": "sqlite+pysqlite:///:memory:",
+    "ARTIFACTS_DIR": "/tmp/agents-artifacts",
+}
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def measure(module: str = "app.main") -> list[ImportTiming]:
+    env = {**BENCH_ENV, **os.environ}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=Path(__file__).resolve().parents[1],
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def heavy_imports(timings: list[ImportTiming]) -> list[str]:
+    return sorted(
+        {
+            timing.module
+            for timing in timings
+            if any(timing.module == heavy or timing.module.startswith(f"{heavy}.") for heavy in HEAVY_MODULES)
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    timings = measure(args.module)
+    root = next((timing for timing in timings if timing.module == args.module), None)
+    if root is not None:
+        print(f"{args.module}: {root.cumulative_us / 1000:.1f} ms cumulative")
+    print(f"top {args.top} by self time:")
+    for timing in sorted(timings, key=lambda item: item.self_us, reverse=True)[: args.top]:
+        print(f"  {timing.self_us / 1000:8.1f} ms  {timing.module}")
+    heavy = heavy_imports(timings)
+    print("heavy modules imported:", ", ".join(heavy) if heavy else "none")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compare the default Pydantic response path with the orjson fast path.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_snapshot_serialization --rows 500 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+for _name, _value in {
+    "OPENAI_API_KEY": "bench-key",
+    "LLM_PROVIDER": "openai",
+    "LLM_MODEL": "bench",
+    "DASHBOARD_PORT": "3000",
+    "NOTIFICATION_TEXT_PHONE": "",
+    "DATABASE_URL": "sqlite+pysqlite:///:memory:",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import orjson  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app import fast_json, schemas  # noqa: E402
+
+
+def _build_rows(count: int, table_rows: int) -> list[tuple]:
+    rows = []
+    for idx in range(count):
+        tables = [
+            {
+                "table_index": table_idx,
+                "rows": [[f"Line {line}", f"${line * 10 + idx}.00", "Paid"] for line in range(table_rows)],
+            }
+            for table_idx in range(3)
+        ]
+        rows.append(
+            (
+                idx,
+                idx // 10,
+                f"https://syracuse.go2gov.net/faces/accounts?number={idx:010d}&src=SDG",
+                f"{idx:010d}",
+                "https://syracuse.go2gov.net/faces/accounts/detail",
+                f"{idx} MOONEY AVE.",
+                Decimal(f"{idx}.25"),
+                tables,
+                {"table_count": len(tables), "redirect_chain": []},
+                datetime(2026, 2, 14, 12, 0, 0, tzinfo=timezone.utc),
+            )
+        )
+    return rows
+
+
+def _pydantic_path(objects: list[SimpleNamespace], adapter: TypeAdapter) -> bytes:
+    # Mirrors FastAPI's response_model handling: validate, dump in JSON mode,
+    # then let JSONResponse run json.dumps over the result.
+    validated = adapter.validate_python(objects, from_attributes=True)
+    return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+
+def _fast_path(rows: list[tuple]) -> bytes:
+    return fast_json.snapshot_list_response(rows).body
+
+
+def _time(func, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--table-rows", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = _build_rows(args.rows, args.table_rows)
+    objects = [SimpleNamespace(**dict(zip(fast_json.SNAPSHOT_ITEM_FIELDS, row))) for row in rows]
+    adapter = TypeAdapter(list[schemas.PropertySnapshotItem])
+
+    assert orjson.loads(_pydantic_path(objects, adapter)) == orjson.loads(_fast_path(rows))
+
+    pydantic_samples = _time(lambda: _pydantic_path(objects, adapter), args.repeat)
+    fast_samples = _time(lambda: _fast_path(rows), args.repeat)
+
+    pydantic_ms = statistics.median(pydantic_samples) * 1000
+    fast_ms = statistics.median(fast_samples) * 1000
+    print(f"rows={args.rows} table_rows={args.table_rows} repeat={args.repeat}")
+    print(f"pydantic response_model path: {pydantic_ms:8.2f} ms (median)")
+    print(f"orjson row-tuple fast path:   {fast_ms:8.2f} ms (median)")
+    print(f"speedup: {pydantic_ms / fast_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
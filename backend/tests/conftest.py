@@ -14,6 +14,7 @@ os.environ.setdefault("ARTIFACTS_DIR", "/tmp/agents-artifacts")
 TEST_DB = Path(__file__).resolve().parent / "test.sqlite3"
 os.environ.setdefault("DATABASE_URL", f"sqlite+pysqlite:///{TEST_DB}")
 
+from app.config_cache import bot_config_cache  # noqa: E402
 from app.db import engine  # noqa: E402
 from app.models import Base  # noqa: E402
 
@@ -22,4 +23,5 @@ from app.models import Base  # noqa: E402
 def reset_database():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    bot_config_cache.clear()
     yield
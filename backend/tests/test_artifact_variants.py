@@ -0,0 +1,39 @@
+import io
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import main as main_module
+
+
+def _png(width: int, height: int) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, format="PNG")
+    return out.getvalue()
+
+
+def test_thumbnail_variant_is_generated_once_and_cacheable() -> None:
+    stored = main_module.artifact_store.put(_png(1600, 4000))
+
+    with TestClient(main_module.app) as client:
+        thumb = client.get(f"/api/artifact-store/blobs/{stored.sha256}", params={"variant": "thumb"})
+        cached = client.get(
+            f"/api/artifact-store/blobs/{stored.sha256}",
+            params={"variant": "thumb"},
+            headers={"If-None-Match": thumb.headers["etag"]},
+        )
+        full = client.get(f"/api/artifact-store/blobs/{stored.sha256}")
+        missing = client.get(f"/api/artifact-store/blobs/{'0' * 64}", params={"variant": "thumb"})
+
+    assert thumb.status_code == 200
+    assert thumb.headers["content-type"] == "image/webp"
+    assert "immutable" in thumb.headers["cache-control"]
+    assert thumb.headers["etag"] == f'"{stored.sha256}-thumb"'
+    with Image.open(io.BytesIO(thumb.content)) as image:
+        assert image.size == (320, 800)
+    assert main_module.artifact_store.variant_file(stored.sha256, "thumb").exists()
+
+    assert cached.status_code == 304
+    assert full.status_code == 200
+    assert full.headers["content-type"] == "image/png"
+    assert missing.status_code == 404
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from app import artifacts, crud
+from app.db import SessionLocal
+from app.models import ArtifactBlob, RunArtifact
+
+
+def test_store_deduplicates_identical_bytes(tmp_path) -> None:
+    store = artifacts.ContentAddressedStore(tmp_path, compress=False)
+
+    first = store.put(b"same-bytes")
+    second = store.put(b"same-bytes")
+    other = store.put(b"other-bytes")
+
+    assert first.path == second.path
+    assert not first.deduplicated and second.deduplicated
+    assert other.path != first.path
+    assert first.path.startswith("/artifacts/blobs/")
+    assert len(list((tmp_path / "blobs").glob("*/*"))) == 2
+
+
+def _finished_run(db, bot_id: int, status: str, days_ago: int):
+    run = crud.create_run(db, bot_id)
+    crud.finalize_run(db, run, status=status)
+    run.finished_at = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    db.commit()
+    return run
+
+
+def test_gc_expires_by_age_and_status_then_deletes_unreferenced_blobs(tmp_path) -> None:
+    store = artifacts.ContentAddressedStore(tmp_path, compress=False)
+    policy = artifacts.RetentionPolicy(max_age_days=7, failed_max_age_days=30, max_total_bytes=0, grace_seconds=60)
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        old_success = _finished_run(db, bot.id, "success", days_ago=10)
+        old_failed = _finished_run(db, bot.id, "failed", days_ago=10)
+        recent = _finished_run(db, bot.id, "success", days_ago=1)
+
+        shared = store.put(b"shared")
+        expired_only = store.put(b"expired-only")
+        failed_only = store.put(b"failed-only")
+        artifacts.record_run_artifacts(
+            db, store, bot.id, old_success.id, [{"artifacts": {"before": shared.path, "parsed": expired_only.path}}]
+        )
+        artifacts.record_run_artifacts(db, store, bot.id, old_failed.id, [{"artifacts": {"error": failed_only.path}}])
+        artifacts.record_run_artifacts(db, store, bot.id, recent.id, [{"artifacts": {"before": shared.path}}])
+        (tmp_path / "runs" / f"run_{old_success.id}").mkdir(parents=True)
+
+        stale = time.time() - 3600
+        for stored in (shared, expired_only, failed_only):
+            os.utime(store.blob_file(stored.sha256, "png"), (stale, stale))
+
+        result = artifacts.collect_garbage(db, store, policy)
+
+        assert result["runs_expired"] == 1
+        assert result["blobs_deleted"] == 1
+        assert not store.blob_file(expired_only.sha256, "png").exists()
+        assert store.blob_file(shared.sha256, "png").exists()
+        assert store.blob_file(failed_only.sha256, "png").exists()
+        assert not (tmp_path / "runs" / f"run_{old_success.id}").exists()
+        assert db.query(RunArtifact).filter_by(run_id=old_success.id).count() == 0
+        assert db.get(ArtifactBlob, expired_only.sha256) is None
+    finally:
+        db.close()
+
+
+def test_gc_expires_cancelled_runs_on_the_failed_run_window(tmp_path) -> None:
+    store = artifacts.ContentAddressedStore(tmp_path, compress=False)
+    policy = artifacts.RetentionPolicy(max_age_days=7, failed_max_age_days=30, max_total_bytes=0, grace_seconds=60)
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        old_cancelled = _finished_run(db, bot.id, "cancelled", days_ago=40)
+        kept_cancelled = _finished_run(db, bot.id, "cancelled", days_ago=10)
+        old_blob = store.put(b"cancelled-old")
+        kept_blob = store.put(b"cancelled-kept")
+        artifacts.record_run_artifacts(db, store, bot.id, old_cancelled.id, [{"artifacts": {"before": old_blob.path}}])
+        artifacts.record_run_artifacts(
+            db, store, bot.id, kept_cancelled.id, [{"artifacts": {"before": kept_blob.path}}]
+        )
+        for run in (old_cancelled, kept_cancelled):
+            (tmp_path / "runs" / f"run_{run.id}").mkdir(parents=True)
+
+        result = artifacts.collect_garbage(db, store, policy)
+
+        assert result["runs_expired"] == 1
+        assert db.query(RunArtifact).filter_by(run_id=old_cancelled.id).count() == 0
+        assert db.query(RunArtifact).filter_by(run_id=kept_cancelled.id).count() == 1
+        assert not (tmp_path / "runs" / f"run_{old_cancelled.id}").exists()
+        assert (tmp_path / "runs" / f"run_{kept_cancelled.id}").exists()
+    finally:
+        db.close()
+
+
+def test_gc_size_cap_releases_oldest_runs_and_respects_grace(tmp_path) -> None:
+    store = artifacts.ContentAddressedStore(tmp_path, compress=False)
+    policy = artifacts.RetentionPolicy(max_age_days=365, failed_max_age_days=365, max_total_bytes=15, grace_seconds=60)
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        older = _finished_run(db, bot.id, "success", days_ago=3)
+        newer = _finished_run(db, bot.id, "success", days_ago=1)
+        old_blob = store.put(b"0123456789")
+        new_blob = store.put(b"abcdefghij")
+        artifacts.record_run_artifacts(db, store, bot.id, older.id, [{"artifacts": {"before": old_blob.path}}])
+        artifacts.record_run_artifacts(db, store, bot.id, newer.id, [{"artifacts": {"before": new_blob.path}}])
+
+        result = artifacts.collect_garbage(db, store, policy)
+
+        # The older run is released, but its blob was written moments ago and
+        # stays on disk until the grace period passes.
+        assert result["runs_expired"] == 1
+        assert result["blobs_deleted"] == 0
+        assert store.blob_file(old_blob.sha256, "png").exists()
+        assert artifacts.referenced_bytes(db) == 10
+    finally:
+        db.close()
+
+
+def test_writer_persists_in_background_and_flushes(tmp_path) -> None:
+    store = artifacts.ContentAddressedStore(tmp_path, compress=False)
+
+    async def capture():
+        writer = artifacts.ArtifactWriter(store, max_workers=2, max_pending=1)
+        paths = [await writer.submit(data) for data in (b"one", b"two", b"one")]
+        await writer.close()
+        return paths, writer
+
+    paths, writer = asyncio.run(capture())
+
+    assert paths[0] == paths[2] == store.put(b"one").path
+    assert (writer.written, writer.deduplicated, writer.errors) == (2, 1, [])
+    for path in paths:
+        assert (tmp_path / path.removeprefix("/artifacts/")).exists()
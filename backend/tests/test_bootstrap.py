@@ -0,0 +1,21 @@
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+from app import bootstrap
+from app.db import engine
+
+
+def test_schema_is_current_only_once_stamped_at_head() -> None:
+    config = bootstrap._alembic_config()
+    assert not bootstrap.schema_is_current(engine, config)
+
+    with engine.begin() as connection:
+        MigrationContext.configure(connection).stamp(ScriptDirectory.from_config(config), "head")
+    try:
+        assert bootstrap.schema_is_current(engine, config)
+        # The fast path returns before alembic's env.py is ever loaded.
+        assert bootstrap.migrate(engine) is False
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE alembic_version"))
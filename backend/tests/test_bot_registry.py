@@ -0,0 +1,230 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.bots import registry
+from app.bots.executor import QueueFull, RunExecutor
+from app.main import app
+from app.settings import get_settings
+
+
+def _runtime(slug: str, max_runs: int = 1, browsers: int = 1) -> registry.BotRuntime:
+    return registry.BotRuntime(
+        slug=slug,
+        name=slug,
+        runner="app.bots.tax.runner:run_tax_refresh",
+        resources=registry.ResourceNeeds(browsers=browsers, max_concurrent_runs=max_runs),
+    )
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_executor_enforces_per_bot_and_global_limits() -> None:
+    executor = RunExecutor(max_concurrent_runs=2, max_browsers=2, max_queue=4)
+    release = threading.Event()
+    started: list[str] = []
+
+    def job(name: str) -> None:
+        started.append(name)
+        release.wait(2)
+
+    alpha, beta, gamma = _runtime("alpha"), _runtime("beta"), _runtime("gamma")
+    executor.submit(alpha, job, "alpha-1")
+    executor.submit(alpha, job, "alpha-2")
+    executor.submit(beta, job, "beta-1")
+    executor.submit(gamma, job, "gamma-1")
+
+    _wait_for(lambda: len(started) == 2)
+    # alpha-2 waits on its bot limit without blocking beta; gamma hits the global cap.
+    assert sorted(started) == ["alpha-1", "beta-1"]
+    assert executor.stats()["queue_depth"] == 2
+
+    release.set()
+    _wait_for(lambda: executor.stats()["active_runs"] == 0 and not executor.stats()["queue_depth"])
+    assert sorted(started) == ["alpha-1", "alpha-2", "beta-1", "gamma-1"]
+
+
+def test_tax_runtime_is_registered_lazily_and_validates_config() -> None:
+    runtime = registry.get_runtime("tax")
+    assert runtime is not None
+    assert runtime.load_runner().__name__ == "run_tax_refresh"
+
+    with TestClient(app) as client:
+        bot = client.get("/api/bots/tax").json()
+        invalid = client.put("/api/bots/tax/config", json={"config_json": {"profile_sample_rate": 2}})
+        missing = client.post("/api/bots/unknown/refresh")
+
+    assert bot["source_urls"] == runtime.list_source_urls(get_settings())
+    assert bot["config"]["table_selector"] == "table"
+    assert invalid.status_code == 422
+    assert missing.status_code == 404
+
+
+def test_executor_rejects_when_queue_is_full() -> None:
+    executor = RunExecutor(max_concurrent_runs=1, max_browsers=1, max_queue=1)
+    release = threading.Event()
+    runtime = _runtime("alpha")
+
+    executor.reserve()
+    executor.submit(runtime, release.wait, 2)
+    executor.reserve()
+    executor.submit(runtime, release.wait, 2)
+    try:
+        executor.reserve()
+    except QueueFull as exc:
+        assert exc.retry_after >= 1
+    else:
+        raise AssertionError("third run should not be admitted")
+
+    stats = executor.stats()
+    assert (stats["active_runs"], stats["queue_depth"], stats["rejected_total"]) == (1, 1, 1)
+    assert stats["saturated"]
+    release.set()
+    _wait_for(lambda: executor.stats()["active_runs"] == 0)
+
+
+def test_refresh_returns_429_with_retry_after_when_saturated(monkeypatch) -> None:
+    from app import main as main_module
+
+    saturated = RunExecutor(max_concurrent_runs=1, max_browsers=1, max_queue=0)
+    saturated.reserve()
+    monkeypatch.setattr(main_module, "run_executor", saturated)
+
+    with TestClient(app) as client:
+        response = client.post("/api/bots/tax/refresh")
+        queue = client.get("/api/run-queue").json()
+        runs = client.get("/api/bots/tax").json()["recent_runs"]
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert queue["rejected_total"] == 1 and queue["reserved"] == 1
+    assert runs == []
+
+
+def test_priority_jobs_jump_queued_bulk_runs() -> None:
+    executor = RunExecutor(max_concurrent_runs=2, max_browsers=2, max_queue=4)
+    release = threading.Event()
+    started: list[str] = []
+
+    def job(name: str) -> None:
+        started.append(name)
+        release.wait(2)
+
+    tax = _runtime("tax")
+    executor.submit(tax, job, "bulk-1")
+    executor.submit(tax, job, "bulk-2")
+    executor.submit(tax, job, "account-1", priority=True)
+
+    # The account refresh skips the queued bulk run and takes the pooled browser's slot, not the bot's.
+    _wait_for(lambda: len(started) == 2)
+    assert started == ["bulk-1", "account-1"]
+    assert executor.stats()["browsers_in_use"] == 2
+    release.set()
+    _wait_for(lambda: executor.stats()["active_runs"] == 0 and not executor.stats()["queue_depth"])
+
+
+def test_pooled_browser_counts_against_the_browser_budget() -> None:
+    pool_open = threading.Event()
+    executor = RunExecutor(max_concurrent_runs=3, max_browsers=1, max_queue=4, pool_browser_open=pool_open.is_set)
+    release = threading.Event()
+    started: list[str] = []
+
+    def job(name: str) -> None:
+        started.append(name)
+        if name.startswith("account"):
+            pool_open.set()
+        release.wait(2)
+
+    executor.submit(_runtime("alpha"), job, "bulk-1")
+    executor.submit(_runtime("tax"), job, "account-1", priority=True)
+    _wait_for(lambda: started == ["bulk-1"])
+    release.set()
+    _wait_for(lambda: started == ["bulk-1", "account-1"])
+
+    # The account run is done but its warm browser is still up, so the bulk run waits for it to close.
+    release.clear()
+    _wait_for(lambda: executor.stats()["active_runs"] == 0)
+    executor.submit(_runtime("beta"), job, "bulk-2")
+    time.sleep(0.05)
+    assert started == ["bulk-1", "account-1"] and executor.stats()["browsers_in_use"] == 1
+    pool_open.clear()
+    executor.wake()
+    _wait_for(lambda: started[-1] == "bulk-2")
+    release.set()
+    _wait_for(lambda: executor.stats()["active_runs"] == 0)
+
+
+def test_account_refresh_queues_a_single_source_url(monkeypatch) -> None:
+    from app import main as main_module
+    from app.bots.tax.config import account_number_from_url
+
+    submitted = {}
+    monkeypatch.setattr(
+        main_module,
+        "_run_refresh_in_background",
+        lambda *args, **kwargs: submitted.update({args[1]: (args[4], kwargs.get("pooled"))}),
+    )
+    source_url = get_settings().tax_source_urls[0]
+    account = account_number_from_url(source_url)
+
+    with TestClient(app) as client:
+        response = client.post(f"/api/bots/tax/properties/{account}/refresh")
+        unknown = client.post("/api/bots/tax/properties/does-not-exist/refresh")
+    scheduled = main_module._submit_scheduled_run("tax", [source_url], False)
+
+    assert response.status_code == 200 and response.json()["status"] == "queued"
+    _wait_for(lambda: len(submitted) == 2)
+    # Only the on-demand refresh borrows the warm browser; a scheduled batch of the same URL does not.
+    assert submitted[response.json()["run_id"]] == ([source_url], True)
+    assert submitted[scheduled] == ([source_url], False)
+    assert unknown.status_code == 404
+
+
+def test_run_queued_is_published_before_the_worker_can_start(monkeypatch) -> None:
+    from app import main as main_module
+
+    executor = RunExecutor(max_concurrent_runs=1, max_browsers=1, max_queue=1)
+    hub = main_module.RunEventHub()
+    published_at_submit = []
+
+    def submit(runtime, func, slug, run_id, *args, **kwargs):
+        published_at_submit.extend(event["type"] for event in hub._history.get(run_id, []))
+        executor.release()
+
+    monkeypatch.setattr(executor, "submit", submit)
+    monkeypatch.setattr(main_module, "run_executor", executor)
+    monkeypatch.setattr(main_module, "run_event_hub", hub)
+
+    with TestClient(app) as client:
+        response = client.post("/api/bots/tax/refresh")
+
+    assert response.status_code == 200
+    assert published_at_submit == ["run_queued"]
+
+
+def test_startup_fails_runs_orphaned_by_a_restart() -> None:
+    from app import crud
+    from app.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        queued = crud.create_run(db, bot.id, status="queued").id
+        running = crud.create_run(db, bot.id).id
+        finished = crud.create_run(db, bot.id)
+        crud.finalize_run(db, finished, status="success")
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        runs = {run["id"]: run for run in client.get("/api/bots/tax").json()["recent_runs"]}
+
+    assert runs[queued]["status"] == runs[running]["status"] == "failed"
+    assert runs[queued]["error_summary"] == "Interrupted by a restart before finishing"
+    assert runs[finished.id]["status"] == "success"
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from app.bots.tax import scraper
+from app.browser_pool import BrowserPool
+
+
+class _Browser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+
+class _Launcher:
+    def __init__(self):
+        self.browsers: list[_Browser] = []
+
+    async def __call__(self) -> _Browser:
+        self.browsers.append(_Browser())
+        return self.browsers[-1]
+
+
+async def _identity(browser):
+    return browser
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_pool_reuses_the_warm_browser_and_relaunches_a_dead_one() -> None:
+    launcher = _Launcher()
+    pool = BrowserPool(idle_seconds=60, launcher=launcher)
+    try:
+        first = pool.run(_identity)
+        second = pool.run(_identity)
+        first.connected = False
+        third = pool.run(_identity)
+    finally:
+        pool.close()
+
+    assert first is second and third is not first
+    assert pool.launches == 2 and pool.leases == 3
+    assert third.closed and not pool.is_open
+
+
+def test_idle_pool_closes_the_browser_and_relaunches_on_next_lease() -> None:
+    launcher = _Launcher()
+    closed = []
+    pool = BrowserPool(idle_seconds=0.05, launcher=launcher, on_close=lambda: closed.append(True))
+    try:
+        first = pool.run(_identity)
+        _wait_for(lambda: not pool.is_open)
+        second = pool.run(_identity)
+        assert pool.is_open
+    finally:
+        pool.close()
+
+    assert first.closed and second is not first
+    assert pool.launches == 2 and closed == [True, True]
+
+
+def test_pooled_scrape_runs_on_the_pool_browser(monkeypatch, tmp_path) -> None:
+    launcher = _Launcher()
+    pool = BrowserPool(idle_seconds=60, launcher=launcher)
+    calls = []
+
+    async def fake_scrape_all(**kwargs):
+        calls.append({**kwargs, "thread": threading.current_thread().name})
+        return {"url_results": [], "snapshots": []}
+
+    monkeypatch.setattr(scraper, "browser_pool", pool)
+    monkeypatch.setattr(scraper, "_scrape_all_async", fake_scrape_all)
+    try:
+        for run_id in (1, 2):
+            scraper.scrape_tax_data_pooled(run_id, ["https://example.com/?number=1"], str(tmp_path), deadline_seconds=5)
+    finally:
+        pool.close()
+
+    assert [call["run_id"] for call in calls] == [1, 2]
+    assert calls[0]["browser"] is calls[1]["browser"] is launcher.browsers[0]
+    assert {call["thread"] for call in calls} == {"browser-pool"}
+    assert calls[0]["deadline_seconds"] == 5 and calls[0]["artifacts_root"] == tmp_path
+    assert pool.launches == 1 and pool.leases == 2
@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.bots.tax.runner import run_tax_refresh
+from app.bots.tax.scraper import _scrape_or_cancel
+from app.cancellation import CancelToken, run_cancellations
+from app.db import SessionLocal
+from app.main import app
+from app.models import RunCheckpoint, TaxPropertySnapshot
+
+
+class _HangingPage:
+    def __init__(self):
+        self.closed = False
+
+    async def screenshot(self, **_: object) -> bytes:
+        await asyncio.sleep(30)
+        return b""
+
+    def set_default_timeout(self, timeout: float) -> None:
+        self.default_timeout = timeout
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+
+def test_cancel_token_runs_callbacks_once() -> None:
+    token = CancelToken()
+    calls = []
+    token.add_callback(lambda: calls.append("early"))
+
+    assert token.cancel("stop") is True
+    assert token.cancel("again") is False
+    token.add_callback(lambda: calls.append("late"))
+
+    assert token.cancelled and token.reason == "stop"
+    assert calls == ["early", "late"]
+
+
+def test_in_flight_url_is_abandoned_and_page_closed() -> None:
+    async def scenario():
+        page = _HangingPage()
+        cancelled = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.05, cancelled.set)
+        outcome = await asyncio.wait_for(
+            _scrape_or_cancel(
+                page,
+                cancelled,
+                source_url="https://example.com/?number=1",
+                writer=None,
+                index=1,
+                table_selector="table",
+                event_callback=None,
+            ),
+            timeout=2,
+        )
+        return outcome, page.closed
+
+    assert asyncio.run(scenario()) == (None, True)
+
+
+def test_runner_finalizes_cancelled_run_with_partial_results() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        run = crud.create_run(db, bot.id)
+        token = CancelToken()
+        token.cancel("Cancelled by user")
+        events = []
+
+        def fake_scraper(**kwargs):
+            assert kwargs["cancel_token"] is token
+            return {
+                "artifacts_root": "/artifacts/runs/run_1",
+                "url_results": [
+                    {"status": "success", "source_url": "https://example.com/1", "total_due": "1.00"},
+                    {"status": "cancelled", "source_url": "https://example.com/2", "error": "Run cancelled"},
+                ],
+                "snapshots": [{"source_url": "https://example.com/1", "scraped_at": datetime.now(timezone.utc)}],
+                "cancelled": True,
+            }
+
+        result = run_tax_refresh(db, bot, run, event_callback=events.append, scraper_func=fake_scraper, cancel_token=token)
+        db.refresh(run)
+
+        assert result["status"] == "cancelled"
+        assert run.status == "cancelled" and run.error_summary == "Cancelled by user"
+        assert run.details_json["url_counts"] == {"cancelled": 1, "success": 1}
+        assert db.query(TaxPropertySnapshot).count() == 0
+        # The finished URL stays staged for a resume.
+        assert db.query(RunCheckpoint).filter(RunCheckpoint.run_id == run.id).count() == 1
+        assert events[-1]["type"] == "run_finished" and events[-1]["status"] == "cancelled"
+    finally:
+        db.close()
+
+
+def test_cancel_endpoint_rejects_finished_and_unknown_runs() -> None:
+    with TestClient(app) as client:
+        db = SessionLocal()
+        try:
+            bot = crud.get_bot_by_slug(db, "tax")
+            queued = crud.create_run(db, bot.id, status="queued")
+            finished = crud.create_run(db, bot.id)
+            crud.finalize_run(db, finished, status="success")
+            queued_id, finished_id = queued.id, finished.id
+        finally:
+            db.close()
+
+        token = run_cancellations.register(queued_id)
+        try:
+            accepted = client.post(f"/api/bots/tax/runs/{queued_id}/cancel")
+            done = client.post(f"/api/bots/tax/runs/{finished_id}/cancel")
+            missing = client.post("/api/bots/tax/runs/999999/cancel")
+        finally:
+            run_cancellations.discard(queued_id)
+
+    assert accepted.json() == {"run_id": queued_id, "status": "cancelling"}
+    assert token.cancelled
+    assert done.status_code == 409
+    assert missing.status_code == 404
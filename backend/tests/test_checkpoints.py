@@ -0,0 +1,204 @@
+import time
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.bots.tax.config import DEFAULT_TAX_CONFIG
+from app.bots.tax.runner import run_tax_refresh
+from app.db import SessionLocal
+from app.main import app
+from app.models import BotRun, BotSource, RunCheckpoint, RunUrlResult, TaxPropertySnapshot
+from app.settings import get_settings
+
+URLS = list(get_settings().tax_source_urls)
+
+
+def _snapshot(source_url: str) -> dict:
+    return {
+        "source_url": source_url,
+        "source_account_number": source_url.split("number=")[1].split("&")[0],
+        "final_url": source_url,
+        "property_address": f"{source_url[-20:]} MAIN ST.",
+        "total_due": "10.00",
+        "tables_json": [{"rows": [["TOTAL", "$10.00"]]}],
+        "metadata_json": {},
+        "scraped_at": datetime.now(timezone.utc),
+    }
+
+
+def _checkpointing_scraper(seen: list, fail: set[str]):
+    def scraper(**kwargs):
+        url_results = []
+        for url in kwargs["source_urls"]:
+            seen.append(url)
+            if url in fail:
+                url_results.append({"status": "failed", "source_url": url, "error": "no table"})
+                continue
+            url_results.append({"status": "success", "source_url": url})
+            kwargs["checkpoint_callback"](url_results[-1], _snapshot(url))
+        return {"url_results": url_results, "snapshots": []}
+
+    return scraper
+
+
+def test_resumed_run_skips_checkpointed_urls_and_promotes_once() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        run = crud.create_run(db, bot.id)
+        first_seen, second_seen = [], []
+
+        first = run_tax_refresh(db, bot, run, scraper_func=_checkpointing_scraper(first_seen, {URLS[-1]}))
+        staged = db.query(RunCheckpoint).count()
+        visible = db.query(TaxPropertySnapshot).count()
+
+        crud.requeue_run(db, run)
+        second = run_tax_refresh(db, bot, run, scraper_func=_checkpointing_scraper(second_seen, set()))
+        promoted = db.query(TaxPropertySnapshot).filter(TaxPropertySnapshot.run_id == run.id).count()
+        remaining = db.query(RunCheckpoint).count()
+        recorded = db.query(RunUrlResult).filter(RunUrlResult.run_id == run.id).count()
+    finally:
+        db.close()
+
+    assert first["status"] == "failed" and staged == len(URLS) - 1 and visible == 0
+    assert second_seen == [URLS[-1]]
+    assert second["status"] == "success" and second["details_json"]["resumed"] == len(URLS) - 1
+    assert second["details_json"]["url_counts"] == {"success": len(URLS)}
+    assert "url_results" not in second["details_json"] and recorded == len(URLS)
+    assert promoted == len(URLS) and remaining == 0
+
+
+def test_partial_commit_publishes_successes_and_marks_only_them_fresh() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        crud.update_bot_config(db, bot.id, {**DEFAULT_TAX_CONFIG, "partial_commit": True})
+        run = crud.create_run(db, bot.id)
+
+        result = run_tax_refresh(db, bot, run, scraper_func=_checkpointing_scraper([], {URLS[0]}))
+        visible = db.query(TaxPropertySnapshot).count()
+        checkpoint_payloads = [row.snapshot_json for row in db.query(RunCheckpoint)]
+        fresh = db.query(BotSource).filter(BotSource.last_success_at.isnot(None)).count()
+    finally:
+        db.close()
+
+    assert result["status"] == "failed" and result["details_json"]["partial_commit"] is True
+    assert result["snapshot_count"] == visible == len(URLS) - 1
+    # Promoted checkpoints stay (without payload) so a resume still skips them.
+    assert checkpoint_payloads == [None] * (len(URLS) - 1)
+    assert fresh == len(URLS) - 1
+
+
+def test_resume_endpoint_requeues_unfinished_work(monkeypatch) -> None:
+    from app import main as main_module
+
+    submitted = []
+    monkeypatch.setattr(main_module, "_run_refresh_in_background", lambda *args, **kwargs: submitted.append(args))
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        try:
+            bot = crud.get_bot_by_slug(db, "tax")
+            failed = crud.create_run(db, bot.id, details_json={"source_urls": URLS[:1], "incremental": True})
+            crud.finalize_run(db, failed, status="failed", error_summary="boom")
+            succeeded = crud.create_run(db, bot.id)
+            crud.finalize_run(db, succeeded, status="success")
+        finally:
+            db.close()
+
+        resumed = client.post(f"/api/bots/tax/runs/{failed.id}/resume")
+        again = client.post(f"/api/bots/tax/runs/{failed.id}/resume")
+        rejected = client.post(f"/api/bots/tax/runs/{succeeded.id}/resume")
+        missing = client.post("/api/bots/tax/runs/999999/resume")
+
+    assert resumed.status_code == 200 and resumed.json()["run_id"] == failed.id
+    deadline = time.monotonic() + 5
+    while not submitted and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert submitted[0][1] == failed.id and submitted[0][4] == URLS[:1]
+    assert again.status_code == 409
+    assert rejected.status_code == 409
+    assert missing.status_code == 404
+
+
+def test_concurrent_resumes_requeue_a_run_once() -> None:
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(first)
+        run = crud.create_run(first, bot.id)
+        crud.finalize_run(first, run, status="cancelled")
+        # Both requests loaded the run while it was still cancelled.
+        stale = second.get(BotRun, run.id)
+        assert stale.status == "cancelled"
+
+        winner = crud.requeue_run(first, run)
+        loser = crud.requeue_run(second, stale)
+    finally:
+        first.close()
+        second.close()
+
+    assert winner is not None and winner.status == "queued"
+    assert loser is None
+
+
+def test_url_results_are_recorded_in_batches_and_paged_by_the_endpoint() -> None:
+    batches = []
+
+    def batching_scraper(**kwargs):
+        urls = list(kwargs["source_urls"])
+        for start in range(0, len(urls), 2):
+            batch = [{"status": "failed", "source_url": url, "error": "no table"} for url in urls[start : start + 2]]
+            kwargs["results_callback"](batch)
+            batches.append(len(batch))
+        return {"url_results": [], "snapshots": []}
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        try:
+            bot = crud.get_bot_by_slug(db, "tax")
+            run = crud.create_run(db, bot.id)
+            result = run_tax_refresh(db, bot, run, scraper_func=batching_scraper)
+        finally:
+            db.close()
+
+        first = client.get(f"/api/bots/tax/runs/{run.id}/url-results", params={"limit": 2}).json()
+        rest = client.get(
+            f"/api/bots/tax/runs/{run.id}/url-results", params={"after_id": first["next_after_id"], "limit": 1000}
+        ).json()
+        details = client.get(f"/api/bots/tax/runs/{run.id}").json()["details_json"]
+
+    assert result["status"] == "failed" and len(batches) > 1
+    assert f"{len(URLS)} of {len(URLS)} source URL(s)" in result["error_summary"]
+    assert "url_results" not in details and details["url_counts"] == {"failed": len(URLS)}
+    assert first["total"] == len(URLS) and len(first["items"]) == 2
+    assert [item["source_url"] for item in first["items"] + rest["items"]] == URLS
+    assert rest["next_after_id"] is None
+
+
+def test_resumed_account_refresh_keeps_priority_and_the_pooled_browser(monkeypatch) -> None:
+    from app import main as main_module
+
+    submitted = []
+    monkeypatch.setattr(main_module, "_run_refresh_in_background", lambda *args, **kwargs: submitted.append(kwargs))
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        try:
+            bot = crud.get_bot_by_slug(db, "tax")
+            run = crud.create_run(db, bot.id, details_json={"source_urls": URLS[:1], "priority": True})
+            # The runner's own details replace the queued request when it finishes.
+            result = run_tax_refresh(
+                db, bot, run, scraper_func=_checkpointing_scraper([], set(URLS)), source_urls=URLS[:1], pooled=True
+            )
+        finally:
+            db.close()
+
+        resumed = client.post(f"/api/bots/tax/runs/{run.id}/resume")
+
+    assert result["status"] == "failed" and result["details_json"]["priority"] is True
+    assert resumed.status_code == 200
+    deadline = time.monotonic() + 5
+    while not submitted and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert submitted[0]["pooled"] is True
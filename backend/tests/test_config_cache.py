@@ -0,0 +1,72 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import crud
+from app.config_cache import ConfigCache
+from app.db import SessionLocal, engine
+from app.main import app
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _count_statements(callback) -> int:
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        callback()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return len(statements)
+
+
+def test_cache_serves_hits_without_queries_and_revalidates_by_version() -> None:
+    clock = _Clock()
+    cache = ConfigCache(revalidate_seconds=5, clock=clock)
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        assert cache.get(db, bot.id, "tax.default")[0] == 1
+
+        assert _count_statements(lambda: cache.get(db, bot.id, "tax.default")) == 0
+
+        # Another process bumps the version; we only notice after the window.
+        crud.update_bot_config(db, bot.id, {"table_selector": "table.tax"})
+        assert cache.get(db, bot.id, "tax.default")[1].get("table_selector") == "table"
+        clock.now = 6
+        version, config = cache.get(db, bot.id, "tax.default")
+        assert (version, config["table_selector"]) == (2, "table.tax")
+
+        clock.now = 12
+        cache.get(db, bot.id, "tax.default")
+        assert cache.stats()["revalidations"] == 1
+    finally:
+        db.close()
+
+
+def test_config_api_updates_with_optimistic_versioning() -> None:
+    with TestClient(app) as client:
+        current = client.get("/api/bots/tax/config").json()
+        assert current["version"] == 1
+
+        updated = client.put(
+            "/api/bots/tax/config",
+            json={"config_json": {**current["config_json"], "table_selector": "#taxes table"}, "expected_version": 1},
+        )
+        stale = client.put("/api/bots/tax/config", json={"config_json": {}, "expected_version": 1})
+        bot = client.get("/api/bots/tax").json()
+
+    assert updated.status_code == 200
+    assert updated.json()["version"] == 2
+    assert stale.status_code == 409
+    # Local writes invalidate the shared cache immediately.
+    assert bot["config"]["table_selector"] == "#taxes table"
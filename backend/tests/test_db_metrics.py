@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.db_metrics import DatabaseMetrics, instrument_engine
+from app.main import app
+
+
+def test_engine_events_record_statements_and_checkouts() -> None:
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    metrics = DatabaseMetrics(slow_query_ms=0)
+    instrument_engine(engine, metrics)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+
+    snapshot = metrics.snapshot(engine.pool)
+    assert snapshot["statements"] == 2
+    assert snapshot["checkouts"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["slow_statements"] == 0
+
+
+def test_slow_statements_are_kept_above_threshold() -> None:
+    metrics = DatabaseMetrics(slow_query_ms=100)
+    metrics.record_statement("SELECT   *\n FROM bots", 0.25)
+    metrics.record_statement("SELECT 1", 0.01)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["slow_statements"] == 1
+    assert snapshot["recent_slow_queries"][0]["statement"] == "SELECT * FROM bots"
+    assert snapshot["recent_slow_queries"][0]["duration_ms"] == 250.0
+
+
+def test_database_metrics_endpoint() -> None:
+    with TestClient(app) as client:
+        client.get("/api/health")
+        response = client.get("/api/metrics/db")
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["statements"] >= 1
+    assert "pool" in payload
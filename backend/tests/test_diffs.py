@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.db import SessionLocal
+from app.diffs import diff_tables
+from app.main import app
+
+
+def test_diff_tables_reports_changed_added_and_removed_cells() -> None:
+    old = [{"table_index": 0, "rows": [["City Tax", "$100.00"], ["TOTAL", "$100.00"]]}]
+    new = [
+        {"table_index": 0, "rows": [["City Tax", "$120.00"], ["TOTAL", "$120.00", "Due"]]},
+        {"table_index": 1, "rows": [["Paid"]]},
+    ]
+
+    changes = diff_tables(old, new)
+
+    assert changes["cells"] == [
+        [0, 0, 1, "$100.00", "$120.00"],
+        [0, 1, 1, "$100.00", "$120.00"],
+        [0, 1, 2, None, "Due"],
+        [1, 0, 0, None, "Paid"],
+    ]
+    assert changes["table_count"] == [1, 2]
+    assert diff_tables(old, old) == {"cells": []}
+
+
+def _snapshot(address: str, amount: str, hour: int) -> dict:
+    return {
+        "source_url": "https://example.com/1",
+        "final_url": "https://example.com/final/1",
+        "property_address": address,
+        "total_due": amount,
+        "tables_json": [{"table_index": 0, "rows": [["TOTAL", f"${amount}"]]}],
+        "scraped_at": datetime(2026, 2, 14, hour, tzinfo=timezone.utc),
+    }
+
+
+def test_changes_endpoints_read_stored_diffs() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        first = crud.create_run(db, bot.id)
+        crud.create_tax_property_snapshots(
+            db, bot.id, first.id, [_snapshot("104 MOONEY AVE.", "100.00", 9), _snapshot("200 MAIN ST.", "50.00", 9)]
+        )
+        second = crud.create_run(db, bot.id)
+        crud.create_tax_property_snapshots(
+            db,
+            bot.id,
+            second.id,
+            [
+                _snapshot("104 MOONEY AVE.", "125.00", 10),
+                _snapshot("200 MAIN ST.", "50.00", 10),
+                _snapshot("300 ELM ST.", "10.00", 10),
+            ],
+        )
+        second_id = second.id
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        changes = client.get("/api/bots/tax/properties/104 MOONEY AVE./changes").json()
+        summary = client.get(f"/api/bots/tax/runs/{second_id}/changes").json()
+
+    assert len(changes) == 1
+    assert changes[0]["total_due_delta"] == "25.00"
+    assert changes[0]["changes_json"]["cells"] == [[0, 0, 1, "$100.00", "$125.00"]]
+
+    assert summary["snapshot_count"] == 3
+    assert summary["new_properties"] == ["300 ELM ST."]
+    assert summary["unchanged_count"] == 1
+    assert [item["property_address"] for item in summary["changed"]] == ["104 MOONEY AVE."]
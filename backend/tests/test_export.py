@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.db import SessionLocal
+from app.main import app
+
+
+def _seed_snapshots() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        run = crud.create_run(db, bot.id)
+        crud.create_tax_property_snapshots(
+            db,
+            bot.id,
+            run.id,
+            [
+                {
+                    "source_url": f"https://example.com/{day}",
+                    "source_account_number": str(day),
+                    "final_url": f"https://example.com/final/{day}",
+                    "property_address": "104 MOONEY AVE.",
+                    "total_due": f"{day}0.00",
+                    "tables_json": [{"table_index": 0, "rows": [["City Tax", f"${day}0.00"], ["TOTAL", f"${day}0.00"]]}],
+                    "metadata_json": {"table_count": 1},
+                    "scraped_at": datetime(2026, 2, day, 12, 0, tzinfo=timezone.utc),
+                }
+                for day in range(1, 6)
+            ],
+        )
+    finally:
+        db.close()
+
+
+def test_ndjson_export_streams_filtered_range() -> None:
+    _seed_snapshots()
+    with TestClient(app) as client:
+        response = client.get(
+            "/api/bots/tax/export",
+            params={"format": "ndjson", "since": "2026-02-02T00:00:00Z", "until": "2026-02-04T00:00:00Z"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [item["total_due"] for item in lines] == ["20.00", "30.00"]
+
+
+def test_csv_export_flattens_table_cells() -> None:
+    _seed_snapshots()
+    with TestClient(app) as client:
+        response = client.get("/api/bots/tax/export", params={"format": "csv"})
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    # 5 snapshots x 2 table rows x 2 cells.
+    assert len(rows) == 20
+    assert rows[0]["property_address"] == "104 MOONEY AVE."
+    assert (rows[0]["row_index"], rows[0]["column_index"], rows[0]["value"]) == ("0", "0", "City Tax")
+
+
+def test_parquet_export_round_trips() -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    _seed_snapshots()
+    with TestClient(app) as client:
+        response = client.get("/api/bots/tax/export", params={"format": "parquet"})
+
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows == 5
+    assert json.loads(table.column("tables_json")[0].as_py())[0]["rows"][1][0] == "TOTAL"
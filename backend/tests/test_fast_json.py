@@ -0,0 +1,54 @@
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app import crud
+from app import main as main_module
+from app.db import SessionLocal
+
+
+def _seed_snapshots() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        run = crud.create_run(db, bot.id)
+        crud.create_tax_property_snapshots(
+            db,
+            bot.id,
+            run.id,
+            [
+                {
+                    "source_url": f"https://example.com/{idx}",
+                    "source_account_number": str(idx) if idx % 2 else None,
+                    "final_url": f"https://example.com/final/{idx}",
+                    "property_address": f"{idx} MAIN ST.",
+                    "total_due": f"{idx}00.50",
+                    "tables_json": [{"table_index": 0, "rows": [["TOTAL", f"${idx}00.50"], ["Café", "é"]]}],
+                    "metadata_json": {"table_count": 1},
+                    "scraped_at": datetime(2026, 2, 14, 10, idx, 5, 123000, tzinfo=timezone.utc),
+                }
+                for idx in range(1, 4)
+            ],
+        )
+    finally:
+        db.close()
+
+
+def test_fast_json_path_matches_pydantic_wire_format(monkeypatch) -> None:
+    _seed_snapshots()
+    paths = [
+        "/api/bots/tax/properties/latest",
+        "/api/bots/tax/properties/1 MAIN ST./history",
+    ]
+
+    with TestClient(main_module.app) as client:
+        default_bodies = [client.get(path).json() for path in paths]
+        monkeypatch.setattr(main_module, "settings", replace(main_module.settings, fast_json_responses=True))
+        fast_responses = [client.get(path) for path in paths]
+
+    for default_body, fast_response in zip(default_bodies, fast_responses):
+        assert fast_response.status_code == 200
+        assert fast_response.headers["content-type"] == "application/json"
+        assert fast_response.json() == default_body
+    assert len(default_bodies[0]) == 3
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+from app import crud, freshness, sources
+from app.bots.tax.runner import run_tax_refresh
+from app.db import SessionLocal
+
+NOW = datetime.now(timezone.utc)
+URLS = [f"https://example.com/?number={number}" for number in ("1", "2", "3", "4")]
+
+
+def _snapshot(source_url: str, scraped_at: datetime) -> dict:
+    return {
+        "source_url": source_url,
+        "source_account_number": source_url.rsplit("=", 1)[1],
+        "final_url": source_url,
+        "property_address": f"{source_url.rsplit('=', 1)[1]} MAIN ST.",
+        "total_due": "10.00",
+        "tables_json": [{"rows": [["TOTAL", "$10.00"]]}],
+        "metadata_json": {},
+        "scraped_at": scraped_at,
+    }
+
+
+def _seed_history(db) -> int:
+    bot = crud.seed_tax_bot(db)
+    run = crud.create_run(db, bot.id)
+    crud.create_tax_property_snapshots(
+        db,
+        bot.id,
+        run.id,
+        [
+            _snapshot(URLS[0], NOW - timedelta(minutes=5)),
+            _snapshot(URLS[1], NOW - timedelta(hours=3)),
+        ],
+    )
+    # 3 is a tracked source that succeeded recently but has failed since.
+    sources.upsert_chunk(db, bot.id, [{"url": URLS[2]}])
+    sources.record_outcomes(db, bot.id, [{"source_url": URLS[2], "status": "success"}], NOW - timedelta(minutes=10))
+    sources.record_outcomes(db, bot.id, [{"source_url": URLS[2], "status": "failed"}], NOW - timedelta(minutes=2))
+    db.commit()
+    return bot.id
+
+
+def test_stale_source_urls_picks_old_missing_and_failed_accounts() -> None:
+    db = SessionLocal()
+    try:
+        bot_id = _seed_history(db)
+        stale = freshness.stale_source_urls(db, bot_id, URLS, ttl_seconds=3600, now=NOW)
+    finally:
+        db.close()
+
+    # 1 is fresh; 2 is past the TTL, 3 failed last run, 4 was never scraped.
+    assert stale == URLS[1:]
+
+
+def test_incremental_run_scrapes_only_stale_accounts() -> None:
+    db = SessionLocal()
+    try:
+        bot_id = _seed_history(db)
+        bot = crud.get_bot_by_slug(db, "tax")
+        run = crud.create_run(db, bot_id)
+        seen = {}
+
+        def fake_scraper(**kwargs):
+            seen["source_urls"] = kwargs["source_urls"]
+            return {"url_results": [], "snapshots": []}
+
+        result = run_tax_refresh(
+            db,
+            bot,
+            run,
+            scraper_func=fake_scraper,
+            source_urls=[URLS[0]],
+            incremental=True,
+        )
+    finally:
+        db.close()
+
+    assert "source_urls" not in seen
+    assert result["status"] == "success"
+    assert result["details_json"]["incremental"] == {"ttl_seconds": 3600, "stale": 0, "fresh": 1}
+
+
+def test_failure_in_an_earlier_batch_run_keeps_the_account_stale() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        sources.upsert_chunk(db, bot.id, [{"url": url} for url in URLS])
+        # Account 1 also has a snapshot from within the TTL.
+        earlier = crud.create_run(db, bot.id)
+        crud.create_tax_property_snapshots(db, bot.id, earlier.id, [_snapshot(URLS[0], NOW - timedelta(minutes=10))])
+
+        def scraper(failing: set[str]):
+            def scrape(**kwargs):
+                results = [
+                    {"source_url": url, "status": "failed" if url in failing else "success"}
+                    for url in kwargs["source_urls"]
+                ]
+                snapshots = [
+                    _snapshot(url, datetime.now(timezone.utc)) for url in kwargs["source_urls"] if url not in failing
+                ]
+                return {"url_results": results, "snapshots": snapshots}
+
+            return scrape
+
+        # Batch one fails account 1; batch two, a later run, covers different accounts and succeeds.
+        first = crud.create_run(db, bot.id)
+        run_tax_refresh(db, bot, first, scraper_func=scraper({URLS[0]}), source_urls=URLS[:2])
+        second = crud.create_run(db, bot.id)
+        run_tax_refresh(db, bot, second, scraper_func=scraper(set()), source_urls=URLS[2:])
+
+        stale = freshness.stale_source_urls(db, bot.id, URLS, ttl_seconds=3600)
+    finally:
+        db.close()
+
+    # Account 2 was staged but never published because its batch failed, so it is stale too.
+    assert stale == URLS[:2]
@@ -0,0 +1,13 @@
+from benchmarks.bench_import_time import heavy_imports, measure
+
+# Generous ceiling: this guards against regressions like importing a browser
+# runtime at module level, not against slow CI machines.
+APP_IMPORT_BUDGET_MS = 5000
+
+
+def test_api_import_skips_heavy_runtimes_and_stays_within_budget() -> None:
+    timings = measure("app.main")
+    app_main = next(timing for timing in timings if timing.module == "app.main")
+
+    assert heavy_imports(timings) == []
+    assert app_main.cumulative_us / 1000 < APP_IMPORT_BUDGET_MS
@@ -0,0 +1,96 @@
+from datetime import date, datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app import crud, latency
+from app.db import SessionLocal, db_metrics
+from app.main import app
+from app.models import UrlLatencyStat
+
+
+def _result(url: str, total_ms: float, status: str = "success", failed_phase: str | None = None) -> dict:
+    return {
+        "status": status,
+        "source_url": url,
+        "failed_phase": failed_phase,
+        "timings_ms": {"goto": total_ms * 0.8, "total": total_ms},
+    }
+
+
+def test_stats_are_folded_incrementally_and_reported_as_percentiles() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        day = datetime(2026, 10, 1, 12, tzinfo=timezone.utc)
+        url = "https://example.com/a"
+        for _ in range(98):
+            latency.record_url_results(db, bot.id, [_result(url, 900.0)], recorded_at=day)
+        latency.record_url_results(
+            db,
+            bot.id,
+            [_result(url, 50000.0, status="failed", failed_phase="goto"), _result(url, 55000.0)],
+            recorded_at=day,
+        )
+        db.commit()
+
+        # One row per (url, phase, day), regardless of how many runs fed it.
+        assert db.query(UrlLatencyStat).count() == 2
+
+        report = latency.latency_report(db, bot.id, date(2026, 10, 1), date(2026, 10, 7))
+        entry = report["urls"][0]
+        assert entry["sample_count"] == 100
+        assert entry["failure_count"] == 1
+        assert entry["failure_rate"] == 0.01
+        assert 600 <= entry["p50_ms"] <= 1000
+        assert 40000 <= entry["p99_ms"] <= 55000
+        goto = next(phase for phase in entry["phases"] if phase["phase"] == "goto")
+        assert goto["failure_count"] == 1
+
+        empty = latency.latency_report(db, bot.id, date(2026, 9, 1), date(2026, 9, 2))
+        assert empty["urls"] == [] and empty["overall"]["p50_ms"] is None
+    finally:
+        db.close()
+
+
+def test_recording_is_batched_and_keeps_increments_across_sessions() -> None:
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        bot_id = crud.seed_tax_bot(first).id
+        day = datetime(2026, 10, 2, tzinfo=timezone.utc)
+        url = "https://example.com/shared"
+        latency.record_url_results(first, bot_id, [_result(url, 100.0)], recorded_at=day)
+        first.commit()
+        # The second run writes while the first session still holds the rows it loaded.
+        latency.record_url_results(second, bot_id, [_result(url, 200.0), _result(url, 300.0)], recorded_at=day)
+        second.commit()
+        latency.record_url_results(first, bot_id, [_result(url, 400.0)], recorded_at=day)
+        first.commit()
+
+        # Lookups are batched per run, not one SELECT per (url, phase).
+        many = [_result(f"https://example.com/{n}", 100.0) for n in range(50)]
+        before = db_metrics.snapshot()["statements"]
+        latency.record_url_results(first, bot_id, many, recorded_at=day)
+        latency.record_url_results(first, bot_id, many, recorded_at=day)
+        first.commit()
+        statements = db_metrics.snapshot()["statements"] - before
+
+        total = second.query(UrlLatencyStat).filter_by(source_url=url, phase="total").one()
+        second.refresh(total)
+    finally:
+        first.close()
+        second.close()
+
+    assert total.sample_count == 4
+    assert total.total_ms == 1000.0
+    assert sum(total.buckets) == 4
+    assert statements <= 10
+
+
+def test_latency_report_endpoint() -> None:
+    with TestClient(app) as client:
+        response = client.get("/api/bots/tax/reports/latency", params={"since": "2026-10-01", "until": "2026-10-07"})
+        invalid = client.get("/api/bots/tax/reports/latency", params={"since": "2026-10-08", "until": "2026-10-07"})
+
+    assert response.status_code == 200
+    assert response.json()["urls"] == []
+    assert invalid.status_code == 422
@@ -0,0 +1,236 @@
+import asyncio
+
+import pytest
+
+from app.bots.tax import scraper
+from app.bots.tax.scraper import RunDeadline, _scrape_politely
+from app.politeness import CircuitBreaker, HostGuards, RetryPolicy, TokenBucket, is_transient
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Page:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class _Context:
+    async def new_page(self) -> _Page:
+        return _Page()
+
+
+def test_token_bucket_allows_burst_then_spaces_requests() -> None:
+    clock = _Clock()
+    bucket = TokenBucket(rate_per_second=2, burst=2, clock=clock)
+
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    clock.now = 5.0
+    assert bucket.reserve() == 0.0
+
+
+def test_circuit_breaker_opens_then_probes_once() -> None:
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now = 31.0
+    assert breaker.allow() == "probe" and breaker.allow() is None
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now = 62.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_backoff_is_bounded_and_errors_are_classified() -> None:
+    policy = RetryPolicy(max_attempts=5, base_delay_ms=100, max_delay_ms=300)
+
+    assert all(0 <= policy.delay_seconds(4) <= 0.3 for _ in range(50))
+    assert is_transient({"failed_phase": "goto", "error": "Timeout 45000ms exceeded."})
+    assert is_transient({"failed_phase": "goto", "error": "page.goto: net::ERR_CONNECTION_RESET at https://x.test"})
+    assert is_transient({"failed_phase": "goto", "error": "HTTP 503 from source URL"})
+    assert not is_transient({"failed_phase": "wait_for_selector", "error": "Timeout 45000ms exceeded."})
+    assert not is_transient({"failed_phase": "extract_tables", "error": "Structured table data not found on page"})
+
+
+def test_transient_failures_are_retried_and_breaker_state_recorded(monkeypatch) -> None:
+    outcomes = iter(["Timeout 45000ms exceeded.", "HTTP 502 from source URL", None])
+    events = []
+
+    async def fake_scrape(page, cancelled, source_url, **_):
+        error = next(outcomes)
+        if error:
+            failure = {"status": "failed", "source_url": source_url, "failed_phase": "goto", "error": error}
+            return {"url_result": failure, "snapshot": None}
+        return {"url_result": {"status": "success", "source_url": source_url}, "snapshot": {"source_url": source_url}}
+
+    monkeypatch.setattr(scraper, "_scrape_or_cancel", fake_scrape)
+    guards = HostGuards(rate_per_minute=0, burst=1, breaker_failures=5, breaker_reset_seconds=60)
+    outcome = asyncio.run(
+        _scrape_politely(
+            _Context(),
+            asyncio.Event(),
+            RunDeadline(),
+            source_url="https://example.com/?number=1",
+            index=1,
+            event_callback=events.append,
+            guards=guards,
+            policy=RetryPolicy(max_attempts=3, base_delay_ms=0),
+        )
+    )
+
+    assert outcome["url_result"]["status"] == "success"
+    assert outcome["url_result"]["attempts"] == 3
+    assert outcome["url_result"]["breaker_state"] == "closed"
+    assert [event["attempt"] for event in events if event["type"] == "url_retrying"] == [1, 2]
+
+
+def test_open_breaker_skips_url_without_scraping(monkeypatch) -> None:
+    async def fail_scrape(page, cancelled, source_url, **_):
+        failure = {"status": "failed", "source_url": source_url, "failed_phase": "goto", "error": "HTTP 500"}
+        return {"url_result": failure, "snapshot": None}
+
+    monkeypatch.setattr(scraper, "_scrape_or_cancel", fail_scrape)
+    guards = HostGuards(rate_per_minute=0, burst=1, breaker_failures=2, breaker_reset_seconds=60)
+    policy = RetryPolicy(max_attempts=5, base_delay_ms=0)
+
+    def scrape(url: str) -> dict:
+        coroutine = _scrape_politely(
+            _Context(),
+            asyncio.Event(),
+            RunDeadline(),
+            source_url=url,
+            index=1,
+            event_callback=None,
+            guards=guards,
+            policy=policy,
+        )
+        return asyncio.run(coroutine)["url_result"]
+
+    first = scrape("https://example.com/?number=1")
+    second = scrape("https://example.com/?number=2")
+
+    assert first["status"] == "failed" and first["attempts"] == 2 and first["breaker_state"] == "open"
+    assert second["status"] == "skipped" and second["attempts"] == 0
+    assert "Circuit breaker open for example.com" in second["error"]
+
+
+@pytest.mark.parametrize("abort", ["cancel", "raise"])
+def test_aborted_probe_releases_half_open_breaker(monkeypatch, abort) -> None:
+    clock = _Clock()
+    url = "https://example.com/?number=1"
+    guards = HostGuards(rate_per_minute=0, burst=1, breaker_failures=1, breaker_reset_seconds=30)
+    breaker = guards.for_url(url).breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 31.0
+    cancelled = asyncio.Event()
+
+    async def abort_scrape(page, cancelled, **_):
+        if abort == "raise":
+            raise RuntimeError("unexpected")
+        cancelled.set()
+        return None
+
+    monkeypatch.setattr(scraper, "_scrape_or_cancel", abort_scrape)
+    coroutine = _scrape_politely(
+        _Context(), cancelled, RunDeadline(), source_url=url, index=1, event_callback=None, guards=guards
+    )
+    if abort == "raise":
+        with pytest.raises(RuntimeError):
+            asyncio.run(coroutine)
+    else:
+        assert asyncio.run(coroutine) is None
+
+    clock.now = 1031.0
+    assert breaker.state == "half_open"
+    assert breaker.allow() == "probe"
+
+
+def test_deadline_skips_instead_of_jumping_the_rate_limit_or_blaming_the_host(monkeypatch) -> None:
+    clock = _Clock()
+    guards = HostGuards(rate_per_minute=0, burst=1, breaker_failures=1, breaker_reset_seconds=60)
+    late = guards.for_url("https://late.example.com/")
+    late.bucket = TokenBucket(rate_per_second=1 / 60, burst=1, clock=clock)
+    late.bucket.reserve()
+    sent = []
+
+    async def timed_out_scrape(page, cancelled, source_url, **_):
+        sent.append(source_url)
+        clock.now += 10
+        return {
+            "url_result": {"status": "failed", "source_url": source_url, "error": "Timeout 1ms exceeded."},
+            "snapshot": None,
+        }
+
+    monkeypatch.setattr(scraper, "_scrape_or_cancel", timed_out_scrape)
+
+    def scrape(url: str) -> dict:
+        coroutine = _scrape_politely(
+            _Context(),
+            asyncio.Event(),
+            RunDeadline(5, clock=clock),
+            source_url=url,
+            index=1,
+            event_callback=None,
+            guards=guards,
+        )
+        return asyncio.run(coroutine)["url_result"]
+
+    skipped = scrape("https://late.example.com/?number=1")
+    next_wait = late.bucket.reserve()
+    expired = scrape("https://slow.example.com/?number=2")
+
+    assert skipped["status"] == "skipped" and skipped["attempts"] == 0
+    assert "rate-limit slot" in skipped["error"]
+    assert next_wait == 60.0
+    assert sent == ["https://slow.example.com/?number=2"]
+    assert expired["status"] == "failed" and expired["attempts"] == 1
+    assert guards.stats()["slow.example.com"] == "closed"
+
+
+def test_selector_timeout_is_neither_retried_nor_held_against_the_host(monkeypatch) -> None:
+    calls = []
+
+    async def no_table_scrape(page, cancelled, source_url, **_):
+        calls.append(source_url)
+        failure = {
+            "status": "failed",
+            "source_url": source_url,
+            "failed_phase": "wait_for_selector",
+            "error": "page.wait_for_selector: Timeout 15000ms exceeded.",
+        }
+        return {"url_result": failure, "snapshot": None}
+
+    monkeypatch.setattr(scraper, "_scrape_or_cancel", no_table_scrape)
+    guards = HostGuards(rate_per_minute=0, burst=1, breaker_failures=1, breaker_reset_seconds=60)
+    result = asyncio.run(
+        _scrape_politely(
+            _Context(),
+            asyncio.Event(),
+            RunDeadline(),
+            source_url="https://example.com/?number=1",
+            index=1,
+            event_callback=None,
+            guards=guards,
+            policy=RetryPolicy(max_attempts=3, base_delay_ms=0),
+        )
+    )["url_result"]
+
+    assert len(calls) == 1 and result["attempts"] == 1
+    assert result["breaker_state"] == "closed"
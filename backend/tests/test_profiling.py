@@ -0,0 +1,31 @@
+import time
+
+from app import profiling
+
+
+def _busy_wait(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_writes_folded_stacks_for_the_calling_thread(tmp_path) -> None:
+    profiler = profiling.SamplingProfiler(interval_seconds=0.001)
+    with profiler:
+        _busy_wait(0.1)
+
+    summary = profiler.write_folded(tmp_path / "run_1" / profiling.PROFILE_FILENAME)
+    lines = (tmp_path / "run_1" / profiling.PROFILE_FILENAME).read_text().splitlines()
+
+    assert summary["format"] == "folded"
+    assert summary["sample_count"] > 0
+    assert any("_busy_wait" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and " " not in stack
+
+
+def test_should_profile_honours_request_and_sample_rate() -> None:
+    assert profiling.should_profile(True, None)
+    assert profiling.should_profile(False, 1.0)
+    assert not profiling.should_profile(False, 0)
+    assert not profiling.should_profile(False, "not-a-number")
@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app import crud, rollups
+from app.db import SessionLocal, db_metrics
+from app.main import app
+from app.models import TaxDueBotRollup, TaxDuePropertyRollup, TaxPropertySnapshot
+
+
+def _snapshot(address: str, total_due: str, scraped_at: datetime) -> dict:
+    return {
+        "source_url": "https://example.com/1",
+        "final_url": "https://example.com/final/1",
+        "property_address": address,
+        "total_due": total_due,
+        "tables_json": [],
+        "scraped_at": scraped_at,
+    }
+
+
+def _seed(db) -> None:
+    bot = crud.seed_tax_bot(db)
+    batches = [
+        [
+            _snapshot("104 MOONEY AVE.", "100.00", datetime(2026, 1, 5, 9, tzinfo=timezone.utc)),
+            _snapshot("200 MAIN ST.", "50.00", datetime(2026, 1, 5, 9, tzinfo=timezone.utc)),
+        ],
+        [_snapshot("104 MOONEY AVE.", "120.00", datetime(2026, 1, 5, 18, tzinfo=timezone.utc))],
+        [
+            _snapshot("104 MOONEY AVE.", "90.00", datetime(2026, 2, 1, 9, tzinfo=timezone.utc)),
+            _snapshot("200 MAIN ST.", "350.00", datetime(2026, 2, 1, 9, tzinfo=timezone.utc)),
+        ],
+    ]
+    for batch in batches:
+        run = crud.create_run(db, bot.id)
+        crud.create_tax_property_snapshots(db, bot.id, run.id, batch)
+
+
+def test_rollups_track_last_value_per_period() -> None:
+    db = SessionLocal()
+    try:
+        _seed(db)
+        day = (
+            db.query(TaxDuePropertyRollup)
+            .filter_by(property_address="104 MOONEY AVE.", granularity="day")
+            .order_by(TaxDuePropertyRollup.period_start)
+            .first()
+        )
+        assert day.snapshot_count == 2
+        assert (day.first_total_due, day.last_total_due, day.max_total_due) == (
+            Decimal("100.00"),
+            Decimal("120.00"),
+            Decimal("120.00"),
+        )
+
+        january = db.query(TaxDueBotRollup).filter_by(granularity="month").order_by(TaxDueBotRollup.period_start).first()
+        assert january.property_count == 2
+        assert january.snapshot_count == 3
+        assert january.total_due == Decimal("170.00")
+    finally:
+        db.close()
+
+
+def test_rollups_keep_increments_across_sessions_and_batch_lookups() -> None:
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(first)
+        day = datetime(2026, 3, 2, 9, tzinfo=timezone.utc)
+        # Both runs loaded the month row before either promoted.
+        crud.create_tax_property_snapshots(
+            first, bot.id, crud.create_run(first, bot.id).id, [_snapshot("104 MOONEY AVE.", "100.00", day)]
+        )
+        stale = second.query(TaxDueBotRollup).filter_by(granularity="month").one()
+        crud.create_tax_property_snapshots(
+            first, bot.id, crud.create_run(first, bot.id).id, [_snapshot("200 MAIN ST.", "50.00", day)]
+        )
+        crud.create_tax_property_snapshots(
+            second,
+            bot.id,
+            crud.create_run(second, bot.id).id,
+            [_snapshot("104 MOONEY AVE.", "80.00", datetime(2026, 3, 2, 18, tzinfo=timezone.utc))],
+        )
+        assert stale.snapshot_count == 3
+
+        many = [_snapshot(f"{number} ELM ST.", "1.00", day) for number in range(50)]
+        run_id = crud.create_run(first, bot.id).id
+        rows = [TaxPropertySnapshot(bot_id=bot.id, run_id=run_id, **item) for item in many]
+        before = db_metrics.snapshot()["statements"]
+        rollups.apply_snapshots(first, rows)
+        statements = db_metrics.snapshot()["statements"] - before
+        first.rollback()
+
+        month = second.query(TaxDueBotRollup).filter_by(granularity="month").populate_existing().one()
+    finally:
+        first.close()
+        second.close()
+
+    assert (month.snapshot_count, month.property_count, month.total_due) == (3, 2, Decimal("130.00"))
+    assert statements <= 12
+
+
+def test_total_due_analytics_endpoint() -> None:
+    db = SessionLocal()
+    try:
+        _seed(db)
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        response = client.get("/api/bots/tax/analytics/total-due", params={"granularity": "month"})
+        property_response = client.get(
+            "/api/bots/tax/analytics/total-due",
+            params={"granularity": "day", "property_address": "104 MOONEY AVE."},
+        )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [(point["period_start"], point["total_due"], point["delta"]) for point in payload["series"]] == [
+        ("2026-01-01", "170.00", None),
+        ("2026-02-01", "440.00", "270.00"),
+    ]
+    assert [(item["property_address"], item["delta"]) for item in payload["largest_changes"]] == [
+        ("200 MAIN ST.", "300.00"),
+        ("104 MOONEY AVE.", "-10.00"),
+    ]
+
+    property_series = property_response.json()["series"]
+    assert [point["total_due"] for point in property_series] == ["120.00", "90.00"]
+    assert property_response.json()["largest_changes"] == []
@@ -0,0 +1,50 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.run_metrics import PhaseTimer, RunMetrics, summarize_phase_timings
+
+
+def test_phase_timer_sums_repeated_phases() -> None:
+    timer = PhaseTimer()
+    with timer.phase("screenshot"):
+        pass
+    with timer.phase("screenshot"):
+        pass
+    with timer.phase("goto"):
+        pass
+
+    timings = timer.as_dict()
+    assert set(timings) == {"screenshot", "goto", "total"}
+    assert timings["total"] >= timings["screenshot"] + timings["goto"] - 0.01
+
+
+def test_summary_and_prometheus_rendering() -> None:
+    url_results = [
+        {"status": "success", "timings_ms": {"goto": 1200.0, "screenshot": 300.0, "total": 1600.0}},
+        {"status": "failed", "timings_ms": {"goto": 800.0, "total": 900.0}},
+    ]
+
+    summary = summarize_phase_timings(url_results)
+    assert summary["goto"] == {"count": 2, "total_ms": 2000.0, "max_ms": 1200.0, "avg_ms": 1000.0}
+    assert summary["screenshot"]["count"] == 1
+
+    metrics = RunMetrics()
+    metrics.observe_run("tax", "failed", 12.5, url_results)
+    text = metrics.render({"agents_event_hub_subscribers": ("Connected SSE subscribers.", 3)})
+
+    assert 'agents_run_duration_seconds_bucket{bot="tax",status="failed",le="30.0"} 1' in text
+    assert 'agents_run_duration_seconds_bucket{bot="tax",status="failed",le="10.0"} 0' in text
+    assert 'agents_phase_duration_seconds_count{bot="tax",phase="goto"} 2' in text
+    assert 'phase="total"' not in text
+    assert 'agents_url_results_total{bot="tax",status="failed"} 1' in text
+    assert "agents_event_hub_subscribers 3" in text
+
+
+def test_metrics_endpoint_serves_text_exposition() -> None:
+    with TestClient(app) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE agents_run_duration_seconds histogram" in response.text
+    assert "agents_event_hub_subscribers 0" in response.text
@@ -4,6 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app import crud
+from app.bots.tax.config import DEFAULT_TAX_CONFIG
 from app.bots.tax.runner import run_tax_refresh
 from app.models import Base, TaxPropertySnapshot
 
@@ -32,6 +33,7 @@ def test_runner_commits_snapshots_only_on_success() -> None:
                         "final_url": "https://example.com/final/1",
                         "property_address": "104 MOONEY AVE.",
                         "total_due": "100.00",
+                        "timings_ms": {"goto": 120.0, "extract_tables": 4.0, "total": 150.0},
                     },
                     {
                         "status": "success",
@@ -71,6 +73,9 @@ def test_runner_commits_snapshots_only_on_success() -> None:
         assert result["snapshot_count"] == 2
         assert db.query(TaxPropertySnapshot).count() == 2
         assert any(event.get("type") == "db_committed" for event in events)
+        timings = result["details_json"]["phase_timings"]
+        assert timings["goto"]["count"] == 1
+        assert timings["db_commit"]["count"] == 1
     finally:
         db.close()
 
@@ -119,3 +124,34 @@ def test_runner_keeps_database_unchanged_on_partial_failure() -> None:
         assert db.query(TaxPropertySnapshot).count() == 0
     finally:
         db.close()
+
+
+def test_runner_passes_deadline_and_reports_skipped_urls() -> None:
+    db = _test_session()
+    try:
+        bot = crud.seed_tax_bot(db)
+        crud.update_bot_config(db, bot.id, {**DEFAULT_TAX_CONFIG, "run_deadline_seconds": 300})
+        run = crud.create_run(db, bot.id)
+        seen = {}
+
+        def fake_scraper(**kwargs):
+            seen["deadline_seconds"] = kwargs["deadline_seconds"]
+            return {
+                "artifacts_root": "/artifacts/runs/run_1",
+                "url_results": [
+                    {"status": "failed", "source_url": "https://example.com/1", "error": "Run deadline exceeded"},
+                    {"status": "skipped", "source_url": "https://example.com/2", "error": "Run deadline exceeded"},
+                ],
+                "snapshots": [],
+                "deadline": {"seconds": 300, "exceeded": True, "skipped": 1},
+            }
+
+        result = run_tax_refresh(db, bot, run, scraper_func=fake_scraper)
+
+        assert DEFAULT_TAX_CONFIG["run_deadline_seconds"] is None
+        assert seen["deadline_seconds"] == 300
+        assert result["status"] == "failed"
+        assert "run deadline of 300s exceeded; 1 URL(s) skipped" in result["error_summary"]
+        assert result["details_json"]["deadline"]["skipped"] == 1
+    finally:
+        db.close()
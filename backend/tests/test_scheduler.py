@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app import crud, schedules
+from app.bots.tax.config import DEFAULT_TAX_CONFIG
+from app.db import SessionLocal
+from app.main import app
+from app.scheduler import BotScheduler
+from app.settings import get_settings
+
+T0 = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def _schedule(**overrides) -> schedules.ScheduleConfig:
+    return schedules.ScheduleConfig.model_validate(
+        {"enabled": True, "interval_seconds": 3600, "jitter_seconds": 0, **overrides}
+    )
+
+
+def test_cron_next_after_and_validation() -> None:
+    assert schedules.CronSpec.parse("0 */6 * * *").next_after(T0) == T0.replace(hour=18)
+    # Weekday 1 is Monday; 2026-10-19 is a Monday, so the next one is a week out.
+    assert schedules.CronSpec.parse("30 2 * * 1").next_after(T0) == datetime(2026, 10, 26, 2, 30, tzinfo=timezone.utc)
+    for invalid in ({"enabled": True}, {"enabled": True, "interval_seconds": 3600, "cron": "* * * * *"}):
+        try:
+            schedules.ScheduleConfig.model_validate(invalid)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {invalid}")
+
+
+def test_batches_are_spread_across_the_interval() -> None:
+    slots = schedules.slots_between(_schedule(batch_size=1), 3, T0 - timedelta(minutes=1), T0 + timedelta(hours=1))
+
+    assert [(slot.at.minute, slot.batch_index) for slot in slots] == [(0, 0), (20, 1), (40, 2), (0, 0)]
+
+
+def test_catch_up_policies() -> None:
+    slots = schedules.slots_between(_schedule(), 1, T0 - timedelta(hours=5), T0)
+    grace = timedelta(minutes=1)
+    now = T0 + timedelta(minutes=30)
+
+    def fired(policy: str) -> list[int]:
+        fire, _, handled = schedules.select_due_slots(_schedule(catch_up=policy, max_catch_up_runs=3), 1, slots, now, grace)
+        assert handled == slots[-1]
+        return [slot.at.hour for slot in fire]
+
+    assert fired("skip") == []
+    assert fired("latest") == [12]
+    assert fired("all") == [10, 11, 12]
+
+
+def test_scheduler_fires_missed_batch_and_waits_for_active_runs() -> None:
+    source_urls = list(get_settings().tax_source_urls)
+    submitted = []
+
+    def submit(slug, batch, incremental):
+        submitted.append((slug, batch, incremental))
+        return 1000 + len(submitted)
+
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        schedule = {"enabled": True, "interval_seconds": 3600, "jitter_seconds": 0, "batch_size": 1}
+        crud.update_bot_config(db, bot.id, {**DEFAULT_TAX_CONFIG, "schedule": schedule})
+        bot_id = bot.id
+    finally:
+        db.close()
+
+    # Anchored to the real clock so the queued run below counts as recent.
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    scheduler = BotScheduler(SessionLocal, submit, poll_seconds=15)
+    assert scheduler.run_once(start) == []
+    step = timedelta(hours=1) / len(source_urls)
+
+    fired = scheduler.run_once(start + step + timedelta(minutes=5))
+
+    assert [item["batch_index"] for item in fired] == [1]
+    assert submitted == [("tax", [source_urls[1]], True)]
+
+    db = SessionLocal()
+    try:
+        crud.create_run(db, bot_id, status="queued")
+    finally:
+        db.close()
+    assert scheduler.run_once(start + 2 * step) == []
+
+
+def test_latest_catch_up_run_covers_the_batches_it_replaces() -> None:
+    source_urls = list(get_settings().tax_source_urls)
+    submitted = []
+
+    def submit(slug, batch, incremental):
+        submitted.append(batch)
+        return 2000 + len(submitted)
+
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        schedule = {"enabled": True, "interval_seconds": 3600, "jitter_seconds": 0, "batch_size": 1}
+        crud.update_bot_config(db, bot.id, {**DEFAULT_TAX_CONFIG, "schedule": schedule})
+    finally:
+        db.close()
+
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    scheduler = BotScheduler(SessionLocal, submit, poll_seconds=15)
+    scheduler.run_once(start)
+    step = timedelta(hours=1) / len(source_urls)
+
+    # Batches 1 and 2 were both missed; one run scrapes both.
+    fired = scheduler.run_once(start + 2 * step + timedelta(minutes=5))
+
+    assert [item["batch_index"] for item in fired] == [2]
+    assert submitted == [source_urls[1:3]]
+
+
+def test_schedule_endpoint_lists_upcoming_slots() -> None:
+    with TestClient(app) as client:
+        disabled = client.get("/api/bots/tax/schedule").json()
+        schedule = {"enabled": True, "cron": "0 */6 * * *", "jitter_seconds": 30}
+        config = client.get("/api/bots/tax/config").json()["config_json"]
+        client.put("/api/bots/tax/config", json={"config_json": {**config, "schedule": schedule}})
+        enabled = client.get("/api/bots/tax/schedule").json()
+        missing = client.get("/api/bots/unknown/schedule")
+
+    assert disabled["enabled"] is False and disabled["upcoming"] == []
+    assert enabled["enabled"] is True and len(enabled["upcoming"]) == 5
+    assert missing.status_code == 404
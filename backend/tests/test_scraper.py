@@ -0,0 +1,113 @@
+import asyncio
+
+from app.artifacts import ContentAddressedStore, parse_blob_path
+from app.bots.tax import scraper
+from app.politeness import HostGuards
+
+ROWS = {
+    "https://example.com/?number=1": [["Property Address", "104 MOONEY AVE."], ["TOTAL", "$100.00"]],
+    "https://example.com/?number=2": [["Property Address", "200 MAIN ST."], ["TOTAL", "$250.00"]],
+    "https://example.com/?number=3": [],
+}
+
+
+class _Locator:
+    def __init__(self, items: list):
+        self.items = items
+
+    async def count(self) -> int:
+        return len(self.items)
+
+    def nth(self, index: int) -> "_Locator":
+        return _Locator(self.items[index])
+
+    def locator(self, _: str) -> "_Locator":
+        return self
+
+    async def inner_text(self) -> str:
+        return self.items
+
+
+class _Response:
+    status = 200
+    request = None
+
+    def __init__(self, url: str):
+        self.url = url
+
+
+class _Page:
+    def __init__(self):
+        self.url = "about:blank"
+        self.closed = False
+
+    def set_default_timeout(self, _: float):
+        pass
+
+    async def screenshot(self, full_page: bool = False) -> bytes:
+        return f"png:{self.url}".encode()
+
+    async def goto(self, url: str, **_) -> _Response:
+        self.url = url
+        return _Response(url)
+
+    async def wait_for_function(self, *_, **__):
+        pass
+
+    async def wait_for_selector(self, *_, **__):
+        pass
+
+    def locator(self, _: str) -> _Locator:
+        rows = ROWS[self.url]
+        return _Locator([rows] if rows else [])
+
+    async def inner_text(self, _: str) -> str:
+        return "No tax records"
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class _Context:
+    async def new_page(self) -> _Page:
+        return _Page()
+
+    async def close(self):
+        pass
+
+
+class _Browser:
+    async def new_context(self) -> _Context:
+        return _Context()
+
+
+def test_scrape_all_runs_end_to_end_on_a_fake_browser(monkeypatch, tmp_path) -> None:
+    guards = HostGuards(rate_per_minute=0, burst=1, breaker_failures=0, breaker_reset_seconds=60)
+    monkeypatch.setattr(scraper, "host_guards", guards)
+    events, batches, staged = [], [], []
+
+    result = asyncio.run(
+        scraper._scrape_all_async(
+            run_id=7,
+            source_urls=list(ROWS),
+            artifacts_root=tmp_path,
+            event_callback=events.append,
+            browser=_Browser(),
+            checkpoint_callback=lambda url_result, snapshot: staged.append(snapshot),
+            results_callback=batches.append,
+        )
+    )
+
+    flushed = [event for event in events if event["type"] == "artifacts_flushed"]
+    assert len(flushed) == 1 and flushed[0]["errors"] == [] and flushed[0]["written"] > 0
+    assert result["artifact_writes"] == {key: value for key, value in flushed[0].items() if key != "type"}
+    assert [item["status"] for batch in batches for item in batch] == ["success", "success", "failed"]
+    assert [snapshot["property_address"] for snapshot in staged] == ["104 MOONEY AVE.", "200 MAIN ST."]
+    assert result["url_results"] == [] and not result["cancelled"]
+    # Every screenshot referenced by a result is on disk once the run returns.
+    for item in batches[0]:
+        for path in item["artifacts"].values():
+            assert ContentAddressedStore(tmp_path).blob_file(*parse_blob_path(path)).exists()
@@ -1,6 +1,6 @@
 from decimal import Decimal
 
-from app.bots.tax.scraper import _extract_property_address, _extract_total_due
+from app.bots.tax.scraper import RunDeadline, _extract_property_address, _extract_total_due
 
 
 def test_extract_property_address_prefers_label() -> None:
@@ -26,3 +26,18 @@ def test_extract_total_due_uses_total_rows() -> None:
         }
     ]
     assert _extract_total_due(tables) == Decimal("1234.56")
+
+
+def test_run_deadline_clamps_step_timeouts() -> None:
+    now = [100.0]
+    deadline = RunDeadline(10, clock=lambda: now[0])
+
+    assert deadline.timeout(45000) == 10000
+    assert deadline.timeout(5000) == 5000
+    now[0] += 9.5
+    assert deadline.timeout(20000) == 500
+    now[0] += 1
+    assert deadline.expired
+    # Never 0: Playwright reads that as "wait forever".
+    assert deadline.timeout(15000) == 1.0
+    assert RunDeadline(None).timeout(45000) == 45000
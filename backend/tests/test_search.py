@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.db import SessionLocal
+from app.main import app
+from app.models import TaxPropertySearchEntry
+
+
+def _snapshot(address: str, rows: list[list[str]], hour: int) -> dict:
+    return {
+        "source_url": "https://example.com/1",
+        "final_url": "https://example.com/final/1",
+        "property_address": address,
+        "total_due": "10.00",
+        "tables_json": [{"table_index": 0, "rows": rows}],
+        "scraped_at": datetime(2026, 2, 14, hour, tzinfo=timezone.utc),
+    }
+
+
+def test_search_index_keeps_latest_snapshot_per_property() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        run = crud.create_run(db, bot.id)
+        crud.create_tax_property_snapshots(
+            db,
+            bot.id,
+            run.id,
+            [
+                _snapshot("104 MOONEY AVE.", [["Owner", "SMITH JOHN"]], 9),
+                _snapshot("104 MOONEY AVE.", [["Owner", "DOE JANE"]], 10),
+                _snapshot("200 MAIN ST.", [["Owner", "MOONEY TRUST"]], 9),
+            ],
+        )
+        entries = db.query(TaxPropertySearchEntry).order_by(TaxPropertySearchEntry.property_address).all()
+        assert [entry.search_text for entry in entries] == ["Owner DOE JANE", "Owner MOONEY TRUST"]
+    finally:
+        db.close()
+
+    with TestClient(app) as client:
+        response = client.get("/api/bots/tax/search", params={"q": "mooney"})
+        stale = client.get("/api/bots/tax/search", params={"q": "SMITH"})
+        paged = client.get("/api/bots/tax/search", params={"q": "mooney", "limit": 1, "offset": 1})
+
+    payload = response.json()
+    assert payload["total"] == 2
+    assert [(item["property_address"], item["matched_on"]) for item in payload["items"]] == [
+        ("104 MOONEY AVE.", "address"),
+        ("200 MAIN ST.", "tables"),
+    ]
+    assert stale.json()["total"] == 0
+    assert [item["property_address"] for item in paged.json()["items"]] == ["200 MAIN ST."]
+
+
+def test_search_index_upserts_across_runs_and_never_moves_backwards() -> None:
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(first)
+        # Both runs promote the same property; the newer scrape commits first.
+        newer = crud.create_run(second, bot.id)
+        crud.create_tax_property_snapshots(
+            second, bot.id, newer.id, [_snapshot("104 MOONEY AVE.", [["Owner", "NEW"]], 12)]
+        )
+        older = crud.create_run(first, bot.id)
+        crud.create_tax_property_snapshots(
+            first, bot.id, older.id, [_snapshot("104 MOONEY AVE.", [["Owner", "OLD"]], 11)]
+        )
+        latest = crud.create_run(first, bot.id)
+        crud.create_tax_property_snapshots(
+            first, bot.id, latest.id, [_snapshot("104 MOONEY AVE.", [["Owner", "NEWEST"]], 13)]
+        )
+
+        entries = second.query(TaxPropertySearchEntry).populate_existing().all()
+    finally:
+        first.close()
+        second.close()
+
+    assert [entry.search_text for entry in entries] == ["Owner NEWEST"]
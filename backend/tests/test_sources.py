@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app import crud, sources
+from app.bots.tax.config import account_number_from_url
+from app.bots.tax.runner import run_tax_refresh
+from app.db import SessionLocal
+from app.main import app
+from app.models import BotSource
+from app.settings import get_settings
+
+NOW = datetime.now(timezone.utc)
+
+
+def _url(number: int) -> str:
+    return f"https://example.com/?number={number}"
+
+
+def test_csv_import_upserts_in_chunks_and_keeps_metadata() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        seeded = sources.count_enabled(db, bot.id)
+        first = sources.import_csv(
+            db,
+            bot.id,
+            ["url,enabled,owner", f"{_url(1)},yes,Ann", f"{_url(2)},no,Bo", ",yes,nobody", f"{_url(3)},,"],
+            account_number_from_url,
+            chunk_size=2,
+        )
+        second = sources.import_csv(db, bot.id, ["url,enabled", f"{_url(2)},true"], account_number_from_url)
+        row = db.query(BotSource).filter(BotSource.url == _url(2)).one()
+        enabled = sources.count_enabled(db, bot.id)
+    finally:
+        db.close()
+
+    assert (first.inserted, first.updated, first.skipped) == (3, 0, 1)
+    assert (second.inserted, second.updated) == (0, 1)
+    assert row.account_number == "2" and row.enabled is True
+    assert row.metadata_json == {"owner": "Bo"}
+    assert enabled == seeded + 3
+
+
+def test_streamed_csv_keeps_quoted_newlines_across_chunks() -> None:
+    body = f'url,owner,note\n{_url(1)},"Ann\nSmith","says ""hi"""\n{_url(2)},Bö,\n'.encode()
+
+    async def chunks():
+        for start in range(0, len(body), 7):
+            yield body[start : start + 7]
+
+    async def collect() -> list[dict]:
+        return [row async for row in sources.aiter_csv_rows(chunks())]
+
+    rows = asyncio.run(collect())
+
+    assert rows == [
+        {"url": _url(1), "owner": "Ann\nSmith", "note": 'says "hi"'},
+        {"url": _url(2), "owner": "Bö", "note": ""},
+    ]
+
+
+def test_iter_source_urls_pages_and_filters_stale_sources() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_bot(db, "bulk", "Bulk", "bulk.default", {}, source_urls=[_url(n) for n in range(7)])
+        disabled_id = db.query(BotSource.id).filter(BotSource.url == _url(6)).scalar()
+        sources.update_source(db, bot.id, disabled_id, enabled=False)
+        sources.record_outcomes(
+            db,
+            bot.id,
+            [
+                {"source_url": _url(0), "status": "success"},
+                {"source_url": _url(1), "status": "failed", "error": "boom"},
+                {"source_url": _url(2), "status": "skipped"},
+            ],
+            finished_at=NOW,
+        )
+        db.commit()
+        every = list(sources.iter_source_urls(db, bot.id, chunk_size=2))
+        stale = list(sources.iter_source_urls(db, bot.id, stale_before=NOW - timedelta(hours=1), chunk_size=2))
+        batch = sources.batch_urls(db, bot.id, 1, 2)
+        failed = db.query(BotSource).filter(BotSource.url == _url(1)).one()
+    finally:
+        db.close()
+
+    assert every == [_url(n) for n in range(6)]
+    assert stale == [_url(n) for n in range(1, 6)]
+    assert batch == [_url(3), _url(4), _url(5)]
+    assert failed.last_error == "boom" and failed.last_success_at is None
+
+
+def test_full_run_streams_sources_from_the_database_and_stamps_outcomes() -> None:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        sources.import_csv(db, bot.id, ["url,enabled", f"{get_settings().tax_source_urls[0]},false"])
+        run = crud.create_run(db, bot.id)
+        seen = {}
+
+        def fake_scraper(**kwargs):
+            seen["source_urls"] = list(kwargs["source_urls"])
+            url_results = [{"source_url": url, "status": "failed", "error": "no table"} for url in seen["source_urls"]]
+            return {"url_results": url_results, "snapshots": []}
+
+        result = run_tax_refresh(db, bot, run, scraper_func=fake_scraper)
+        stamped = db.query(BotSource).filter(BotSource.last_failure_at.isnot(None)).count()
+    finally:
+        db.close()
+
+    assert seen["source_urls"] == list(get_settings().tax_source_urls[1:])
+    assert result["details_json"]["source_count"] == len(seen["source_urls"])
+    assert "source_urls" not in result["details_json"]
+    assert stamped == len(seen["source_urls"])
+
+
+def test_source_endpoints_import_list_and_toggle() -> None:
+    with TestClient(app) as client:
+        body = "url,owner\n" + "".join(f"{_url(n)},Owner {n}\n" for n in range(1000, 1005))
+        imported = client.post("/api/bots/tax/sources/import", content=body.encode())
+        listed = client.get("/api/bots/tax/sources", params={"limit": 2}).json()
+        after = client.get("/api/bots/tax/sources", params={"limit": 2, "after_id": listed["next_after_id"]}).json()
+        source_id = listed["items"][0]["id"]
+        patched = client.patch(f"/api/bots/tax/sources/{source_id}", json={"enabled": False})
+        disabled = client.get("/api/bots/tax/sources", params={"enabled": False}).json()
+        refresh = client.post(f"/api/bots/tax/properties/{listed['items'][0]['account_number']}/refresh")
+        detail = client.get("/api/bots/tax").json()
+        missing = client.patch("/api/bots/tax/sources/999999", json={"enabled": True})
+
+    assert imported.json() == {"inserted": 5, "updated": 0, "skipped": 0}
+    assert listed["total"] == len(get_settings().tax_source_urls) + 5
+    assert after["items"][0]["id"] > listed["items"][1]["id"]
+    assert patched.json()["enabled"] is False
+    assert [item["id"] for item in disabled["items"]] == [source_id]
+    assert refresh.status_code == 404
+    assert detail["source_count"] == listed["total"] - 1
+    assert missing.status_code == 404
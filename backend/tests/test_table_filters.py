@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.db import SessionLocal
+from app.main import app
+from app.table_filters import filter_snapshots
+
+
+def _snapshot(address: str, city_tax: str, table_count: int, hour: int) -> dict:
+    tables = [{"table_index": 0, "rows": [["City Tax", city_tax], ["TOTAL", city_tax]]}]
+    tables += [{"table_index": idx, "rows": [["Note", "n/a"]]} for idx in range(1, table_count)]
+    return {
+        "source_url": "https://example.com/1",
+        "final_url": "https://example.com/final/1",
+        "property_address": address,
+        "total_due": city_tax.strip("$").replace(",", ""),
+        "tables_json": tables,
+        "metadata_json": {"table_count": table_count},
+        "scraped_at": datetime(2026, 2, 14, hour, tzinfo=timezone.utc),
+    }
+
+
+def _seed() -> int:
+    db = SessionLocal()
+    try:
+        bot = crud.seed_tax_bot(db)
+        first = crud.create_run(db, bot.id)
+        crud.create_tax_property_snapshots(
+            db,
+            bot.id,
+            first.id,
+            [_snapshot("104 MOONEY AVE.", "$1,500.00", 1, 9), _snapshot("200 MAIN ST.", "$80.00", 1, 9)],
+        )
+        second = crud.create_run(db, bot.id)
+        crud.create_tax_property_snapshots(
+            db,
+            bot.id,
+            second.id,
+            [_snapshot("104 MOONEY AVE.", "$90.00", 2, 10), _snapshot("200 MAIN ST.", "$2,000.00", 1, 10)],
+        )
+        return bot.id
+    finally:
+        db.close()
+
+
+def test_row_label_amount_filter_runs_in_sql() -> None:
+    bot_id = _seed()
+    db = SessionLocal()
+    try:
+        latest = filter_snapshots(db, bot_id, row_label="City Tax", min_amount=Decimal("1000"))
+        history = filter_snapshots(db, bot_id, row_label="City Tax", min_amount=Decimal("1000"), latest_only=False)
+        below = filter_snapshots(db, bot_id, row_label="City Tax", max_amount=Decimal("100"))
+        missing = filter_snapshots(db, bot_id, row_label="School Tax")
+    finally:
+        db.close()
+
+    assert [row.property_address for row in latest] == ["200 MAIN ST."]
+    assert sorted(row.total_due for row in history) == [Decimal("1500.00"), Decimal("2000.00")]
+    assert [row.property_address for row in below] == ["104 MOONEY AVE."]
+    assert missing == []
+
+
+def test_filter_endpoint_table_count_changed() -> None:
+    _seed()
+    with TestClient(app) as client:
+        response = client.get("/api/bots/tax/properties/filter", params={"table_count_changed": "true"})
+        invalid = client.get("/api/bots/tax/properties/filter", params={"min_amount": "5"})
+
+    assert response.status_code == 200
+    assert [item["property_address"] for item in response.json()] == ["104 MOONEY AVE."]
+    assert invalid.status_code == 422
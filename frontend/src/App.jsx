@@ -29,6 +29,23 @@ function toArtifactUrl(path, cacheKey = '') {
   return `${path}${suffix}`
 }
 
+const BLOB_PATH_RE = /^\/artifacts\/blobs\/[0-9a-f]{2}\/([0-9a-f]{64})\.[a-z0-9]+$/
+
+function toArtifactVariantUrl(path, variant) {
+  const match = BLOB_PATH_RE.exec(path || '')
+  if (!match) return ''
+  return `/api/artifact-store/blobs/${match[1]}?variant=${variant}`
+}
+
+async function refreshErrorMessage(res) {
+  if (res.status === 429) {
+    const retryAfter = res.headers.get('Retry-After')
+    return `Run queue is full, try again in ${retryAfter || 'a few'} seconds`
+  }
+  const body = await res.text()
+  return body || 'Refresh request failed'
+}
+
 function usePathname() {
   const [pathname, setPathname] = useState(window.location.pathname)
   useEffect(() => {
@@ -62,7 +79,7 @@ function EventTimeline({ events }) {
   )
 }
 
-function LatestPropertiesTable({ rows, emptyMessage }) {
+function LatestPropertiesTable({ rows, emptyMessage, onRefreshAccount }) {
   if (!rows.length) {
     return <p className="panel-muted">{emptyMessage}</p>
   }
@@ -75,6 +92,7 @@ function LatestPropertiesTable({ rows, emptyMessage }) {
             <th>Property Address</th>
             <th>Total Due</th>
             <th>Scraped At</th>
+            {onRefreshAccount && <th />}
           </tr>
         </thead>
         <tbody>
@@ -83,6 +101,13 @@ function LatestPropertiesTable({ rows, emptyMessage }) {
               <td>{row.property_address}</td>
               <td>{fmtMoney(row.total_due)}</td>
               <td>{fmtDate(row.scraped_at)}</td>
+              {onRefreshAccount && (
+                <td>
+                  {row.source_account_number && (
+                    <button className="ghost" onClick={() => onRefreshAccount(row.source_account_number)}>Refresh</button>
+                  )}
+                </td>
+              )}
             </tr>
           ))}
         </tbody>
@@ -165,8 +190,7 @@ function DashboardPage() {
     try {
       const res = await api('/api/bots/tax/refresh', { method: 'POST' })
       if (!res.ok) {
-        const body = await res.text()
-        throw new Error(body || 'Refresh request failed')
+        throw new Error(await refreshErrorMessage(res))
       }
       const data = await res.json()
       setRunId(data.run_id)
@@ -248,6 +272,7 @@ function TaxBotDetailPage() {
   const [selectedRun, setSelectedRun] = useState(null)
   const [events, setEvents] = useState([])
   const [running, setRunning] = useState(false)
+  const [activeRunId, setActiveRunId] = useState(null)
   const [error, setError] = useState('')
 
   const streamRef = useRef(null)
@@ -288,7 +313,15 @@ function TaxBotDetailPage() {
       const body = await res.text()
       throw new Error(`Failed loading run details: ${body}`)
     }
-    setSelectedRun(await res.json())
+    const run = await res.json()
+    // Per-URL outcomes live outside the run row; show the first page.
+    const resultsRes = await api(`/api/bots/tax/runs/${runId}/url-results?limit=200`)
+    if (!resultsRes.ok) {
+      const body = await resultsRes.text()
+      throw new Error(`Failed loading run URL results: ${body}`)
+    }
+    const results = await resultsRes.json()
+    setSelectedRun({ ...run, url_results: results.items.map((item) => item.result_json), url_results_total: results.total })
   }
 
   const loadAll = async () => {
@@ -310,6 +343,7 @@ function TaxBotDetailPage() {
 
       if (payload.type === 'run_finished') {
         setRunning(false)
+        setActiveRunId(null)
         stopStream()
         await Promise.all([loadBot(), loadLatestRows(), loadRun(runId)])
       }
@@ -321,18 +355,18 @@ function TaxBotDetailPage() {
     }
   }
 
-  const refresh = async () => {
+  const refresh = async (mode = 'full') => {
     setError('')
     setEvents([])
     setRunning(true)
 
     try {
-      const res = await api('/api/bots/tax/refresh', { method: 'POST' })
+      const res = await api(`/api/bots/tax/refresh?mode=${mode}`, { method: 'POST' })
       if (!res.ok) {
-        const body = await res.text()
-        throw new Error(body || 'Refresh request failed')
+        throw new Error(await refreshErrorMessage(res))
       }
       const payload = await res.json()
+      setActiveRunId(payload.run_id)
       connectStream(payload.run_id)
       await loadRun(payload.run_id)
     } catch (exc) {
@@ -341,6 +375,35 @@ function TaxBotDetailPage() {
     }
   }
 
+  const refreshAccount = async (account) => {
+    setError('')
+    setEvents([])
+    setRunning(true)
+
+    try {
+      const res = await api(`/api/bots/tax/properties/${encodeURIComponent(account)}/refresh`, { method: 'POST' })
+      if (!res.ok) {
+        throw new Error(await refreshErrorMessage(res))
+      }
+      const payload = await res.json()
+      setActiveRunId(payload.run_id)
+      connectStream(payload.run_id)
+      await loadRun(payload.run_id)
+    } catch (exc) {
+      setError(String(exc.message || exc))
+      setRunning(false)
+    }
+  }
+
+  const cancelRun = async () => {
+    if (!activeRunId) return
+    const res = await api(`/api/bots/tax/runs/${activeRunId}/cancel`, { method: 'POST' })
+    if (!res.ok) {
+      const body = await res.json().catch(() => null)
+      setError(body?.detail || `Cancel failed with status ${res.status}`)
+    }
+  }
+
   useEffect(() => {
     const run = async () => {
       setError('')
@@ -364,7 +427,9 @@ function TaxBotDetailPage() {
         </div>
         <div className="action-row">
           <button className="ghost" onClick={() => navigate('/')}>Back to Index</button>
-          <button onClick={refresh} disabled={running}>{running ? 'Refreshing...' : 'Refresh Data'}</button>
+          <button onClick={() => refresh()} disabled={running}>{running ? 'Refreshing...' : 'Refresh Data'}</button>
+          <button className="ghost" onClick={() => refresh('incremental')} disabled={running}>Refresh Stale</button>
+          {running && activeRunId && <button className="ghost" onClick={cancelRun}>Cancel Run</button>}
         </div>
       </header>
 
@@ -372,15 +437,22 @@ function TaxBotDetailPage() {
 
       <section className="card-grid">
         <article className="panel-card">
-          <h3>Source URLs (Hard-coded)</h3>
+          <h3>Source URLs ({bot?.source_count ?? 0} enabled)</h3>
           <ul className="source-list">
             {(bot?.source_urls || []).map((url) => <li key={url}>{url}</li>)}
           </ul>
+          {bot && bot.source_count > (bot.source_urls || []).length && (
+            <p className="panel-muted">Showing the first {bot.source_urls.length}.</p>
+          )}
         </article>
 
         <article className="panel-card">
           <h3>Latest Per-Property Snapshot</h3>
-          <LatestPropertiesTable rows={latestRows} emptyMessage="No snapshots available yet." />
+          <LatestPropertiesTable
+            rows={latestRows}
+            emptyMessage="No snapshots available yet."
+            onRefreshAccount={running ? null : refreshAccount}
+          />
         </article>
 
         <article className="panel-card">
@@ -413,10 +485,29 @@ function TaxBotDetailPage() {
             <p><strong>Started:</strong> {fmtDate(selectedRun.started_at)}</p>
             <p><strong>Finished:</strong> {fmtDate(selectedRun.finished_at)}</p>
             <p><strong>Error:</strong> {selectedRun.error_summary || '-'}</p>
+            {selectedRun.details_json?.profile && (
+              <p>
+                <strong>Profile:</strong>{' '}
+                <a href={toArtifactUrl(selectedRun.details_json.profile.path, selectedRun.run_id)} target="_blank" rel="noreferrer">
+                  folded stacks ({selectedRun.details_json.profile.sample_count} samples)
+                </a>
+              </p>
+            )}
+            {selectedRun.details_json?.trace && (
+              <p>
+                <strong>Slowest URL trace:</strong>{' '}
+                <a href={toArtifactUrl(selectedRun.details_json.trace.path, selectedRun.run_id)} target="_blank" rel="noreferrer">
+                  {selectedRun.details_json.trace.source_url}
+                </a>
+              </p>
+            )}
 
             <h4>Per URL Results</h4>
+            {selectedRun.url_results_total > (selectedRun.url_results || []).length && (
+              <p>Showing {selectedRun.url_results.length} of {selectedRun.url_results_total}.</p>
+            )}
             <div className="url-results">
-              {(selectedRun.details_json?.url_results || []).map((item, idx) => (
+              {(selectedRun.url_results || []).map((item, idx) => (
                 <div className="url-result" key={`${item.source_url}-${idx}`}>
                   <p><strong>URL:</strong> {item.source_url}</p>
                   <p><strong>Status:</strong> {item.status}</p>
@@ -425,13 +516,18 @@ function TaxBotDetailPage() {
                   <p><strong>Total Due:</strong> {item.total_due ? fmtMoney(item.total_due) : '-'}</p>
                   <p><strong>Error:</strong> {item.error || '-'}</p>
                   <div className="artifact-strip">
-                    {Object.entries(item.artifacts || {}).map(([label, path]) => (
-                      path ? (
-                        <a key={`${label}-${path}`} href={toArtifactUrl(path, selectedRun.run_id)} target="_blank" rel="noreferrer">
-                          {label}
+                    {Object.entries(item.artifacts || {}).map(([label, path]) => {
+                      if (!path) return null
+                      const thumbUrl = toArtifactVariantUrl(path, 'thumb')
+                      // Content-addressed blobs open full resolution only on click.
+                      const fullUrl = thumbUrl ? toArtifactVariantUrl(path, 'full') : toArtifactUrl(path, selectedRun.run_id)
+                      return (
+                        <a key={`${label}-${path}`} href={fullUrl} target="_blank" rel="noreferrer">
+                          {thumbUrl && <img src={thumbUrl} alt={label} loading="lazy" />}
+                          <span>{label}</span>
                         </a>
-                      ) : null
-                    ))}
+                      )
+                    })}
                   </div>
                 </div>
               ))}